@@ -6,6 +6,7 @@
 # IMPORTAÇÕES
 # ============================
 import os
+import threading
 from pathlib import Path
 from datetime import datetime
 
@@ -19,6 +20,10 @@ from services import LoteriaAPI, AIEngine, JogoGenerator, KPICalculator
 from utils import Formatters, validar_dezenas
 from assets.components import UIComponents
 from services.chat_analyzer import ChatAnalyzer
+from services.agendador import AgendadorSorteios
+from services.cache_processo import CacheProcesso
+from services.conferencia import ConferenciaLote
+from services.fechamento import MAXIMO_DEZENAS, condicoes_viaveis
 
 # ============================
 # CONFIGURAÇÃO DA PÁGINA
@@ -86,18 +91,17 @@ carregar_css(ASSETS_DIR / "styles.css")
 # INICIALIZAR SERVIÇOS
 # ============================
 def inicializar_servicos():
-    """Inicializa e cacheia os serviços"""
-    if 'servicos' not in st.session_state:
-        st.session_state.servicos = {
-            'api': LoteriaAPI(),
-            'ai': AIEngine(),
-            'gerador': JogoGenerator(),
-            'kpi': KPICalculator(),
-            'ui': UIComponents(),
-            'formatador': Formatters(),
-            'chat': ChatAnalyzer()
-        }
-    return st.session_state.servicos
+    """Serviços sem estado: uma instância por processo, compartilhada pelas sessões"""
+    api = CacheProcesso.servico('api', LoteriaAPI)
+    return {
+        'api': api,
+        'ai': CacheProcesso.servico('ai', AIEngine),
+        'gerador': CacheProcesso.servico('gerador', JogoGenerator),
+        'kpi': CacheProcesso.servico('kpi', KPICalculator),
+        'ui': CacheProcesso.servico('ui', UIComponents),
+        'formatador': CacheProcesso.servico('formatador', Formatters),
+        'chat': CacheProcesso.servico('chat', lambda: ChatAnalyzer(api))
+    }
 
 # Obter serviços
 servicos = inicializar_servicos()
@@ -109,42 +113,38 @@ ui = servicos['ui']
 formatador = servicos['formatador']
 chat_analyzer = servicos['chat']
 
+# Agendador de sorteios: uma thread por servidor, sincroniza o histórico e
+# pré-calcula as análises. A carga da página nunca espera pela rede
+if settings.AGENDADOR_ATIVO:
+    AgendadorSorteios.iniciar_em_thread(ai=ai)
+else:
+    # Sem agendador: sincronização incremental em segundo plano
+    threading.Thread(target=api.sincronizar, name="sincronizacao", daemon=True).start()
+
 # ============================================
 # FUNÇÕES AUXILIARES
 # ============================================
 
 def carregar_ultimo_concurso():
-    """Carrega o último concurso da API"""
+    """Carrega o último concurso (sincroniza só o que falta no histórico)"""
     with st.spinner("🔄 Buscando último resultado..."):
-        # Certifique-se que 'api' está definido
-        dados = api.buscar_concurso("latest")
+        relatorio = api.sincronizar(forcar=True)
+        numero_concurso = relatorio.get("ultimo_publicado")
+        dezenas = api.buscar_por_numero(numero_concurso) if numero_concurso else []
         
-        if dados:
-            # Processa dezenas - AGORA DEVE FUNCIONAR
-            dezenas = api.processar_dezenas(dados)
-            numero_concurso = dados.get('concurso') or dados.get('numero')
-            
-            # Salva no histórico
-            api.salvar_historico(dezenas, numero_concurso)
-            
-            # Busca anterior para comparação
-            dezenas_anterior = []
-            if numero_concurso and str(numero_concurso).isdigit():
-                try:
-                    num_anterior = int(str(numero_concurso)) - 1
-                    dados_anterior = api.buscar_concurso(str(num_anterior))
-                    if dados_anterior:
-                        dezenas_anterior = api.processar_dezenas(dados_anterior)
-                        api.salvar_historico(dezenas_anterior, num_anterior)
-                except:
-                    pass
+        if dezenas:
+            # Anterior para comparação
+            dezenas_anterior = api.buscar_por_numero(int(numero_concurso) - 1)
             
             # Salva no session_state
             st.session_state.dez = dezenas
             st.session_state.conc = numero_concurso
             st.session_state.ant = dezenas_anterior
             
-            st.success(f"✅ Concurso {numero_concurso} carregado e salvo no histórico!")
+            if relatorio["adicionados"]:
+                st.success(f"✅ Concurso {numero_concurso} carregado! Novos no histórico: {len(relatorio['adicionados'])}")
+            else:
+                st.success(f"✅ Concurso {numero_concurso} carregado (histórico já atualizado)")
             st.rerun()
         else:
             st.error("❌ Erro ao buscar dados da API")
@@ -232,7 +232,36 @@ with st.sidebar:
                         st.rerun()
                     else:
                         st.error("Concurso não encontrado")
-    
+
+    # Busca por dezenas (índice invertido do histórico)
+    with st.expander("🧩 Concursos por dezenas"):
+        busca_com = st.text_input("Com todas as dezenas:", placeholder="3 7", key="busca_com")
+        busca_sem = st.text_input("Sem nenhuma das dezenas:", placeholder="15", key="busca_sem")
+        busca_grupo = st.text_input("Grupo de dezenas:", placeholder="até 25 dezenas", key="busca_grupo")
+        busca_minimo = st.number_input("Mínimo do grupo:", min_value=1, max_value=15,
+                                       value=10, key="busca_minimo")
+        col_data1, col_data2 = st.columns(2)
+        with col_data1:
+            busca_inicio = st.date_input("De:", value=None, key="busca_inicio")
+        with col_data2:
+            busca_fim = st.date_input("Até:", value=None, key="busca_fim")
+
+        if st.button("Buscar concursos", use_container_width=True, key="btn_busca_dezenas"):
+            grupo = formatador.parse_dezenas_manual(busca_grupo)
+            encontrados = api.indice_invertido().consultar(
+                incluir=formatador.parse_dezenas_manual(busca_com),
+                excluir=formatador.parse_dezenas_manual(busca_sem),
+                pelo_menos=(grupo, busca_minimo) if grupo else None,
+                inicio=busca_inicio,
+                fim=busca_fim,
+            )
+            if len(encontrados):
+                st.success(f"✅ {len(encontrados)} concursos")
+                recentes = encontrados[::-1][:20]
+                st.caption("Mais recentes: " + ", ".join(map(str, recentes)))
+            else:
+                st.info("Nenhum concurso encontrado")
+
     st.markdown("---")
     
     # Entrada manual
@@ -359,8 +388,16 @@ else:
     
     st.subheader("📈 Métricas de Performance")
     
-    # Calcular KPIs
-    kpis = kpi_calc.calcular(dezenas, dezenas_anterior)
+    # Calcular KPIs (usa a análise pré-calculada pelo agendador, se houver)
+    analise_pronta = AgendadorSorteios.obter_analise(numero_concurso)
+    if not analise_pronta or analise_pronta["dezenas"] != dezenas \
+            or analise_pronta["anterior"] != dezenas_anterior:
+        analise_pronta = None
+    kpis = analise_pronta["kpis"] if analise_pronta else CacheProcesso.analise(
+        numero_concurso, "kpis",
+        lambda: kpi_calc.calcular(dezenas, dezenas_anterior),
+        detalhe=(tuple(dezenas), tuple(dezenas_anterior))
+    )
     
     # Métricas em colunas
     col1, col2, col3, col4 = st.columns(4)
@@ -463,8 +500,9 @@ else:
     st.markdown("---")
     st.subheader("🤖 Análise com Inteligência Artificial")
     
-    # Botão para análise
-    if st.button("🧠 EXECUTAR ANÁLISE PROFISSIONAL", 
+    # Análise pré-calculada pelo agendador aparece direto; senão, botão
+    ia_pronta = (analise_pronta or {}).get("ia")
+    if ia_pronta or st.button("🧠 EXECUTAR ANÁLISE PROFISSIONAL", 
                 type="primary",
                 use_container_width=True,
                 key="btn_ia"):
@@ -477,7 +515,10 @@ else:
             }
             
             try:
-                veredito, motor = ai.analisar_concurso(dados_analise)
+                if ia_pronta:
+                    veredito, motor = ia_pronta["texto"], ia_pronta["motor"]
+                else:
+                    veredito, motor = ai.analisar_concurso(dados_analise)
                 
                 # Exibir resultado
                 st.markdown(f"""
@@ -554,7 +595,109 @@ else:
         # Botão para copiar palpite
         palpite_str = " ".join(f"{n:02d}" for n in st.session_state.jogo_gerado)
         st.code(palpite_str, language="text")
-    
+
+    with st.expander("🎯 Fechamento (desdobramento com garantia)"):
+        dezenas_fechamento = st.multiselect(
+            "Escolha de 16 a 20 dezenas:", list(range(1, 26)),
+            default=sorted(dezenas), key="dezenas_fechamento"
+        )
+        col_fech1, col_fech2 = st.columns(2)
+        with col_fech1:
+            garantia_fechamento = st.selectbox("Garantir (pontos):", [11, 12, 13, 14], index=2,
+                                               key="garantia_fechamento")
+        with col_fech2:
+            # Só as condições cuja matriz de cobertura cabe no limite de memória
+            condicoes = condicoes_viaveis(len(dezenas_fechamento), [15, 14, 13, 12, 11]) or [15]
+            condicao_fechamento = st.selectbox("Se acertar (das escolhidas):", condicoes,
+                                               key="condicao_fechamento")
+            if len(condicoes) < 5 and len(dezenas_fechamento) <= MAXIMO_DEZENAS:
+                st.caption(f"Com {len(dezenas_fechamento)} dezenas, condição mínima: {min(condicoes)}")
+        fixos_disponiveis = st.session_state.get("fixos", [])
+        usar_fixos = st.checkbox(
+            f"Usar os fixos do palpite 5-5-5 {fixos_disponiveis}" if fixos_disponiveis
+            else "Usar os fixos do palpite 5-5-5 (gere um palpite antes)",
+            value=False, disabled=not fixos_disponiveis, key="usar_fixos_fechamento"
+        )
+
+        if st.button("🎯 Gerar fechamento", use_container_width=True, key="btn_fechamento"):
+            try:
+                with st.spinner("Calculando fechamento..."):
+                    fechamento = gerador.gerar_fechamento(
+                        dezenas_fechamento,
+                        garantia=garantia_fechamento,
+                        condicao=max(condicao_fechamento, garantia_fechamento),
+                        fixos=fixos_disponiveis if usar_fixos else None,
+                    )
+            except ValueError as e:
+                st.error(f"❌ {e}")
+            else:
+                verificacao = fechamento["garantia"]
+                if verificacao["cumprida"]:
+                    st.success(
+                        f"✅ {fechamento['quantidade']} bilhetes garantem {verificacao['garantia']} pontos "
+                        f"se {verificacao['condicao']} das dezenas escolhidas forem sorteadas"
+                    )
+                else:
+                    st.warning(
+                        f"⚠️ Garantia parcial: {verificacao['fracao']:.1%} dos casos "
+                        f"(mínimo de {verificacao['minimo']} pontos)"
+                    )
+                st.caption(
+                    f"Guloso: {fechamento['quantidade_guloso']} → busca local: "
+                    f"{fechamento['quantidade']} bilhetes em {fechamento['segundos']}s"
+                )
+                st.code("\n".join(formatador.dezenas_para_texto(j) for j in fechamento["jogos"]),
+                        language="text")
+
+    # ============================================
+    # 5.1 CONFERÊNCIA DE BOLÃO (EM LOTE)
+    # ============================================
+
+    st.markdown("---")
+    st.subheader("🧾 Conferência de Bolão")
+
+    arquivo_bolao = st.file_uploader(
+        "Arquivo com os bilhetes (um por linha; .txt, .csv ou máscaras .npy):",
+        type=["txt", "csv", "npy"],
+        key="upload_bolao"
+    )
+    col_conf1, col_conf2 = st.columns(2)
+    with col_conf1:
+        coluna_bolao = st.text_input("Coluna das dezenas (CSV, opcional):", key="coluna_bolao")
+    with col_conf2:
+        incluir_anterior = st.checkbox("Conferir também o concurso anterior",
+                                       value=False, key="conf_anterior")
+
+    if arquivo_bolao is not None and st.button("✅ Conferir bilhetes", use_container_width=True,
+                                               key="btn_conferir"):
+        sorteios = {str(numero_concurso): dezenas}
+        if incluir_anterior and dezenas_anterior:
+            sorteios["anterior"] = dezenas_anterior
+
+        with st.spinner("Conferindo..."):
+            conferido = ConferenciaLote.conferir(
+                arquivo_bolao, sorteios,
+                coluna=coluna_bolao.strip() or None,
+                guardar_premiados=True, limite_premiados=1000
+            )
+
+        st.caption(
+            f"{conferido['bilhetes']:,} bilhetes conferidos "
+            f"({conferido['invalidos']:,} linhas ignoradas)".replace(",", ".")
+        )
+        for rotulo, total in conferido["sorteios"].items():
+            st.markdown(f"**Concurso {rotulo}**")
+            colunas_faixa = st.columns(5)
+            for coluna_faixa, (faixa, quantidade) in zip(colunas_faixa, total["faixas"].items()):
+                coluna_faixa.metric(f"{faixa} acertos", quantidade)
+
+        if conferido["premiados"]:
+            st.dataframe(pd.DataFrame([
+                {"linha": p["linha"], "dezenas": formatador.dezenas_para_texto(p["dezenas"]),
+                 **{f"acertos {r}": a for r, a in p["acertos"].items()}}
+                for p in conferido["premiados"]
+            ]), use_container_width=True)
+
     # ============================================
     # 6. VISUALIZAÇÕES GRÁFICAS
     # ============================================
@@ -10,6 +10,30 @@ class Settings:
     RAPID_API_HOST = os.getenv("RAPID_API_HOST", "")
     GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", " ")
     
+    # Armazenamento do histórico: "csv" (padrão), "binario" ou "sqlite"
+    HISTORICO_BACKEND = os.getenv("HISTORICO_BACKEND", "csv")
+    
+    # HTTP / cache da API de resultados
+    HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "16"))
+    CACHE_TTL_LATEST = int(os.getenv("CACHE_TTL_LATEST", "300"))
+    
+    # Cache do processo: máximo de análises derivadas mantidas (LRU)
+    CACHE_ANALISES_MAX = int(os.getenv("CACHE_ANALISES_MAX", "256"))
+    
+    # Sincronização incremental: intervalo mínimo entre consultas (s) e máximo de concursos novos por vez
+    SYNC_INTERVALO = int(os.getenv("SYNC_INTERVALO", "600"))
+    SYNC_MAXIMO_LACUNAS = int(os.getenv("SYNC_MAXIMO_LACUNAS", "100"))
+    # Falha no 'latest': espera dobra a cada falha seguida, até o máximo (s)
+    SYNC_BACKOFF_MAXIMO = int(os.getenv("SYNC_BACKOFF_MAXIMO", "3600"))
+    # Prazo total (s) para confirmar 404 dos concursos sem resposta
+    SYNC_PRAZO_CONFIRMACAO = float(os.getenv("SYNC_PRAZO_CONFIRMACAO", "15"))
+    
+    # Agendador em segundo plano (sorteios de segunda a sábado; 0 = segunda)
+    AGENDADOR_ATIVO = os.getenv("AGENDADOR_ATIVO", "true").lower() in ("1", "true", "sim")
+    AGENDADOR_INTERVALO = int(os.getenv("AGENDADOR_INTERVALO", "300"))
+    AGENDADOR_INTERVALO_OCIOSO = int(os.getenv("AGENDADOR_INTERVALO_OCIOSO", "3600"))
+    DIAS_SORTEIO = [int(d) for d in os.getenv("DIAS_SORTEIO", "0,1,2,3,4,5").split(",")]
+    
     # URLs
     LOTERIA_API_URL = "https://loteriascaixa-api.herokuapp.com/api/lotofacil"
     DEEPSEEK_API_URL = "https://deepseek-v31.p.rapidapi.com/"
@@ -6,17 +6,31 @@ cálculo de KPIs e análise de chat.
 """
 
 from .loteria_api import LoteriaAPI
+from .loteria_api_async import LoteriaAPIAsync
 from .ai_engine import AIEngine
 from .generator import JogoGenerator
 from .kpi_calculator import KPICalculator
 from .chat_analyzer import ChatAnalyzer
+from .mascara import Mascara
+from .indice_combinacoes import IndiceCombinacoes
+from .ranking import RankingCombinatorio
+from .amostrador import AmostradorRestrito
+from .filtros import Filtro
+from .cache_processo import CacheProcesso
 
 __all__ = [
     "LoteriaAPI",
+    "LoteriaAPIAsync",
     "AIEngine",
     "JogoGenerator",
     "KPICalculator",
     "ChatAnalyzer",
+    "Mascara",
+    "IndiceCombinacoes",
+    "RankingCombinatorio",
+    "AmostradorRestrito",
+    "Filtro",
+    "CacheProcesso",
 ]
 
 __version__ = "2.2.0"
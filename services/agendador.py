@@ -0,0 +1,214 @@
+# services/agendador.py
+import json
+import os
+import threading
+from collections.abc import Sequence
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from config import settings
+from services.kpi_calculator import KPICalculator
+from services.loteria_api import LoteriaAPI
+
+# =============================
+# PATHS COMPATÍVEIS COM CLOUD
+# =============================
+BASE_DIR = Path(__file__).resolve().parent.parent
+DATA_DIR = BASE_DIR / "data"
+ANALISES_DIR = DATA_DIR / "analises"
+
+_agendador: Optional["AgendadorSorteios"] = None
+_agendador_lock = threading.Lock()
+
+
+class AgendadorSorteios:
+    """
+    Verificação periódica de novos concursos em segundo plano.
+    Quando um sorteio novo aparece, salva no histórico e pré-calcula KPIs,
+    estatísticas completas, frequências e a análise de IA em um cache em
+    disco compartilhado (um arquivo por concurso). As sessões só leem.
+    """
+
+    # Cache em memória das análises já lidas: concurso -> (mtime, análise)
+    _memoria: Dict[str, tuple] = {}
+
+    def __init__(self, api: Optional[LoteriaAPI] = None, ai=None,
+                 intervalo: float = settings.AGENDADOR_INTERVALO,
+                 intervalo_ocioso: float = settings.AGENDADOR_INTERVALO_OCIOSO,
+                 dias_sorteio: List[int] = settings.DIAS_SORTEIO,
+                 diretorio: Path = ANALISES_DIR):
+        self.api = api or LoteriaAPI()
+        self._ai = ai
+        self.intervalo = intervalo
+        self.intervalo_ocioso = intervalo_ocioso
+        self.dias_sorteio = set(dias_sorteio)
+        self.diretorio = Path(diretorio)
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        self._parar = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self.ultima_verificacao: Optional[Dict[str, Any]] = None
+
+    @property
+    def ai(self):
+        # Criado sob demanda: o cliente de IA só é necessário ao pré-aquecer
+        if self._ai is None:
+            from services.ai_engine import AIEngine
+            self._ai = AIEngine()
+        return self._ai
+
+    # =============================
+    # CICLO
+    # =============================
+    def verificar(self) -> Dict[str, Any]:
+        """Uma rodada: sincroniza o histórico e pré-calcula o que falta."""
+        relatorio = self.api.sincronizar(forcar=True)
+        concursos = list(relatorio["adicionados"])
+        ultimo = relatorio.get("ultimo_publicado")
+        if ultimo and ultimo not in concursos and not self._caminho(ultimo).exists():
+            concursos.append(ultimo)
+
+        # Só os mais recentes interessam às sessões
+        preaquecidos = [c for c in sorted(concursos)[-2:] if self.preaquecer(c)]
+        self.ultima_verificacao = {
+            **relatorio,
+            "preaquecidos": preaquecidos,
+            "em": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        return self.ultima_verificacao
+
+    def executar(self):
+        """Laço até parar(); mais frequente em dias de sorteio."""
+        while not self._parar.is_set():
+            try:
+                self.verificar()
+            except Exception as e:
+                self.ultima_verificacao = {"erro": str(e)}
+            espera = (
+                self.intervalo if datetime.now().weekday() in self.dias_sorteio
+                else self.intervalo_ocioso
+            )
+            self._parar.wait(espera)
+
+    def parar(self):
+        self._parar.set()
+
+    @classmethod
+    def iniciar_em_thread(cls, **kwargs) -> "AgendadorSorteios":
+        """Inicia uma única thread daemon por processo (servidor)."""
+        global _agendador
+        with _agendador_lock:
+            if _agendador is None or not _agendador.thread.is_alive():
+                _agendador = cls(**kwargs)
+                _agendador.thread = threading.Thread(
+                    target=_agendador.executar, name="agendador-sorteios", daemon=True
+                )
+                _agendador.thread.start()
+            return _agendador
+
+    # =============================
+    # PRÉ-CÁLCULO
+    # =============================
+    def preaquecer(self, concurso: int) -> bool:
+        dezenas = self.api.buscar_por_numero(concurso)
+        if len(dezenas) != settings.NUMEROS_SORTEIO:
+            return False
+
+        anterior = self.api.buscar_por_numero(int(concurso) - 1)
+        kpis = KPICalculator.calcular(dezenas, anterior)
+        try:
+            texto, motor = self.ai.analisar_concurso({
+                **kpis, "dezenas": dezenas, "concurso": concurso
+            })
+            ia = {"texto": texto, "motor": motor}
+        except Exception:
+            ia = None
+
+        self._gravar(concurso, {
+            "concurso": concurso,
+            "dezenas": dezenas,
+            "anterior": anterior,
+            "kpis": kpis,
+            "estatisticas": self.api.obter_estatisticas_completas(dezenas, concurso),
+            "frequencia": self._frequencias(),
+            "ia": ia,
+            "gerado_em": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        })
+        return True
+
+    def _frequencias(self) -> Dict[str, Any]:
+        indice = self.api.indice_frequencia()
+        return {
+            "contagem": indice.frequencia(),
+            "janelas": {j: indice.frequencia(j) for j in indice.janelas},
+            "quentes": indice.quentes(5),
+            "frios": indice.frios(5),
+            "atrasos": {n: indice.atraso(n) for n in range(1, 26)},
+            "concursos": indice.sorteios,
+        }
+
+    # =============================
+    # CACHE COMPARTILHADO
+    # =============================
+    def _caminho(self, concurso: Any) -> Path:
+        return self.diretorio / f"concurso_{concurso}.json"
+
+    def _gravar(self, concurso: Any, analise: Dict[str, Any]):
+        destino = self._caminho(concurso)
+        temporario = destino.with_name(f"{destino.name}.{os.getpid()}.tmp")
+        temporario.write_text(json.dumps(analise, default=_para_json), encoding="utf-8")
+        os.replace(temporario, destino)
+
+    @classmethod
+    def obter_analise(cls, concurso: Any,
+                      diretorio: Path = ANALISES_DIR) -> Optional[Dict[str, Any]]:
+        """Análise pré-calculada do concurso (None se ainda não existir)."""
+        caminho = Path(diretorio) / f"concurso_{concurso}.json"
+        try:
+            mtime = caminho.stat().st_mtime_ns
+        except OSError:
+            return None
+
+        chave = str(caminho)
+        em_memoria = cls._memoria.get(chave)
+        if em_memoria and em_memoria[0] == mtime:
+            return em_memoria[1]
+        try:
+            analise = json.loads(caminho.read_text(encoding="utf-8"), object_hook=_chaves_numericas)
+        except (OSError, ValueError):
+            return None
+        cls._memoria[chave] = (mtime, analise)
+        return analise
+
+
+def _para_json(valor: Any) -> Any:
+    """Tipos das análises que o json não serializa sozinho."""
+    if isinstance(valor, np.generic):
+        return valor.item()
+    if isinstance(valor, np.ndarray):
+        return valor.tolist()
+    if isinstance(valor, (set, frozenset)):
+        return sorted(valor)
+    if isinstance(valor, Sequence):
+        return list(valor)
+    raise TypeError(f"{type(valor).__name__} não serializável")
+
+
+def _chaves_numericas(objeto: Dict[str, Any]) -> Dict[Any, Any]:
+    """Dezenas, janelas e concursos voltam a ser chaves int (o json grava str)."""
+    return {int(k) if k.isdigit() else k: v for k, v in objeto.items()}
+
+if __name__ == "__main__":
+    import sys
+
+    agendador = AgendadorSorteios()
+    if "--uma-vez" in sys.argv:
+        print(agendador.verificar())
+    else:
+        print("⏰ Agendador de sorteios em execução (Ctrl+C para sair)")
+        try:
+            agendador.executar()
+        except KeyboardInterrupt:
+            agendador.parar()
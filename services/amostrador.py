@@ -0,0 +1,92 @@
+# services/amostrador.py
+import threading
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from services.indice_combinacoes import IndiceCombinacoes, Faixa
+from services.mascara import mascaras_para_matriz
+
+
+class AmostradorRestrito:
+    """
+    Amostragem uniforme e exata de jogos sob restrições de KPI.
+    As restrições são resolvidas uma única vez sobre o IndiceCombinacoes;
+    cada jogo sorteado custa O(1), sem rejeição.
+    """
+
+    # LRU pequeno: cada amostrador guarda até ~26 MB de posições e as
+    # restrições vêm do usuário (UI, GeradorMassa)
+    _cache: "OrderedDict[Tuple, AmostradorRestrito]" = OrderedDict()
+    _lock = threading.Lock()
+    maximo_cache = 8
+
+    def __init__(self,
+                 fixas: Iterable[int] = (),
+                 excluidas: Iterable[int] = (),
+                 indice: Optional[IndiceCombinacoes] = None,
+                 **faixas: Faixa):
+        """
+        Args:
+            fixas / excluidas: dezenas obrigatórias / proibidas
+            indice: índice de combinações (padrão: instância do processo)
+            faixas: restrições por coluna do índice, ex.: soma=(185, 205),
+                pares=(6, 9), primos=(4, 6), moldura=(7, 10), baixos=5
+        """
+        self.indice = indice or IndiceCombinacoes.obter()
+        self.restricoes = {
+            "fixas": sorted(fixas),
+            "excluidas": sorted(excluidas),
+            **faixas
+        }
+        self.posicoes = self.indice.filtrar(fixas, excluidas, **faixas)
+
+    @classmethod
+    def obter(cls, fixas: Iterable[int] = (), excluidas: Iterable[int] = (),
+              **faixas: Faixa) -> "AmostradorRestrito":
+        """Amostrador reaproveitado por conjunto de restrições (LRU de maximo_cache)."""
+        chave = (tuple(sorted(fixas)), tuple(sorted(excluidas)), tuple(sorted(faixas.items())))
+        with cls._lock:
+            if chave in cls._cache:
+                cls._cache.move_to_end(chave)
+                return cls._cache[chave]
+
+        amostrador = cls(fixas, excluidas, **faixas)
+        with cls._lock:
+            cls._cache[chave] = amostrador
+            cls._cache.move_to_end(chave)
+            while len(cls._cache) > cls.maximo_cache:
+                cls._cache.popitem(last=False)
+        return amostrador
+
+    # =============================
+    # CONTAGEM / AMOSTRAGEM
+    # =============================
+    def contar(self) -> int:
+        """Quantidade exata de jogos que atendem às restrições."""
+        return len(self.posicoes)
+
+    def amostrar(self, quantidade: int,
+                 rng: Optional[np.random.Generator] = None,
+                 sem_reposicao: bool = False) -> np.ndarray:
+        """Sorteia jogos uniformes entre os válidos. Retorna máscaras uint32."""
+        total = self.contar()
+        if total == 0:
+            raise ValueError(f"Nenhum jogo atende às restrições: {self.restricoes}")
+        if sem_reposicao and quantidade > total:
+            raise ValueError(f"Só existem {total} jogos distintos com essas restrições")
+
+        rng = rng or np.random.default_rng()
+        if sem_reposicao:
+            escolhidos = rng.choice(total, size=quantidade, replace=False)
+        else:
+            escolhidos = rng.integers(0, total, size=quantidade)
+        return np.asarray(self.indice.coluna("mascara")[self.posicoes[escolhidos]])
+
+    def amostrar_dezenas(self, quantidade: int,
+                         rng: Optional[np.random.Generator] = None,
+                         sem_reposicao: bool = False) -> List[List[int]]:
+        """Igual a amostrar(), mas no formato List[int] usado no resto do app."""
+        matriz = mascaras_para_matriz(self.amostrar(quantidade, rng, sem_reposicao))
+        return [(np.flatnonzero(linha) + 1).tolist() for linha in matriz]
@@ -0,0 +1,251 @@
+# services/backfill.py
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import pandas as pd
+import requests
+
+from config import settings
+from services.cache_http import obter_sessao
+from services.datas import normalizar_data
+from services.loteria_api import LoteriaAPI, DATA_DIR
+
+CHECKPOINT_PATH = DATA_DIR / "backfill_checkpoint.json"
+
+# Erros HTTP que valem nova tentativa
+_STATUS_TRANSITORIOS = {408, 425, 429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Limitador de taxa (thread-safe): 'taxa' requisições/s, rajadas até 'capacidade'."""
+
+    def __init__(self, taxa: float, capacidade: Optional[float] = None):
+        self.taxa = float(taxa)
+        self.capacidade = float(capacidade or max(1.0, taxa))
+        self._fichas = self.capacidade
+        self._ultimo = time.monotonic()
+        self._lock = threading.Lock()
+
+    def adquirir(self):
+        while True:
+            with self._lock:
+                agora = time.monotonic()
+                self._fichas = min(self.capacidade, self._fichas + (agora - self._ultimo) * self.taxa)
+                self._ultimo = agora
+                if self._fichas >= 1:
+                    self._fichas -= 1
+                    return
+                espera = (1 - self._fichas) / self.taxa
+            time.sleep(espera)
+
+
+class BackfillHistorico:
+    """
+    Preenche o histórico local com todos os concursos oficiais.
+    Usa o endpoint em lote quando disponível; senão busca só as lacunas em
+    paralelo (pool limitado + token bucket + backoff com jitter).
+    O progresso fica em um checkpoint, então uma execução interrompida
+    retoma de onde parou.
+    """
+
+    def __init__(self,
+                 api: Optional[LoteriaAPI] = None,
+                 base_url: str = settings.LOTERIA_API_URL,
+                 trabalhadores: int = 8,
+                 taxa: float = 5.0,
+                 tentativas: int = 5,
+                 backoff_base: float = 0.5,
+                 tamanho_lote: int = 100,
+                 timeout: float = 10,
+                 checkpoint_path: Path = CHECKPOINT_PATH,
+                 sessao: Optional[requests.Session] = None):
+        self.api = api or LoteriaAPI()
+        self.base_url = base_url.rstrip("/")
+        self.trabalhadores = trabalhadores
+        self.limitador = TokenBucket(taxa)
+        self.tentativas = tentativas
+        self.backoff_base = backoff_base
+        self.tamanho_lote = tamanho_lote
+        self.timeout = timeout
+        self.checkpoint_path = Path(checkpoint_path)
+        self.sessao = sessao or obter_sessao()
+
+    # =============================
+    # EXECUÇÃO
+    # =============================
+    def executar(self, inicio: int = 1, fim: Optional[int] = None,
+                 usar_bulk: bool = True,
+                 progresso: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
+        """
+        Args:
+            inicio / fim: faixa de concursos (fim padrão: último publicado)
+            usar_bulk: tenta primeiro o endpoint sem sufixo (todos os concursos)
+            progresso: callback(concluidos, total)
+        Returns:
+            Relatório com concursos salvos, inexistentes e falhas
+        """
+        checkpoint = self._ler_checkpoint()
+        existentes = self._concursos_existentes()
+        relatorio = {"modo": "bulk", "salvos": 0, "inexistentes": [], "falhas": []}
+
+        if usar_bulk:
+            todos = self._buscar_json(self.base_url)
+            if isinstance(todos, list) and todos:
+                registros = [
+                    r for r in map(self._para_registro, todos)
+                    if r and r["concurso"] >= inicio and (fim is None or r["concurso"] <= fim)
+                    and r["concurso"] not in existentes
+                ]
+                for i in range(0, len(registros), self.tamanho_lote):
+                    relatorio["salvos"] += self.api.salvar_historico_lote(
+                        registros[i:i + self.tamanho_lote]
+                    )
+                checkpoint["ultimo_conhecido"] = max(
+                    [r["concurso"] for r in registros] + [checkpoint.get("ultimo_conhecido", 0)]
+                )
+                self._gravar_checkpoint(checkpoint)
+                return relatorio
+
+        relatorio["modo"] = "concorrente"
+        if fim is None:
+            ultimo = self._buscar_json(f"{self.base_url}/latest")
+            registro = self._para_registro(ultimo) if isinstance(ultimo, dict) else None
+            if not registro:
+                relatorio["falhas"].append("latest")
+                return relatorio
+            fim = registro["concurso"]
+
+        inexistentes = set(checkpoint.get("inexistentes", []))
+        faltantes = sorted(set(range(inicio, fim + 1)) - existentes - inexistentes)
+        relatorio["faltantes"] = len(faltantes)
+
+        pendentes: List[Dict] = []
+        concluidos = 0
+        with ThreadPoolExecutor(max_workers=self.trabalhadores) as pool:
+            futuros = {pool.submit(self.situacao_concurso, c): c for c in faltantes}
+            for futuro in as_completed(futuros):
+                concurso = futuros[futuro]
+                status, registro = futuro.result()
+                if status == "ok":
+                    pendentes.append(registro)
+                elif status == "inexistente":
+                    inexistentes.add(concurso)
+                    relatorio["inexistentes"].append(concurso)
+                else:
+                    relatorio["falhas"].append(concurso)
+
+                concluidos += 1
+                if len(pendentes) >= self.tamanho_lote:
+                    relatorio["salvos"] += self._descarregar(pendentes, checkpoint, inexistentes, fim)
+                if progresso:
+                    progresso(concluidos, len(faltantes))
+
+        relatorio["salvos"] += self._descarregar(pendentes, checkpoint, inexistentes, fim)
+        relatorio["falhas"].sort()
+        relatorio["inexistentes"].sort()
+        return relatorio
+
+    def _descarregar(self, pendentes: List[Dict], checkpoint: Dict,
+                     inexistentes: Set[int], fim: int) -> int:
+        """Grava o lote no histórico e atualiza o checkpoint."""
+        salvos = self.api.salvar_historico_lote(pendentes)
+        pendentes.clear()
+        checkpoint["inexistentes"] = sorted(inexistentes)
+        checkpoint["ultimo_conhecido"] = max(fim, checkpoint.get("ultimo_conhecido", 0))
+        self._gravar_checkpoint(checkpoint)
+        return salvos
+
+    # =============================
+    # HTTP
+    # =============================
+    def situacao_concurso(self, concurso: int) -> Tuple[str, Optional[Dict]]:
+        """
+        ('ok', registro), ('inexistente', None) só com 404 confirmado, ou
+        ('falha', None) para timeouts, 429, 5xx e respostas inválidas.
+        """
+        try:
+            dados = self._buscar_json(f"{self.base_url}/{concurso}", levantar_404=True)
+        except LookupError:
+            return "inexistente", None
+        registro = self._para_registro(dados) if isinstance(dados, dict) else None
+        return ("ok", registro) if registro else ("falha", None)
+
+    def _buscar_json(self, url: str, levantar_404: bool = False) -> Any:
+        """GET com token bucket e retry exponencial com jitter total."""
+        for tentativa in range(self.tentativas):
+            self.limitador.adquirir()
+            try:
+                resposta = self.sessao.get(url, timeout=self.timeout)
+                if resposta.status_code == 404:
+                    if levantar_404:
+                        raise LookupError(url)
+                    return None
+                if resposta.status_code not in _STATUS_TRANSITORIOS:
+                    resposta.raise_for_status()
+                    return resposta.json()
+            except (requests.ConnectionError, requests.Timeout):
+                pass
+            except (requests.HTTPError, ValueError):
+                return None
+
+            time.sleep(random.uniform(0, self.backoff_base * 2 ** tentativa))
+        return None
+
+    # =============================
+    # AUXILIARES
+    # =============================
+    def _para_registro(self, dados: Dict) -> Optional[Dict]:
+        dezenas = self.api.processar_dezenas(dados)
+        concurso = dados.get("concurso") or dados.get("numero")
+        if len(dezenas) != 15 or not str(concurso).isdigit():
+            return None
+        return {
+            "concurso": int(concurso),
+            "dezenas": dezenas,
+            "data": self._normalizar_data(dados.get("data")),
+        }
+
+    @staticmethod
+    def _normalizar_data(data: Optional[str]) -> Optional[str]:
+        """Data do sorteio ('dd/mm/aaaa' ou ISO) no formato do histórico."""
+        return normalizar_data(data)
+
+    def _concursos_existentes(self) -> Set[int]:
+        return self.api.concursos_salvos()
+
+    def _ler_checkpoint(self) -> Dict:
+        try:
+            return json.loads(self.checkpoint_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _gravar_checkpoint(self, checkpoint: Dict):
+        checkpoint["atualizado_em"] = pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S")
+        temporario = self.checkpoint_path.with_suffix(".tmp")
+        temporario.write_text(json.dumps(checkpoint, ensure_ascii=False), encoding="utf-8")
+        temporario.replace(self.checkpoint_path)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Backfill do histórico da Lotofácil")
+    parser.add_argument("--inicio", type=int, default=1)
+    parser.add_argument("--fim", type=int, default=None)
+    parser.add_argument("--trabalhadores", type=int, default=8)
+    parser.add_argument("--taxa", type=float, default=5.0, help="requisições por segundo")
+    parser.add_argument("--sem-bulk", action="store_true")
+    parser.add_argument("--url", default=settings.LOTERIA_API_URL)
+    args = parser.parse_args()
+
+    backfill = BackfillHistorico(base_url=args.url, trabalhadores=args.trabalhadores, taxa=args.taxa)
+    relatorio = backfill.executar(
+        args.inicio, args.fim, usar_bulk=not args.sem_bulk,
+        progresso=lambda feitos, total: print(f"\r{feitos}/{total}", end="", flush=True)
+    )
+    print(f"\n✅ Backfill concluído: {relatorio}")
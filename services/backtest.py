@@ -0,0 +1,353 @@
+# services/backtest.py
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from services.mascara import dezenas_para_mascaras, mascaras_para_matriz, popcount
+from services.ranking import RankingCombinatorio
+
+# Concursos por tarefa: cada bloco tem sua própria semente (SeedSequence.spawn),
+# então o resultado não depende da quantidade de processos
+BLOCO_CONCURSOS = 32
+FAIXAS_PREMIO = (11, 12, 13, 14, 15)
+Z_95 = 1.959963984540054
+# Sorteios aleatórios por concurso usados para medir a variância sob a hipótese nula
+SORTEIOS_NULOS = 32
+
+Estrategia = Union[str, Callable[[np.ndarray, int, np.random.Generator], np.ndarray]]
+
+# Histórico do processo trabalhador (definido no initializer do pool)
+_historico_trabalhador: Dict[str, Any] = {}
+
+
+def probabilidade_acertos(acertos: int, marcadas: int = 15, sorteadas: int = 15,
+                          total: int = 25) -> float:
+    """P(um jogo aleatório de 'marcadas' dezenas acertar exatamente 'acertos')."""
+    return (math.comb(marcadas, acertos) * math.comb(total - marcadas, sorteadas - acertos)
+            / math.comb(total, sorteadas))
+
+
+def intervalo_wilson(sucessos: float, n: float, z: float = Z_95) -> Tuple[float, float]:
+    """Intervalo de confiança de Wilson para uma proporção."""
+    if n == 0:
+        return 0.0, 1.0
+    p = sucessos / n
+    denominador = 1 + z * z / n
+    centro = (p + z * z / (2 * n)) / denominador
+    margem = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denominador
+    return max(0.0, centro - margem), min(1.0, centro + margem)
+
+
+def efeito_desenho(quantidade: int, quadrados: float, variancia_nula: float,
+                   concursos: int, bilhetes: int, esperado: float) -> float:
+    """
+    Quanto a correlação entre os bilhetes de um concurso aumenta a variância
+    da contagem por concurso em relação a bilhetes independentes (mínimo 1).
+    Usa o maior entre o observado (variância entre concursos) e o medido com
+    sorteios aleatórios contra os mesmos bilhetes, que é estável mesmo em
+    faixas raras (contagens muito assimétricas).
+    Args:
+        quantidade / quadrados: soma das contagens por concurso e dos quadrados
+        variancia_nula: soma, por concurso, da variância da contagem sob sorteios aleatórios
+    """
+    if concursos == 0 or bilhetes == 0:
+        return 1.0
+    efeito = 1.0
+    binomial_nula = bilhetes * esperado * (1 - esperado)
+    if binomial_nula > 0:
+        efeito = max(efeito, variancia_nula / concursos / binomial_nula)
+    media = quantidade / (concursos * bilhetes)
+    binomial = bilhetes * media * (1 - media)
+    if concursos > 1 and binomial > 0:
+        entre = (quadrados - quantidade * quantidade / concursos) / (concursos - 1)
+        efeito = max(efeito, entre / binomial)
+    return efeito
+
+
+class Backtest:
+    """
+    Replays de estratégias sobre o histórico.
+    Para cada concurso t, a estratégia só enxerga os concursos anteriores a t,
+    gera K jogos e os acertos são contados por popcount(jogo & sorteio).
+    Os concursos são divididos em blocos entre processos, cada bloco com
+    semente própria derivada da semente principal.
+
+    Estratégias: '555', 'inteligente', 'aleatorio' (uniforme restrito por
+    soma/pares, como em gerar_multiplos_palpites) e 'uniforme' (linha de
+    base: 15 dezenas quaisquer). Também aceita uma função de nível de
+    módulo f(mascaras_anteriores, quantidade, rng) -> máscaras uint32.
+    """
+
+    ESTRATEGIAS = ("555", "inteligente", "aleatorio", "uniforme")
+
+    def __init__(self, mascaras: np.ndarray, concursos: Optional[Sequence[int]] = None):
+        self.mascaras = np.asarray(mascaras, dtype=np.uint32)
+        self.concursos = (
+            np.asarray(concursos, dtype=np.int64) if concursos is not None
+            else np.arange(1, len(self.mascaras) + 1)
+        )
+
+    @classmethod
+    def do_historico(cls, api) -> "Backtest":
+        concursos, mascaras = api.carregar_mascaras()
+        return cls(mascaras, concursos)
+
+    # =============================
+    # EXECUÇÃO
+    # =============================
+    def executar(self, estrategia: Estrategia = "555", bilhetes: int = 1000,
+                 inicio: Optional[int] = None, fim: Optional[int] = None,
+                 minimo_historico: int = 1, semente: Optional[int] = None,
+                 processos: Optional[int] = None,
+                 progresso: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
+        """
+        Args:
+            bilhetes: jogos gerados por concurso
+            inicio / fim: faixa de concursos testados (números de concurso)
+            minimo_historico: concursos anteriores exigidos antes de testar
+            semente: torna o resultado reprodutível (None = aleatória)
+            processos: tamanho do pool (None = CPUs; 1 = sem pool)
+            progresso: callback(blocos_concluidos, total_blocos)
+        Returns:
+            Histograma de acertos, faixas 11-15 com IC de 95% contra a
+            linha de base aleatória e números de desempenho
+        """
+        if isinstance(estrategia, str) and estrategia not in self.ESTRATEGIAS:
+            raise ValueError(f"Estratégia desconhecida: {estrategia}")
+
+        testados = np.arange(len(self.concursos))
+        testados = testados[testados >= minimo_historico]
+        if inicio is not None:
+            testados = testados[self.concursos[testados] >= inicio]
+        if fim is not None:
+            testados = testados[self.concursos[testados] <= fim]
+
+        raiz = np.random.SeedSequence(semente)
+        blocos = [testados[i:i + BLOCO_CONCURSOS] for i in range(0, len(testados), BLOCO_CONCURSOS)]
+        sementes = raiz.spawn(len(blocos))
+        tarefas = [(estrategia, bloco, bilhetes, s) for bloco, s in zip(blocos, sementes)]
+
+        inicio_relogio = time.perf_counter()
+        histograma = np.zeros(16, dtype=np.int64)
+        dispersao = np.zeros((2, 17), dtype=np.float64)
+        premiados = 0
+        processos = processos or os.cpu_count() or 1
+        if processos <= 1 or len(tarefas) <= 1:
+            _definir_historico(self.mascaras)
+            for feitos, tarefa in enumerate(tarefas, 1):
+                parcial, parcial_dispersao, com_premio = _executar_bloco(*tarefa)
+                histograma += parcial
+                dispersao += parcial_dispersao
+                premiados += com_premio
+                if progresso:
+                    progresso(feitos, len(tarefas))
+        else:
+            with ProcessPoolExecutor(max_workers=processos, initializer=_definir_historico,
+                                     initargs=(self.mascaras,)) as pool:
+                futuros = [pool.submit(_executar_bloco, *tarefa) for tarefa in tarefas]
+                for feitos, futuro in enumerate(as_completed(futuros), 1):
+                    parcial, parcial_dispersao, com_premio = futuro.result()
+                    histograma += parcial
+                    dispersao += parcial_dispersao
+                    premiados += com_premio
+                    if progresso:
+                        progresso(feitos, len(tarefas))
+        segundos = time.perf_counter() - inicio_relogio
+
+        return self._relatorio(estrategia, histograma, dispersao, len(testados), bilhetes,
+                               premiados, segundos, processos, raiz.entropy)
+
+    def comparar(self, estrategias: Sequence[Estrategia] = ESTRATEGIAS,
+                 **kwargs) -> Dict[str, Dict[str, Any]]:
+        """Roda várias estratégias com os mesmos parâmetros e semente."""
+        return {_nome(e): self.executar(e, **kwargs) for e in estrategias}
+
+    # =============================
+    # RELATÓRIO
+    # =============================
+    def _relatorio(self, estrategia: Estrategia, histograma: np.ndarray, dispersao: np.ndarray,
+                   concursos: int, bilhetes: int, premiados: int, segundos: float,
+                   processos: int, semente: int) -> Dict[str, Any]:
+        total = int(histograma.sum())
+        faixas = {
+            acertos: self._faixa(int(histograma[acertos]), dispersao[:, acertos], concursos,
+                                 bilhetes, probabilidade_acertos(acertos))
+            for acertos in FAIXAS_PREMIO
+        }
+        premio = self._faixa(
+            int(histograma[11:].sum()), dispersao[:, 16], concursos, bilhetes,
+            sum(probabilidade_acertos(a) for a in FAIXAS_PREMIO)
+        )
+        media = float((histograma * np.arange(16)).sum() / total) if total else 0.0
+        return {
+            "estrategia": _nome(estrategia),
+            "concursos": concursos,
+            "bilhetes_por_concurso": bilhetes,
+            "total_bilhetes": total,
+            "histograma": {a: int(histograma[a]) for a in range(16)},
+            "faixas": faixas,
+            "premiados": premio,
+            "concursos_com_premio": {
+                "quantidade": premiados,
+                "taxa": round(premiados / concursos, 4) if concursos else 0.0,
+            },
+            "media_acertos": round(media, 4),
+            "media_aleatoria": 15 * 15 / 25,
+            "semente": semente,
+            "desempenho": {
+                "segundos": round(segundos, 3),
+                "bilhetes_por_segundo": round(total / segundos) if segundos else None,
+                "concursos_por_segundo": round(concursos / segundos, 1) if segundos else None,
+                "processos": processos,
+            },
+        }
+
+    @staticmethod
+    def _faixa(quantidade: int, dispersao: np.ndarray, concursos: int, bilhetes: int,
+               esperado: float) -> Dict[str, Any]:
+        """
+        Taxa observada, IC de Wilson (95%) e comparação com o aleatório.
+        Os bilhetes de um mesmo concurso dividem o sorteio (são correlacionados),
+        então o IC usa o tamanho efetivo: total / efeito de desenho.
+        """
+        total = concursos * bilhetes
+        taxa = quantidade / total if total else 0.0
+        quadrados, variancia_nula = dispersao
+        efeito = efeito_desenho(quantidade, float(quadrados), float(variancia_nula),
+                                concursos, bilhetes, esperado)
+        baixo, alto = intervalo_wilson(taxa * total / efeito, total / efeito)
+        if baixo > esperado:
+            veredito = "acima do aleatório"
+        elif alto < esperado:
+            veredito = "abaixo do aleatório"
+        else:
+            veredito = "compatível com o aleatório"
+        return {
+            "quantidade": quantidade,
+            "taxa": taxa,
+            "ic95": (baixo, alto),
+            "esperado_aleatorio": esperado,
+            "razao": round(taxa / esperado, 4) if esperado else 0.0,
+            "efeito_desenho": round(efeito, 3),
+            "veredito": veredito,
+        }
+
+
+def _nome(estrategia: Estrategia) -> str:
+    return estrategia if isinstance(estrategia, str) else getattr(estrategia, "__name__", "custom")
+
+
+# =============================
+# TRABALHADORES
+# =============================
+def _definir_historico(mascaras: np.ndarray):
+    """Prepara o histórico uma vez por processo (dezenas e frequências acumuladas)."""
+    global _historico_trabalhador
+    matriz = mascaras_para_matriz(mascaras)
+    prefixo = np.zeros((len(mascaras) + 1, 25), dtype=np.int64)
+    np.cumsum(matriz, axis=0, out=prefixo[1:])
+    _historico_trabalhador = {
+        "mascaras": mascaras,
+        "dezenas": [(np.flatnonzero(linha) + 1).tolist() for linha in matriz],
+        "frequencia": prefixo,
+    }
+
+
+def _executar_bloco(estrategia: Estrategia, posicoes: np.ndarray, bilhetes: int,
+                    semente: np.random.SeedSequence) -> Tuple[np.ndarray, np.ndarray, int]:
+    """
+    Histograma de acertos (0-15), dispersão por concurso e concursos com
+    algum prêmio. Dispersão (2 x 17; colunas 0-15 e 16 = premiados):
+    soma dos quadrados das contagens e soma das variâncias das contagens
+    contra SORTEIOS_NULOS sorteios aleatórios.
+    """
+    mascaras = _historico_trabalhador["mascaras"]
+    rng = np.random.default_rng(semente)
+    rng_py = random.Random(int(semente.generate_state(1, np.uint64)[0]))
+
+    histograma = np.zeros(16, dtype=np.int64)
+    dispersao = np.zeros((2, 17), dtype=np.float64)
+    deslocamentos = (np.arange(SORTEIOS_NULOS) * 16)[:, None]
+    com_premio = 0
+    for posicao in posicoes:
+        jogos = _gerar_jogos(estrategia, int(posicao), bilhetes, rng, rng_py)
+        acertos = popcount(jogos & mascaras[posicao])
+        contagem = np.bincount(acertos, minlength=16)
+        histograma += contagem
+        dispersao[0, :16] += contagem.astype(np.float64) ** 2
+        dispersao[0, 16] += float(contagem[FAIXAS_PREMIO[0]:].sum()) ** 2
+        com_premio += bool(acertos.max(initial=0) >= FAIXAS_PREMIO[0])
+
+        # Mesmos bilhetes contra sorteios aleatórios: variância sob a hipótese nula
+        nulos = RankingCombinatorio.unrank_mascaras(RankingCombinatorio.amostrar(SORTEIOS_NULOS, rng))
+        acertos_nulos = popcount(jogos[None, :] & nulos[:, None]) + deslocamentos
+        contagens_nulas = np.bincount(acertos_nulos.ravel(), minlength=16 * SORTEIOS_NULOS)
+        contagens_nulas = contagens_nulas.reshape(SORTEIOS_NULOS, 16).astype(np.float64)
+        dispersao[1, :16] += contagens_nulas.var(axis=0, ddof=1)
+        dispersao[1, 16] += contagens_nulas[:, FAIXAS_PREMIO[0]:].sum(axis=1).var(ddof=1)
+    return histograma, dispersao, com_premio
+
+
+def _gerar_jogos(estrategia: Estrategia, posicao: int, quantidade: int,
+                 rng: np.random.Generator, rng_py: random.Random) -> np.ndarray:
+    """Jogos (máscaras) da estratégia usando só os concursos antes de 'posicao'."""
+    from services.amostrador import AmostradorRestrito
+    from services.generator import JogoGenerator
+
+    historico = _historico_trabalhador
+    if callable(estrategia):
+        return np.asarray(estrategia(historico["mascaras"][:posicao], quantidade, rng),
+                          dtype=np.uint32)
+
+    if estrategia == "uniforme":
+        escolhidas = rng.random((quantidade, 25)).argpartition(15, axis=1)[:, :15]
+        return np.bitwise_or.reduce(np.uint32(1) << escolhidas.astype(np.uint32), axis=1)
+
+    if estrategia == "aleatorio":
+        return AmostradorRestrito.obter(soma=(160, 220), pares=(4, 11)).amostrar(quantidade, rng)
+
+    if estrategia == "555":
+        ultimo = historico["dezenas"][posicao - 1] if posicao else list(range(1, 16))
+        jogos: List[List[int]] = [
+            JogoGenerator.gerar_555(ultimo, rng_py)[0] for _ in range(quantidade)
+        ]
+    else:
+        anteriores = historico["dezenas"][:posicao]
+        frequencia = historico["frequencia"][posicao]
+        jogos = [
+            JogoGenerator.gerar_palpite_inteligente(
+                anteriores, rng=rng_py, frequencia=frequencia
+            )[0]
+            for _ in range(quantidade)
+        ]
+    return dezenas_para_mascaras(jogos)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from services.loteria_api import LoteriaAPI
+
+    parser = argparse.ArgumentParser(description="Backtest das estratégias sobre o histórico")
+    parser.add_argument("estrategias", nargs="*", default=list(Backtest.ESTRATEGIAS))
+    parser.add_argument("--bilhetes", type=int, default=1000)
+    parser.add_argument("--semente", type=int, default=None)
+    parser.add_argument("--processos", type=int, default=None)
+    args = parser.parse_args()
+
+    backtest = Backtest.do_historico(LoteriaAPI())
+    for nome, r in backtest.comparar(args.estrategias, bilhetes=args.bilhetes,
+                                      semente=args.semente, processos=args.processos).items():
+        premio = r["premiados"]
+        print(
+            f"{nome:12s} {r['concursos']} concursos x {r['bilhetes_por_concurso']} | "
+            f"11-15: {premio['taxa']:.5f} IC95 [{premio['ic95'][0]:.5f}, {premio['ic95'][1]:.5f}] "
+            f"vs {premio['esperado_aleatorio']:.5f} ({premio['veredito']}) | "
+            f"{r['desempenho']['bilhetes_por_segundo']} bilhetes/s"
+        )
+        print("             " + "  ".join(f"{a}: {r['histograma'][a]}" for a in FAIXAS_PREMIO))
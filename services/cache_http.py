@@ -0,0 +1,160 @@
+# services/cache_http.py
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import settings
+
+# =============================
+# PATHS COMPATÍVEIS COM CLOUD
+# =============================
+BASE_DIR = Path(__file__).resolve().parent.parent
+DATA_DIR = BASE_DIR / "data"
+CACHE_API_DIR = DATA_DIR / "cache_api"
+
+_sessao: Optional[requests.Session] = None
+_sessao_lock = threading.Lock()
+
+
+def obter_sessao() -> requests.Session:
+    """Sessão HTTP única do processo (pool de conexões com keep-alive)."""
+    global _sessao
+    with _sessao_lock:
+        if _sessao is None:
+            sessao = requests.Session()
+            adaptador = HTTPAdapter(
+                pool_connections=4, pool_maxsize=settings.HTTP_POOL_MAXSIZE
+            )
+            sessao.mount("http://", adaptador)
+            sessao.mount("https://", adaptador)
+            _sessao = sessao
+        return _sessao
+
+
+class CacheRespostas:
+    """
+    Cache em disco de respostas JSON da API, endereçado pelo SHA-256 da URL.
+    Respostas imutáveis (concursos numerados) nunca expiram; as demais
+    ('latest') valem por 'ttl' segundos e depois são revalidadas com
+    ETag / Last-Modified quando o servidor os fornece. Na memória ficam só
+    as 'maximo_memoria' entradas mais recentes (LRU); o resto é lido do disco.
+    """
+
+    def __init__(self, diretorio: Path = CACHE_API_DIR,
+                 ttl: float = settings.CACHE_TTL_LATEST,
+                 sessao: Optional[requests.Session] = None,
+                 timeout: float = 10,
+                 maximo_memoria: int = 256):
+        self.diretorio = Path(diretorio)
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.sessao = sessao
+        self.timeout = timeout
+        self.maximo_memoria = maximo_memoria
+        self._memoria: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._contadores = {"hits": 0, "misses": 0, "revalidacoes": 0, "erros": 0}
+
+    # =============================
+    # API PRINCIPAL
+    # =============================
+    def obter_json(self, url: str, imutavel: bool) -> Optional[Any]:
+        chave = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        entrada = self._ler(chave)
+
+        if entrada and (imutavel or time.time() - entrada["armazenado_em"] < self.ttl):
+            self._contar("hits")
+            return entrada["corpo"]
+
+        cabecalhos = {}
+        if entrada:
+            if entrada.get("etag"):
+                cabecalhos["If-None-Match"] = entrada["etag"]
+            if entrada.get("last_modified"):
+                cabecalhos["If-Modified-Since"] = entrada["last_modified"]
+
+        try:
+            resposta = (self.sessao or obter_sessao()).get(
+                url, headers=cabecalhos, timeout=self.timeout
+            )
+            if resposta.status_code == 304 and entrada:
+                entrada["armazenado_em"] = time.time()
+                self._gravar(chave, entrada)
+                self._contar("revalidacoes")
+                return entrada["corpo"]
+
+            resposta.raise_for_status()
+            corpo = resposta.json()
+        except Exception:
+            self._contar("erros")
+            # Sem rede: uma cópia vencida é melhor que nada
+            return entrada["corpo"] if entrada else None
+
+        self._gravar(chave, {
+            "url": url,
+            "armazenado_em": time.time(),
+            "etag": resposta.headers.get("ETag"),
+            "last_modified": resposta.headers.get("Last-Modified"),
+            "corpo": corpo,
+        })
+        self._contar("misses")
+        return corpo
+
+    def estatisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._contadores)
+        consultas = stats["hits"] + stats["misses"] + stats["revalidacoes"]
+        stats["taxa_acerto"] = round(
+            (stats["hits"] + stats["revalidacoes"]) / consultas, 4
+        ) if consultas else 0.0
+        return stats
+
+    def limpar(self):
+        with self._lock:
+            self._memoria.clear()
+        for arquivo in self.diretorio.glob("*.json"):
+            arquivo.unlink(missing_ok=True)
+
+    # =============================
+    # ARMAZENAMENTO
+    # =============================
+    def _ler(self, chave: str) -> Optional[Dict]:
+        with self._lock:
+            if chave in self._memoria:
+                self._memoria.move_to_end(chave)
+                return self._memoria[chave]
+        try:
+            entrada = json.loads((self.diretorio / f"{chave}.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        self._lembrar(chave, entrada)
+        return entrada
+
+    def _lembrar(self, chave: str, entrada: Dict):
+        with self._lock:
+            self._memoria[chave] = entrada
+            self._memoria.move_to_end(chave)
+            while len(self._memoria) > self.maximo_memoria:
+                self._memoria.popitem(last=False)
+
+    def _gravar(self, chave: str, entrada: Dict):
+        self._lembrar(chave, entrada)
+        destino = self.diretorio / f"{chave}.json"
+        temporario = destino.with_name(f"{chave}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            temporario.write_text(json.dumps(entrada, ensure_ascii=False), encoding="utf-8")
+            os.replace(temporario, destino)
+        except OSError:
+            temporario.unlink(missing_ok=True)
+
+    def _contar(self, nome: str):
+        with self._lock:
+            self._contadores[nome] += 1
@@ -0,0 +1,153 @@
+# services/cache_processo.py
+import os
+import pickle
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import pandas as pd
+
+from config import settings
+
+
+class CacheProcesso:
+    """
+    Cache compartilhado por todas as sessões do processo.
+    - serviços sem estado: uma instância por processo
+    - histórico já interpretado: invalidado pela versão (mtime/tamanho) do arquivo
+    - análises derivadas: LRU por concurso, invalidadas pela versão do histórico
+    """
+
+    _lock = threading.RLock()
+    _servicos: Dict[str, Any] = {}
+    _historicos: Dict[str, Tuple[Tuple, pd.DataFrame]] = {}
+    _analises: "OrderedDict[Tuple, Tuple[Any, Any]]" = OrderedDict()
+    _contadores = {"hits": 0, "misses": 0, "evictions": 0}
+    maximo_analises = settings.CACHE_ANALISES_MAX
+
+    # =============================
+    # SERVIÇOS
+    # =============================
+    @classmethod
+    def servico(cls, nome: str, fabrica: Callable[[], Any]) -> Any:
+        """Instância única do serviço 'nome' no processo."""
+        instancia = cls._servicos.get(nome)
+        if instancia is None:
+            with cls._lock:
+                instancia = cls._servicos.get(nome)
+                if instancia is None:
+                    instancia = cls._servicos[nome] = fabrica()
+        return instancia
+
+    # =============================
+    # HISTÓRICO
+    # =============================
+    @staticmethod
+    def versao_arquivo(*caminhos: Path) -> Tuple:
+        """(mtime_ns, tamanho) de cada arquivo; muda a cada gravação."""
+        versao = []
+        for caminho in caminhos:
+            try:
+                info = Path(caminho).stat()
+                versao.append((info.st_mtime_ns, info.st_size))
+            except OSError:
+                versao.append(None)
+        return tuple(versao)
+
+    @classmethod
+    def historico(cls, chave: str, versao: Tuple,
+                  carregar: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        """
+        DataFrame do histórico interpretado uma vez por versão.
+        Devolve cópia rasa: o chamador pode incluir/remover colunas sem
+        afetar as outras sessões.
+        """
+        with cls._lock:
+            atual = cls._historicos.get(chave)
+            if atual and atual[0] == versao:
+                cls._contadores["hits"] += 1
+                return atual[1].copy(deep=False)
+
+        df = carregar()
+        with cls._lock:
+            cls._contadores["misses"] += 1
+            cls._historicos[chave] = (versao, df)
+        return df.copy(deep=False)
+
+    # =============================
+    # ANÁLISES (LRU)
+    # =============================
+    @classmethod
+    def analise(cls, concurso: Any, nome: str, calcular: Callable[[], Any],
+                versao: Any = None, detalhe: Hashable = None) -> Any:
+        """
+        Resultado derivado de um concurso (KPIs, estatísticas, etc.).
+        Recalcula se 'versao' (normalmente a versão do histórico) mudou.
+        """
+        chave = (str(concurso), nome, detalhe)
+        with cls._lock:
+            atual = cls._analises.get(chave)
+            if atual and atual[0] == versao:
+                cls._analises.move_to_end(chave)
+                cls._contadores["hits"] += 1
+                return atual[1]
+
+        valor = calcular()
+        with cls._lock:
+            cls._contadores["misses"] += 1
+            cls._analises[chave] = (versao, valor)
+            cls._analises.move_to_end(chave)
+            while len(cls._analises) > cls.maximo_analises:
+                cls._analises.popitem(last=False)
+                cls._contadores["evictions"] += 1
+        return valor
+
+    # =============================
+    # MANUTENÇÃO
+    # =============================
+    @classmethod
+    def limpar(cls, servicos: bool = False):
+        with cls._lock:
+            cls._historicos.clear()
+            cls._analises.clear()
+            if servicos:
+                cls._servicos.clear()
+
+    @classmethod
+    def relatorio_memoria(cls) -> Dict[str, Any]:
+        """Uso estimado de memória por camada (bytes) e contadores."""
+        with cls._lock:
+            historicos = list(cls._historicos.values())
+            analises = list(cls._analises.values())
+            servicos = list(cls._servicos)
+            contadores = dict(cls._contadores)
+
+        bytes_historico = sum(int(df.memory_usage(deep=True).sum()) for _, df in historicos)
+        bytes_analises = 0
+        for _, valor in analises:
+            try:
+                bytes_analises += len(pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL))
+            except Exception:
+                bytes_analises += sys.getsizeof(valor)
+
+        return {
+            "servicos": servicos,
+            "historicos": len(historicos),
+            "bytes_historico": bytes_historico,
+            "analises": len(analises),
+            "maximo_analises": cls.maximo_analises,
+            "bytes_analises": bytes_analises,
+            "rss_bytes": cls._rss(),
+            **contadores,
+        }
+
+    @staticmethod
+    def _rss() -> Optional[int]:
+        """Memória residente do processo (Linux)."""
+        try:
+            paginas = int(Path("/proc/self/statm").read_text().split()[1])
+            return paginas * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError, AttributeError):
+            return None
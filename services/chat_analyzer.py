@@ -1,5 +1,5 @@
 # services/chat_analyzer.py
-from typing import Dict, List
+from typing import Dict, List, Optional
 from services.loteria_api import LoteriaAPI
 
 
@@ -10,8 +10,8 @@ class ChatAnalyzer:
     Seguro para Streamlit Cloud.
     """
 
-    def __init__(self):
-        self.api = LoteriaAPI()
+    def __init__(self, api: Optional[LoteriaAPI] = None):
+        self.api = api or LoteriaAPI()
 
     # =============================
     # ENTRY POINT
@@ -31,6 +31,9 @@ class ChatAnalyzer:
         if any(p in pergunta for p in ["quente", "frio", "frequência"]):
             return self._analisar_frequencia(dezenas)
 
+        if any(p in pergunta for p in ["grupo", "juntos", "junto", "combinação", "combinações"]):
+            return self._analisar_grupos(dezenas)
+
         if any(p in pergunta for p in ["jogar", "palpite", "estratégia", "dica"]):
             return self._gerar_estrategia(kpis)
 
@@ -87,28 +90,61 @@ class ChatAnalyzer:
         return "📌 Padrões observados:\n" + "\n".join(f"• {r}" for r in respostas)
 
     def _analisar_frequencia(self, dezenas: List[int]) -> str:
-        historico = self.api.carregar_historico()
+        indice = self.api.indice_frequencia()
 
-        if historico.empty:
+        if indice.sorteios == 0:
             return "Ainda não há histórico suficiente para analisar frequência."
 
-        todos = []
-        for lst in historico["dezenas_lista"]:
-            todos.extend(lst)
-
-        from collections import Counter
-        freq = Counter(todos)
-
-        quentes = [n for n, f in freq.most_common(5)]
-        frios = [n for n in range(1, 26) if n not in freq][:5]
+        quentes = indice.quentes(5)
+        frios = indice.frios(5)
 
         coincidencias = len(set(dezenas) & set(quentes))
 
-        return (
+        # Consultas no índice invertido (bitmaps por dezena), sem varrer o histórico
+        invertido = self.api.indice_invertido()
+        quentes_juntos = invertido.consultar(incluir=quentes)
+        parecidos = invertido.consultar(pelo_menos=(dezenas, 11))
+
+        resposta = (
             "📊 Frequência histórica:\n"
             f"🔥 Números mais frequentes: {', '.join(map(str, quentes))}\n"
             f"❄️ Números menos frequentes: {', '.join(map(str, frios))}\n"
-            f"🎯 Coincidências com o sorteio atual: {coincidencias}"
+            f"⏳ Mais atrasados: {', '.join(f'{n} ({indice.atraso(n)})' for n in indice.atrasados(3))}\n"
+            f"🎯 Coincidências com o sorteio atual: {coincidencias}\n"
+            f"🧩 Concursos com os 5 mais frequentes juntos: {len(quentes_juntos)}"
+        )
+        if len(quentes_juntos):
+            resposta += f" (último: {quentes_juntos[-1]})"
+        resposta += f"\n🔁 Concursos com 11+ dezenas do sorteio atual: {len(parecidos)}"
+        return resposta
+
+    def _analisar_grupos(self, dezenas: List[int]) -> str:
+        from services.cache_processo import CacheProcesso
+        from services.padroes import MineradorPadroes
+
+        # Trios e quadras que saem juntos acima do esperado (recalcula só quando o histórico muda)
+        padroes = CacheProcesso.analise(
+            "historico", "grupos",
+            lambda: MineradorPadroes.do_historico(self.api).minerar(
+                3, 4, acima_do_esperado=1.1, processos=1
+            ),
+            versao=self.api.versao_historico(),
+        )
+
+        if not padroes:
+            return "Nenhum grupo de dezenas sai junto acima do esperado no histórico atual."
+
+        destaques = sorted(padroes, key=lambda p: -p["razao_esperado"])[:5]
+        no_sorteio = [p for p in destaques if set(p["dezenas"]) <= set(dezenas)]
+
+        linhas = [
+            f"• {'-'.join(map(str, p['dezenas']))}: {p['suporte']}x "
+            f"(esperado {p['esperado']:.0f}, último no concurso {p['ultimo_concurso']})"
+            for p in destaques
+        ]
+        return (
+            "🔗 Grupos que mais saem juntos:\n" + "\n".join(linhas) +
+            f"\n🎯 Presentes no sorteio atual: {len(no_sorteio)}"
         )
 
     def _gerar_estrategia(self, kpis: Dict) -> str:
@@ -0,0 +1,182 @@
+# services/cobertura.py
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+from services.mascara import dezenas_para_mascaras, popcount
+from services.ranking import TOTAL_COMBINACOES, RankingCombinatorio
+
+FAIXAS_PREMIO = (11, 12, 13, 14, 15)
+# Sorteios avaliados por vez dentro de uma tarefa (cabe no cache L2)
+BLOCO_SORTEIOS = 1 << 16
+# Sorteios por tarefa do pool (granularidade do progresso)
+SORTEIOS_POR_TAREFA = 1 << 18
+
+# Bilhetes do processo trabalhador (definidos no initializer do pool)
+_bilhetes_trabalhador = np.empty(0, dtype=np.uint32)
+
+
+class AvaliadorCobertura:
+    """
+    Cobertura exata de um conjunto de bilhetes sobre todos os C(25,15)
+    sorteios possíveis. Para cada sorteio calcula o melhor acerto entre os
+    bilhetes (popcount(bilhete & sorteio)) e guarda só o histograma.
+    O espaço de sorteios é gerado por faixas de rank (sem materializar os
+    3,2 milhões de uma vez) e as faixas são divididas entre processos.
+    """
+
+    def __init__(self, jogos: Iterable[Sequence[int]]):
+        jogos = list(jogos)
+        mascaras = dezenas_para_mascaras(jogos) if jogos else np.empty(0, dtype=np.uint32)
+        # Bilhetes repetidos não mudam o melhor acerto
+        self.bilhetes = np.unique(mascaras)
+        self.total_informado = len(jogos)
+
+    @classmethod
+    def de_mascaras(cls, mascaras: np.ndarray) -> "AvaliadorCobertura":
+        avaliador = cls([])
+        mascaras = np.asarray(mascaras, dtype=np.uint32)
+        avaliador.bilhetes = np.unique(mascaras)
+        avaliador.total_informado = len(mascaras)
+        return avaliador
+
+    # =============================
+    # AVALIAÇÃO
+    # =============================
+    def avaliar(self, processos: Optional[int] = None,
+                progresso: Optional[Callable[[int, int], None]] = None,
+                inicio: int = 0, fim: int = TOTAL_COMBINACOES) -> Dict[str, Any]:
+        """
+        Args:
+            processos: tamanho do pool (None = CPUs; 1 = sem pool)
+            progresso: callback(sorteios_avaliados, total)
+            inicio / fim: faixa de ranks avaliada (padrão: todos os sorteios)
+        Returns:
+            Histograma do melhor acerto por sorteio, fração de sorteios que
+            garantem cada faixa, mínimo garantido e um sorteio que o atinge
+        """
+        if len(self.bilhetes) == 0:
+            raise ValueError("Informe ao menos um bilhete")
+
+        faixas = [(a, min(a + SORTEIOS_POR_TAREFA, fim)) for a in range(inicio, fim, SORTEIOS_POR_TAREFA)]
+        total = fim - inicio
+        histograma = np.zeros(16, dtype=np.int64)
+        pior: Tuple[int, int] = (16, -1)
+        avaliados = 0
+
+        relogio = time.perf_counter()
+        processos = processos or os.cpu_count() or 1
+        if processos <= 1 or len(faixas) <= 1:
+            _definir_bilhetes(self.bilhetes)
+            parciais = (_avaliar_faixa(a, b) for a, b in faixas)
+            for parcial, pior_faixa, quantidade in parciais:
+                histograma += parcial
+                pior = min(pior, pior_faixa)
+                avaliados += quantidade
+                if progresso:
+                    progresso(avaliados, total)
+        else:
+            with ProcessPoolExecutor(max_workers=processos, initializer=_definir_bilhetes,
+                                     initargs=(self.bilhetes,)) as pool:
+                futuros = [pool.submit(_avaliar_faixa, a, b) for a, b in faixas]
+                for futuro in as_completed(futuros):
+                    parcial, pior_faixa, quantidade = futuro.result()
+                    histograma += parcial
+                    pior = min(pior, pior_faixa)
+                    avaliados += quantidade
+                    if progresso:
+                        progresso(avaliados, total)
+        segundos = time.perf_counter() - relogio
+
+        return self._relatorio(histograma, pior, total, segundos, processos)
+
+    def _relatorio(self, histograma: np.ndarray, pior: Tuple[int, int], total: int,
+                   segundos: float, processos: int) -> Dict[str, Any]:
+        acumulado = np.cumsum(histograma[::-1])[::-1]  # sorteios com melhor >= h
+        minimo, rank_pior = pior
+        return {
+            "bilhetes": self.total_informado,
+            "bilhetes_distintos": len(self.bilhetes),
+            "sorteios": total,
+            "histograma": {h: int(histograma[h]) for h in range(16) if histograma[h]},
+            "garantia": {
+                h: {"sorteios": int(acumulado[h]), "fracao": float(acumulado[h] / total) if total else 0.0}
+                for h in FAIXAS_PREMIO
+            },
+            "minimo_garantido": int(minimo),
+            "pior_sorteio": RankingCombinatorio.unrank(rank_pior).tolist() if rank_pior >= 0 else [],
+            "desempenho": {
+                "segundos": round(segundos, 3),
+                "pares_por_segundo": round(total * len(self.bilhetes) / segundos) if segundos else None,
+                "processos": processos,
+            },
+        }
+
+
+# =============================
+# TRABALHADORES
+# =============================
+def _definir_bilhetes(bilhetes: np.ndarray):
+    global _bilhetes_trabalhador
+    _bilhetes_trabalhador = bilhetes
+
+
+def _avaliar_faixa(inicio: int, fim: int) -> Tuple[np.ndarray, Tuple[int, int], int]:
+    """Histograma do melhor acerto nos ranks [inicio, fim) e o pior sorteio da faixa."""
+    histograma = np.zeros(16, dtype=np.int64)
+    pior = (16, -1)
+    for a in range(inicio, fim, BLOCO_SORTEIOS):
+        b = min(a + BLOCO_SORTEIOS, fim)
+        sorteios = RankingCombinatorio.unrank_mascaras(np.arange(a, b))
+        melhor = melhores_acertos(sorteios, _bilhetes_trabalhador)
+        histograma += np.bincount(melhor, minlength=16)
+        posicao = int(np.argmin(melhor))
+        pior = min(pior, (int(melhor[posicao]), a + posicao))
+    return histograma, pior, fim - inicio
+
+
+def melhores_acertos(sorteios: np.ndarray, bilhetes: np.ndarray) -> np.ndarray:
+    """Maior popcount(bilhete & sorteio) entre os bilhetes, para cada sorteio."""
+    melhor = np.zeros(len(sorteios), dtype=np.uint8)
+    intersecao = np.empty(len(sorteios), dtype=np.uint32)
+    acertos = np.empty(len(sorteios), dtype=np.uint8)
+    contar_com_saida = hasattr(np, "bitwise_count")
+    for bilhete in bilhetes:
+        np.bitwise_and(sorteios, bilhete, out=intersecao)
+        if contar_com_saida:
+            np.bitwise_count(intersecao, out=acertos)
+        else:
+            acertos[:] = popcount(intersecao)
+        np.maximum(melhor, acertos, out=melhor)
+    return melhor
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from services.conferencia import mascaras_do_texto
+
+    parser = argparse.ArgumentParser(description="Cobertura exata de um bolão sobre todos os sorteios")
+    parser.add_argument("arquivo", help="bilhetes, um por linha (.txt/.csv) ou máscaras .npy")
+    parser.add_argument("--processos", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.arquivo.endswith(".npy"):
+        mascaras = np.load(args.arquivo)
+    else:
+        with open(args.arquivo, "rb") as arquivo:
+            mascaras = mascaras_do_texto(arquivo.read())
+    mascaras = mascaras[popcount(mascaras) >= 15]
+
+    relatorio = AvaliadorCobertura.de_mascaras(mascaras).avaliar(
+        processos=args.processos,
+        progresso=lambda feitos, total: print(f"\r{feitos / total:6.1%}", end="", flush=True),
+    )
+    print()
+    for faixa, garantia in relatorio["garantia"].items():
+        print(f"pelo menos {faixa} pontos: {garantia['fracao']:.6%} dos sorteios")
+    print(f"mínimo garantido: {relatorio['minimo_garantido']} "
+          f"(ex.: {relatorio['pior_sorteio']}) | {relatorio['desempenho']}")
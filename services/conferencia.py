@@ -0,0 +1,345 @@
+# services/conferencia.py
+import io
+import time
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from services.mascara import MASCARA_TOTAL, dezenas_para_mascaras, mascaras_para_matriz, popcount
+
+FAIXAS_PREMIO = (11, 12, 13, 14, 15)
+# Bytes lidos por vez (a memória não cresce com o tamanho do arquivo)
+TAMANHO_BLOCO = 1 << 24
+# Bilhetes por vez quando a origem já são máscaras (.npy)
+BLOCO_MASCARAS = 1 << 22
+
+# Classes de byte: separador (espaço, tab, quebras, ',', ';', '-', aspas), dígito, outro
+_SEPARADOR, _DIGITO, _OUTRO = 0, 1, 2
+_CLASSE_BYTE = np.full(256, _OUTRO, dtype=np.uint8)
+_CLASSE_BYTE[[9, 10, 11, 12, 13, 32, ord(","), ord(";"), ord("-"), ord('"'), ord("'")]] = _SEPARADOR
+_CLASSE_BYTE[ord("0"):ord("9") + 1] = _DIGITO
+
+# Linhas por vez no caminho de largura fixa (a fatia cabe no cache)
+_LINHAS_POR_VEZ = 8192
+
+Origem = Union[str, Path, BinaryIO]
+Sorteios = Union[Sequence[Sequence[int]], Mapping[Any, Sequence[int]]]
+
+
+def mascaras_do_texto(dados: bytes) -> np.ndarray:
+    """
+    Uma máscara por linha do texto, com as mesmas regras de
+    Formatters.parse_dezenas_manual: separadores espaço, vírgula,
+    ponto-e-vírgula e hífen (aqui também aspas, para CSV), só tokens
+    numéricos entre 1 e 25, repetidas contam uma vez. Linha sem dezenas
+    válidas vira máscara 0. Vetorizado sobre os bytes.
+    """
+    b = np.frombuffer(dados, dtype=np.uint8)
+    mascaras = _mascaras_largura_fixa(b)
+    return mascaras if mascaras is not None else _mascaras_por_token(dados, b)
+
+
+def _mascaras_por_token(dados: bytes, b: np.ndarray) -> np.ndarray:
+    """Caminho geral: tokeniza os bytes (linhas de qualquer leiaute)."""
+    quebras = np.flatnonzero(b == 10)
+    linhas = len(quebras) + (1 if len(b) and b[-1] != 10 else 0)
+    mascaras = np.zeros(linhas, dtype=np.uint32)
+    if len(b) == 0:
+        return mascaras
+
+    classe = _CLASSE_BYTE[b]
+    token = (classe != _SEPARADOR).view(np.int8)
+    borda = np.diff(token, prepend=0, append=0)
+    inicios = np.flatnonzero(borda == 1)
+    fins = np.flatnonzero(borda == -1) - 1
+    if len(inicios) == 0:
+        return mascaras
+
+    # Até 3 dígitos: valor vetorizado a partir dos últimos bytes do token
+    valor = b[fins].astype(np.int16) - 48
+    for casa, peso in ((1, 10), (2, 100)):
+        dentro = fins - casa >= inicios
+        valor += np.where(dentro, b[fins - casa].astype(np.int16) - 48, 0) * peso
+    validos = (valor >= 1) & (valor <= 25)
+
+    # Tokens com letras/símbolos (raros): descartados
+    outros = np.flatnonzero(classe == _OUTRO)
+    if len(outros):
+        validos[np.searchsorted(inicios, outros, side="right") - 1] = False
+
+    # Tokens longos (raros, ex.: '0007'): valor exato
+    for t in np.flatnonzero((fins - inicios >= 3) & validos):
+        texto = dados[inicios[t]:fins[t] + 1]
+        validos[t] = 1 <= int(texto) <= 25
+    valor[~validos] = 0
+
+    # Linha de cada token: quebras contadas por token seguinte
+    primeiro_apos = np.searchsorted(inicios, quebras)
+    linha = np.cumsum(np.bincount(primeiro_apos, minlength=len(inicios) + 1)[:len(inicios)])
+
+    manter = validos
+    linha, valor = linha[manter], valor[manter]
+    if len(linha) == 0:
+        return mascaras
+    bits = np.uint32(1) << (valor - 1).astype(np.uint32)
+    primeiros = np.flatnonzero(np.diff(linha, prepend=-1))
+    mascaras[linha[primeiros]] = np.bitwise_or.reduceat(bits, primeiros)
+    return mascaras
+
+
+def _mascaras_largura_fixa(b: np.ndarray) -> Optional[np.ndarray]:
+    """
+    Caminho rápido de mascaras_do_texto para o caso comum: todas as linhas
+    com o mesmo leiaute (ex.: '01 02 ... 15' em toda linha). O bloco vira
+    uma matriz N x L e as dezenas são lidas por coluna, em fatias de linhas
+    que cabem no cache. None quando o texto não segue um leiaute único
+    (vale o caminho geral).
+    """
+    largura = int(np.argmax(b == 10)) + 1 if len(b) else 0
+    if largura < 2 or len(b) % largura:
+        return None
+    matriz = b.reshape(-1, largura)
+    if not (matriz[:, -1] == 10).all():
+        return None
+
+    # Leiaute da primeira linha: tokens só de dígitos, com 1 ou 2 casas
+    classe = _CLASSE_BYTE[matriz[0]]
+    if (classe == _OUTRO).any():
+        return None
+    digito = np.concatenate([[False], classe == _DIGITO, [False]])
+    inicios = np.flatnonzero(~digito[:-1] & digito[1:])
+    fins = np.flatnonzero(digito[:-1] & ~digito[1:])
+    if len(inicios) == 0 or (fins - inicios > 2).any():
+        return None
+    separadores = np.flatnonzero(classe == _SEPARADOR)
+    duas_casas = np.flatnonzero(fins - inicios == 2)
+    colunas = np.concatenate([fins - 1, inicios[duas_casas]])
+    unidades = len(fins)
+
+    mascaras = np.empty(len(matriz), dtype=np.uint32)
+    for inicio in range(0, len(matriz), _LINHAS_POR_VEZ):
+        parte = matriz[inicio:inicio + _LINHAS_POR_VEZ]
+        # As outras linhas precisam ter separadores nas mesmas colunas
+        sep = parte[:, separadores]
+        if not (sep == matriz[0, separadores]).all() and not (_CLASSE_BYTE[sep] == _SEPARADOR).all():
+            return None
+        digitos = parte[:, colunas] - np.uint8(48)
+        if digitos.max() > 9:                                  # uint8: não dígito > 9
+            return None
+        valor = digitos[:, :unidades]
+        valor[:, duas_casas] += digitos[:, unidades:] * np.uint8(10)
+        # Fora de 1-25 cai no bit 25, descartado pela máscara total
+        bits = np.left_shift(np.uint32(1), np.minimum(valor - np.uint8(1), np.uint8(25)))
+        mascaras[inicio:inicio + _LINHAS_POR_VEZ] = np.bitwise_or.reduce(bits, axis=1)
+    mascaras &= np.uint32(MASCARA_TOTAL)
+    return mascaras
+
+
+class ConferenciaLote:
+    """
+    Conferência de bolões grandes contra um ou mais sorteios.
+    Os bilhetes chegam em blocos (texto, CSV ou máscaras .npy), viram
+    máscaras e os acertos são popcount(bilhete & sorteio) para todos de
+    uma vez. Acumula totais por faixa (11-15) e, se pedido, as linhas
+    premiadas.
+    """
+
+    def __init__(self, sorteios: Sorteios, minimo_premio: int = FAIXAS_PREMIO[0],
+                 guardar_premiados: bool = False, limite_premiados: int = 100_000,
+                 minimo_dezenas: int = 15, maximo_dezenas: int = 20):
+        """
+        Args:
+            sorteios: lista de sorteios ou {concurso: dezenas}
+            guardar_premiados: guarda linha, dezenas e acertos dos premiados
+            limite_premiados: teto de linhas guardadas (memória limitada)
+            minimo_dezenas / maximo_dezenas: tamanho aceito do bilhete
+        """
+        if isinstance(sorteios, Mapping):
+            self.rotulos = list(sorteios)
+            dezenas = list(sorteios.values())
+        else:
+            dezenas = list(sorteios)
+            self.rotulos = list(range(1, len(dezenas) + 1))
+        if not dezenas:
+            raise ValueError("Informe ao menos um sorteio")
+
+        self.sorteios = dezenas_para_mascaras(dezenas)
+        self.minimo_premio = minimo_premio
+        self.guardar_premiados = guardar_premiados
+        self.limite_premiados = limite_premiados
+        self.minimo_dezenas = minimo_dezenas
+        self.maximo_dezenas = maximo_dezenas
+        self.reiniciar()
+
+    def reiniciar(self):
+        self.histogramas = np.zeros((len(self.sorteios), 16), dtype=np.int64)
+        self.bilhetes = 0
+        self.invalidos = 0
+        self.linhas_lidas = 0
+        self.premiados: List[Dict[str, Any]] = []
+        self.premiados_descartados = 0
+        self.segundos = 0.0
+
+    # =============================
+    # ENTRADA
+    # =============================
+    def adicionar_mascaras(self, mascaras: np.ndarray, linha_inicial: Optional[int] = None):
+        """Confere um bloco de bilhetes já em máscara (uint32)."""
+        inicio = time.perf_counter()
+        self._conferir(mascaras, linha_inicial)
+        self.segundos += time.perf_counter() - inicio
+
+    def adicionar_texto(self, dados: bytes, linha_inicial: Optional[int] = None):
+        """Bloco de linhas completas (um bilhete por linha); o tempo inclui a leitura do texto."""
+        inicio = time.perf_counter()
+        self._conferir(mascaras_do_texto(dados), linha_inicial)
+        self.segundos += time.perf_counter() - inicio
+
+    def _conferir(self, mascaras: np.ndarray, linha_inicial: Optional[int] = None):
+        mascaras = np.asarray(mascaras, dtype=np.uint32)
+        linha_inicial = self.linhas_lidas if linha_inicial is None else linha_inicial
+        self.linhas_lidas = max(self.linhas_lidas, linha_inicial + len(mascaras))
+
+        tamanho = popcount(mascaras)
+        aceitos = (tamanho >= self.minimo_dezenas) & (tamanho <= self.maximo_dezenas)
+        quantidade = int(np.count_nonzero(aceitos))
+        if quantidade < len(mascaras):
+            self.invalidos += len(mascaras) - quantidade
+            posicoes = np.flatnonzero(aceitos)
+            mascaras = mascaras[posicoes]
+        else:
+            posicoes = None
+        self.bilhetes += quantidade
+
+        melhor = np.zeros(len(mascaras), dtype=np.uint8)
+        for s, sorteio in enumerate(self.sorteios):
+            acertos = popcount(mascaras & sorteio)
+            self.histogramas[s] += np.bincount(acertos, minlength=16)
+            if self.guardar_premiados:
+                np.maximum(melhor, acertos, out=melhor)
+
+        if self.guardar_premiados:
+            premiados = np.flatnonzero(melhor >= self.minimo_premio)
+            if len(premiados):
+                linhas = premiados if posicoes is None else posicoes[premiados]
+                self._guardar(mascaras[premiados], linhas + linha_inicial + 1)
+
+    def conferir_arquivo(self, origem: Origem, coluna: Optional[str] = None,
+                         tamanho_bloco: int = TAMANHO_BLOCO,
+                         progresso: Optional[Callable[[int], None]] = None) -> Dict[str, Any]:
+        """
+        Confere um arquivo inteiro em blocos e devolve o resultado.
+        Args:
+            origem: caminho ou arquivo binário aberto (ex.: upload do Streamlit)
+            coluna: em CSV, coluna com as dezenas (None = linha inteira)
+            progresso: callback(linhas_lidas) após cada bloco
+        O tempo medido é o de parede: leitura do arquivo, parse e conferência.
+        """
+        inicio = time.perf_counter()
+        nome = str(getattr(origem, "name", origem))
+        if nome.endswith(".npy"):
+            blocos = self._blocos_npy(origem)
+        elif coluna is not None:
+            blocos = self._blocos_csv(origem, coluna, tamanho_bloco)
+        else:
+            blocos = self._blocos_texto(origem, tamanho_bloco)
+
+        for bloco in blocos:
+            self._conferir(mascaras_do_texto(bloco) if isinstance(bloco, bytes) else bloco)
+            if progresso:
+                progresso(self.linhas_lidas)
+        self.segundos += time.perf_counter() - inicio
+        return self.resultado()
+
+    @staticmethod
+    def _blocos_texto(origem: Origem, tamanho_bloco: int) -> Iterator[bytes]:
+        """Blocos de linhas completas; o resto da última linha vai para o próximo."""
+        arquivo, fechar = _abrir(origem)
+        try:
+            resto = b""
+            while True:
+                lido = arquivo.read(tamanho_bloco)
+                if not lido:
+                    break
+                dados = resto + lido
+                corte = dados.rfind(b"\n") + 1
+                resto = dados[corte:]
+                if corte:
+                    yield dados[:corte]
+            if resto:
+                yield resto
+        finally:
+            if fechar:
+                arquivo.close()
+
+    @staticmethod
+    def _blocos_csv(origem: Origem, coluna: str, tamanho_bloco: int) -> Iterator[bytes]:
+        linhas_por_bloco = max(1, tamanho_bloco // 64)
+        leitor = pd.read_csv(origem, usecols=[coluna], dtype=str,
+                             chunksize=linhas_por_bloco, keep_default_na=False)
+        for parte in leitor:
+            yield ("\n".join(parte[coluna]) + "\n").encode("utf-8")
+
+    @staticmethod
+    def _blocos_npy(origem: Origem) -> Iterator[np.ndarray]:
+        mascaras = np.load(origem, mmap_mode="r") if isinstance(origem, (str, Path)) \
+            else np.load(origem)
+        for i in range(0, len(mascaras), BLOCO_MASCARAS):
+            yield np.asarray(mascaras[i:i + BLOCO_MASCARAS])
+
+    # =============================
+    # RESULTADO
+    # =============================
+    def resultado(self) -> Dict[str, Any]:
+        por_sorteio = {
+            rotulo: {
+                "faixas": {f: int(self.histogramas[s, f]) for f in FAIXAS_PREMIO},
+                "premiados": int(self.histogramas[s, self.minimo_premio:].sum()),
+                "histograma": self.histogramas[s].tolist(),
+            }
+            for s, rotulo in enumerate(self.rotulos)
+        }
+        resultado = {
+            "bilhetes": self.bilhetes,
+            "invalidos": self.invalidos,
+            "linhas": self.linhas_lidas,
+            "sorteios": por_sorteio,
+            "faixas": {f: int(self.histogramas[:, f].sum()) for f in FAIXAS_PREMIO},
+            "segundos": round(self.segundos, 3),
+            "bilhetes_por_segundo": round(self.bilhetes / self.segundos) if self.segundos else None,
+        }
+        if self.guardar_premiados:
+            resultado["premiados"] = self.premiados
+            resultado["premiados_descartados"] = self.premiados_descartados
+        return resultado
+
+    def _guardar(self, mascaras: np.ndarray, linhas: np.ndarray):
+        espaco = self.limite_premiados - len(self.premiados)
+        self.premiados_descartados += max(0, len(mascaras) - espaco)
+        mascaras, linhas = mascaras[:max(0, espaco)], linhas[:max(0, espaco)]
+        if len(mascaras) == 0:
+            return
+
+        acertos = popcount(mascaras[:, None] & self.sorteios[None, :])
+        for mascara, linha, por_sorteio in zip(mascaras_para_matriz(mascaras), linhas, acertos):
+            self.premiados.append({
+                "linha": int(linha),
+                "dezenas": (np.flatnonzero(mascara) + 1).tolist(),
+                "acertos": dict(zip(self.rotulos, por_sorteio.tolist())),
+            })
+
+    @staticmethod
+    def conferir(origem: Origem, sorteios: Sorteios, **kwargs) -> Dict[str, Any]:
+        """Atalho: ConferenciaLote(sorteios, ...).conferir_arquivo(origem)."""
+        coluna = kwargs.pop("coluna", None)
+        return ConferenciaLote(sorteios, **kwargs).conferir_arquivo(origem, coluna=coluna)
+
+
+def _abrir(origem: Origem) -> Tuple[BinaryIO, bool]:
+    if isinstance(origem, (str, Path)):
+        return open(origem, "rb"), True
+    if isinstance(origem, bytes):
+        return io.BytesIO(origem), True
+    return origem, False
@@ -0,0 +1,171 @@
+# services/coocorrencia.py
+import logging
+import math
+import threading
+from itertools import combinations
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from services.cache_processo import CacheProcesso
+from services.mascara import filtrar_jogos_validos, mascaras_para_matriz
+
+_lock_obter = threading.Lock()
+logger = logging.getLogger(__name__)
+
+
+def probabilidade_conjunto(tamanho: int, sorteadas: int = 15, total: int = 25) -> float:
+    """P(um conjunto fixo de 'tamanho' dezenas sair inteiro em um sorteio)."""
+    return math.comb(total - tamanho, sorteadas - tamanho) / math.comb(total, sorteadas)
+
+
+# Pares: 15·14/(25·24) = 0.35 | Trios: 15·14·13/(25·24·23) ≈ 0.1978
+PROB_PAR = probabilidade_conjunto(2)
+PROB_TRIO = probabilidade_conjunto(3)
+
+
+class Coocorrencia:
+    """
+    Coocorrência de dezenas no histórico.
+    Pares: matriz 25x25 = Xᵀ·X sobre a matriz de incidência (diagonal =
+    frequência de cada dezena), consulta em O(1).
+    Trios: interseção de bitsets (um int por dezena, um bit por concurso).
+    Cada resultado vem com o valor esperado pela hipergeométrica.
+    """
+
+    def __init__(self, mascaras: Optional[np.ndarray] = None,
+                 concursos: Optional[Sequence[int]] = None):
+        self._lock = threading.Lock()
+        self.reiniciar(mascaras, concursos)
+
+    def reiniciar(self, mascaras: Optional[np.ndarray] = None,
+                  concursos: Optional[Sequence[int]] = None):
+        with self._lock:
+            self.matriz = np.zeros((25, 25), dtype=np.int64)
+            self.tidsets: List[int] = [0] * 25
+            self.sorteios = 0
+            self.concursos = np.empty(0, dtype=np.int64)
+        if mascaras is not None:
+            self.adicionar(mascaras, concursos)
+
+    @classmethod
+    def obter(cls, api) -> "Coocorrencia":
+        """
+        Instância do processo para o histórico da api. Quando o histórico só
+        ganhou concursos novos no fim, eles são acrescentados; senão recalcula.
+        """
+        concursos, mascaras = api.carregar_mascaras()
+        chave = f"coocorrencia:{api._arquivo_historico()}"
+        with _lock_obter:
+            atual = CacheProcesso.servico(chave, cls)
+            n = atual.sorteios
+            if n == len(concursos) and np.array_equal(atual.concursos, concursos):
+                return atual
+            if n < len(concursos) and np.array_equal(atual.concursos, concursos[:n]):
+                atual.adicionar(mascaras[n:], concursos[n:])
+                return atual
+
+            atual.reiniciar(mascaras, concursos)
+            return atual
+
+    # =============================
+    # ATUALIZAÇÃO
+    # =============================
+    def adicionar(self, mascaras: np.ndarray, concursos: Optional[Sequence[int]] = None):
+        """Acrescenta sorteios (em ordem): Xᵀ·X do bloco e bits nos tidsets."""
+        mascaras = np.atleast_1d(np.asarray(mascaras, dtype=np.uint32))
+        if len(mascaras) == 0:
+            return
+        x = mascaras_para_matriz(mascaras)
+        bloco = x.T.astype(np.int64) @ x.astype(np.int64)
+
+        # Coluna j da matriz -> bits a partir da posição atual
+        bits = np.packbits(x.T, axis=1, bitorder="little")
+        with self._lock:
+            self.matriz += bloco
+            for i in range(25):
+                self.tidsets[i] |= int.from_bytes(bits[i].tobytes(), "little") << self.sorteios
+            if concursos is None:
+                concursos = np.arange(self.sorteios + 1, self.sorteios + len(mascaras) + 1)
+            self.concursos = np.concatenate([self.concursos, np.asarray(concursos, dtype=np.int64)])
+            self.sorteios += len(mascaras)
+
+    # =============================
+    # CONSULTAS
+    # =============================
+    def par(self, a: int, b: int) -> int:
+        """Concursos em que a e b saíram juntos (a == b: frequência de a)."""
+        return int(self.matriz[a - 1, b - 1])
+
+    def trio(self, a: int, b: int, c: int) -> int:
+        return (self.tidsets[a - 1] & self.tidsets[b - 1] & self.tidsets[c - 1]).bit_count()
+
+    def conjunto(self, dezenas: Sequence[int]) -> int:
+        """Concursos que contêm todas as dezenas dadas."""
+        comum = (1 << self.sorteios) - 1
+        for n in dezenas:
+            comum &= self.tidsets[n - 1]
+        return comum.bit_count()
+
+    def pares(self, k: int = 10, ordem: str = "mais",
+              dezenas: Optional[Sequence[int]] = None) -> List[Dict[str, Any]]:
+        """
+        Top-k pares por desvio do esperado.
+        Args:
+            ordem: 'mais' (acima do esperado) ou 'menos' (abaixo)
+            dezenas: restringe aos pares formados por estas dezenas
+        """
+        i, j = np.triu_indices(25, k=1)
+        if dezenas is not None:
+            escolhidas = np.zeros(25, dtype=bool)
+            escolhidas[np.asarray(list(dezenas)) - 1] = True
+            manter = escolhidas[i] & escolhidas[j]
+            i, j = i[manter], j[manter]
+
+        observados = self.matriz[i, j]
+        sinal = -1 if ordem == "mais" else 1
+        ordem_idx = np.argsort(sinal * observados, kind="stable")[:k]
+        return [
+            self._resultado((int(i[p]) + 1, int(j[p]) + 1), int(observados[p]), PROB_PAR)
+            for p in ordem_idx
+        ]
+
+    def trios(self, k: int = 10, ordem: str = "mais",
+              dezenas: Optional[Sequence[int]] = None) -> List[Dict[str, Any]]:
+        """Top-k trios (2300 no total) por interseção de bitsets."""
+        numeros = sorted(dezenas) if dezenas is not None else range(1, 26)
+        contagens = []
+        for a, b in combinations(numeros, 2):
+            par = self.tidsets[a - 1] & self.tidsets[b - 1]
+            for c in numeros:
+                if c > b:
+                    contagens.append(((par & self.tidsets[c - 1]).bit_count(), (a, b, c)))
+
+        contagens.sort(key=lambda x: (-x[0] if ordem == "mais" else x[0], x[1]))
+        return [self._resultado(trio, obs, PROB_TRIO) for obs, trio in contagens[:k]]
+
+    def _resultado(self, dezenas: tuple, observado: int, p: float) -> Dict[str, Any]:
+        esperado = self.sorteios * p
+        desvio_padrao = math.sqrt(self.sorteios * p * (1 - p)) if self.sorteios else 0.0
+        return {
+            "dezenas": dezenas,
+            "observado": observado,
+            "esperado": round(esperado, 2),
+            "razao": round(observado / esperado, 3) if esperado else 0.0,
+            "z": round((observado - esperado) / desvio_padrao, 2) if desvio_padrao else 0.0,
+        }
+
+    def resumo_pares(self, dezenas: Sequence[int], k: int = 3) -> Dict[str, List]:
+        """Pares do jogo que mais e menos saíram juntos no histórico."""
+        return {
+            "mais_frequentes": self.pares(k, "mais", dezenas),
+            "menos_frequentes": self.pares(k, "menos", dezenas),
+        }
+
+    @staticmethod
+    def de_dezenas(jogos: Sequence[Sequence[int]]) -> "Coocorrencia":
+        """Matriz de uma lista de jogos; os com dezenas fora de 1-25 ficam de fora (com aviso no log)."""
+        mascaras, validos = filtrar_jogos_validos(jogos)
+        if not validos.all():
+            logger.warning("Coocorrência: %d jogo(s) com dezenas inválidas ignorado(s)", int((~validos).sum()))
+        return Coocorrencia(mascaras)
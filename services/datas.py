@@ -0,0 +1,34 @@
+# services/datas.py
+import re
+from typing import Any, Optional
+
+import pandas as pd
+
+# Formato da API da Caixa; o resto do histórico grava ISO ('aaaa-mm-dd hh:mm:ss')
+_DIA_MES_ANO = re.compile(r"\s*(\d{1,2})/(\d{1,2})/(\d{4})\s*")
+FORMATO_HISTORICO = "%Y-%m-%d %H:%M:%S"
+
+
+def ler_data(data: Any) -> Optional[pd.Timestamp]:
+    """
+    Data em qualquer formato gravado no histórico: 'dd/mm/aaaa' (dia
+    primeiro, como vem da API) ou ISO. None se vazia ou inválida.
+    """
+    if data is None or data == "" or (not isinstance(data, str) and pd.isna(data)):
+        return None
+    if isinstance(data, str):
+        m = _DIA_MES_ANO.fullmatch(data)
+        if m:
+            dia, mes, ano = (int(g) for g in m.groups())
+            try:
+                return pd.Timestamp(year=ano, month=mes, day=dia)
+            except ValueError:
+                return None
+    momento = pd.to_datetime(data, errors="coerce")
+    return None if pd.isna(momento) else momento
+
+
+def normalizar_data(data: Any) -> Optional[str]:
+    """Data no formato ISO do histórico ('aaaa-mm-dd hh:mm:ss'), ou None."""
+    momento = ler_data(data)
+    return momento.strftime(FORMATO_HISTORICO) if momento is not None else None
@@ -0,0 +1,327 @@
+# services/fechamento.py
+import math
+import time
+from itertools import combinations
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from config import settings
+from services.cobertura import melhores_acertos
+from services.mascara import mascaras_para_matriz, popcount
+
+# Teto da matriz de cobertura (bilhetes x alvos, 1 bit por par): 128 MB
+MAXIMO_BYTES_COBERTURA = 1 << 27
+# Teto dos intermediários de cada bloco em _matriz_cobertura: 32 MB
+MAXIMO_BYTES_BLOCO = 1 << 25
+MINIMO_DEZENAS, MAXIMO_DEZENAS = 16, 20
+
+
+def bytes_cobertura(quantidade_dezenas: int, condicao: int, fixas: int = 0,
+                    condicionar_fixas: bool = False) -> int:
+    """Tamanho (bytes) da matriz de cobertura, sem montá-la."""
+    tamanho = settings.NUMEROS_SORTEIO
+    candidatos = math.comb(quantidade_dezenas - fixas, tamanho - fixas)
+    fixas_alvo = fixas if condicionar_fixas else 0
+    alvos = math.comb(quantidade_dezenas - fixas_alvo, condicao - fixas_alvo) \
+        if fixas_alvo <= condicao else 0
+    return candidatos * -(-alvos // 64) * 8
+
+
+def condicoes_viaveis(quantidade_dezenas: int, condicoes: Sequence[int]) -> List[int]:
+    """Condições cuja matriz cabe em MAXIMO_BYTES_COBERTURA (para limitar as opções da interface)."""
+    return [c for c in condicoes
+            if bytes_cobertura(quantidade_dezenas, c) <= MAXIMO_BYTES_COBERTURA]
+
+
+def _mascaras_combinacoes(dezenas: Sequence[int], tamanho: int,
+                          fixas: Sequence[int] = ()) -> np.ndarray:
+    """Máscaras de todas as combinações de 'tamanho' dezenas que contêm as fixas."""
+    base = sum(1 << (n - 1) for n in fixas)
+    livres = [1 << (n - 1) for n in dezenas if n not in fixas]
+    return np.array(
+        [base + sum(c) for c in combinations(livres, tamanho - len(fixas))],
+        dtype=np.uint32
+    )
+
+
+def _contar_linhas(bits: np.ndarray) -> np.ndarray:
+    """Bits ligados por linha de uma matriz de palavras uint64."""
+    return popcount(bits).sum(axis=-1, dtype=np.int64)
+
+
+class Fechamento:
+    """
+    Fechamento (covering design) sobre as dezenas escolhidas.
+    Alvos: todos os conjuntos de 'condicao' dezenas escolhidas que podem
+    sair; um bilhete cobre o alvo se acerta 'garantia' ou mais dele.
+    Cada bilhete candidato vira um bitset (uint64) dos alvos que cobre;
+    o guloso preguiçoso escolhe pela maior cobertura nova e a busca local
+    (ponderada) tenta cobrir tudo com um bilhete a menos.
+    """
+
+    def __init__(self, dezenas: Sequence[int], garantia: int = 13, condicao: int = 15,
+                 fixas: Sequence[int] = (), condicionar_fixas: bool = False):
+        """
+        Args:
+            dezenas: 16 a 20 dezenas escolhidas
+            garantia: acertos garantidos em algum bilhete ...
+            condicao: ... se 'condicao' das dezenas escolhidas forem sorteadas
+            fixas: dezenas obrigatórias em todos os bilhetes (ex.: fixos do 5-5-5)
+            condicionar_fixas: a garantia só vale se as fixas forem sorteadas
+        """
+        self.dezenas = sorted(set(int(n) for n in dezenas))
+        self.fixas = sorted(set(int(n) for n in fixas))
+        self.garantia = garantia
+        self.condicao = condicao
+        self.condicionar_fixas = condicionar_fixas
+        tamanho = settings.NUMEROS_SORTEIO
+
+        if not MINIMO_DEZENAS <= len(self.dezenas) <= MAXIMO_DEZENAS:
+            raise ValueError(f"Escolha de {MINIMO_DEZENAS} a {MAXIMO_DEZENAS} dezenas")
+        if not all(1 <= n <= settings.NUMEROS_TOTAL for n in self.dezenas):
+            raise ValueError("Dezenas devem estar entre 1 e 25")
+        if not set(self.fixas) <= set(self.dezenas) or len(self.fixas) >= tamanho:
+            raise ValueError("As fixas devem estar entre as dezenas escolhidas (menos de 15)")
+        if not 1 <= garantia <= condicao <= tamanho:
+            raise ValueError("Use 1 <= garantia <= condicao <= 15")
+
+        necessario = bytes_cobertura(len(self.dezenas), condicao, len(self.fixas), condicionar_fixas)
+        if necessario > MAXIMO_BYTES_COBERTURA:
+            raise ValueError(
+                f"Combinação grande demais ({necessario >> 20} MB, limite "
+                f"{MAXIMO_BYTES_COBERTURA >> 20} MB): reduza as dezenas ou aumente a condição"
+            )
+        self.candidatos = _mascaras_combinacoes(self.dezenas, tamanho, self.fixas)
+        self.alvos = self._alvos(condicao)
+        self.cobertura = self._matriz_cobertura()
+        self.coberturas = _contar_linhas(self.cobertura)
+
+    def _alvos(self, condicao: int) -> np.ndarray:
+        fixas = self.fixas if self.condicionar_fixas else ()
+        if len(fixas) > condicao:
+            return np.empty(0, dtype=np.uint32)
+        return _mascaras_combinacoes(self.dezenas, condicao, fixas)
+
+    def _matriz_cobertura(self, bloco: int = 512) -> np.ndarray:
+        """Linha i: bitset (uint64) dos alvos que o candidato i cobre."""
+        palavras = -(-len(self.alvos) // 64)
+        # AND (uint32) + popcount + comparação: ~6 bytes por par do bloco
+        bloco = max(1, min(bloco, MAXIMO_BYTES_BLOCO // max(1, 6 * len(self.alvos))))
+        matriz = np.zeros((len(self.candidatos), palavras * 8), dtype=np.uint8)
+        for a in range(0, len(self.candidatos), bloco):
+            acertos = popcount(self.candidatos[a:a + bloco, None] & self.alvos[None, :])
+            bits = np.packbits(acertos >= self.garantia, axis=1, bitorder="little")
+            matriz[a:a + bloco, :bits.shape[1]] = bits
+        return matriz.view(np.uint64)
+
+    # =============================
+    # GERAÇÃO
+    # =============================
+    def gerar(self, busca_local: bool = True, iteracoes: int = 20_000,
+              tempo_limite: Optional[float] = 30.0,
+              semente: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Returns:
+            Bilhetes, tamanho após o guloso e após a busca local e a
+            garantia exata verificada
+        """
+        inicio = time.perf_counter()
+        coberturaveis = np.bitwise_or.reduce(self.cobertura, axis=0) if len(self.cobertura) \
+            else np.zeros(0, dtype=np.uint64)
+        escolhidos = self._guloso(coberturaveis)
+        tamanho_guloso = len(escolhidos)
+        escolhidos = self._remover_redundantes(escolhidos)
+        if busca_local:
+            escolhidos = self._busca_local(escolhidos, coberturaveis, iteracoes,
+                                           tempo_limite, semente)
+
+        jogos = mascaras_para_matriz(self.candidatos[escolhidos])
+        resultado = {
+            "jogos": [(np.flatnonzero(j) + 1).tolist() for j in jogos],
+            "quantidade": len(escolhidos),
+            "quantidade_guloso": tamanho_guloso,
+            "alvos": len(self.alvos),
+            "alvos_inalcancaveis": len(self.alvos) - int(popcount(coberturaveis).sum(dtype=np.int64)),
+            "segundos": round(time.perf_counter() - inicio, 3),
+        }
+        resultado["garantia"] = self.verificar(self.candidatos[escolhidos])
+        return resultado
+
+    def _guloso(self, coberturaveis: np.ndarray) -> List[int]:
+        """
+        Set cover guloso preguiçoso: os ganhos guardados são limites
+        superiores e só os empatados no topo são recalculados (em lote).
+        """
+        descobertos = coberturaveis.copy()
+        restantes = int(popcount(descobertos).sum(dtype=np.int64))
+        limites = self.coberturas.copy()
+        escolhidos: List[int] = []
+        while restantes:
+            topo = limites.max()
+            if topo <= 0:
+                break
+            lote = np.flatnonzero(limites == topo)
+            limites[lote] = _contar_linhas(self.cobertura[lote] & descobertos)
+            i = int(lote[np.argmax(limites[lote])])
+            if limites[i] < limites.max():
+                continue
+            escolhidos.append(i)
+            descobertos &= ~self.cobertura[i]
+            restantes -= int(limites[i])
+            limites[i] = 0
+        return escolhidos
+
+    def _contagem(self, escolhidos: Sequence[int]) -> np.ndarray:
+        """Quantos bilhetes escolhidos cobrem cada alvo."""
+        if not len(escolhidos):
+            return np.zeros(len(self.alvos), dtype=np.int32)
+        bits = np.unpackbits(self.cobertura[list(escolhidos)].view(np.uint8), axis=1,
+                             count=len(self.alvos), bitorder="little")
+        return bits.sum(axis=0, dtype=np.int32)
+
+    def _linha(self, i: int) -> np.ndarray:
+        return np.unpackbits(self.cobertura[i].view(np.uint8), count=len(self.alvos),
+                             bitorder="little").astype(bool)
+
+    def _bits(self, linhas: Sequence[int], alvos: np.ndarray) -> np.ndarray:
+        """Submatriz 0/1 (linhas x alvos) sem desempacotar as linhas inteiras."""
+        palavras = self.cobertura[np.ix_(np.asarray(linhas), alvos >> 6)]
+        return ((palavras >> (alvos & 63).astype(np.uint64)) & np.uint64(1)).astype(np.float64)
+
+    def _empacotar(self, selecao: np.ndarray) -> np.ndarray:
+        palavras = self.cobertura.shape[1]
+        bits = np.zeros(palavras * 8, dtype=np.uint8)
+        empacotado = np.packbits(selecao, bitorder="little")
+        bits[:len(empacotado)] = empacotado
+        return bits.view(np.uint64)
+
+    def _remover_redundantes(self, escolhidos: List[int]) -> List[int]:
+        """Tira bilhetes cujos alvos já são todos cobertos por outros."""
+        contagem = self._contagem(escolhidos)
+        mantidos = list(escolhidos)
+        for i in sorted(escolhidos, key=lambda i: self.coberturas[i]):
+            linha = self._linha(i)
+            if (contagem[linha] >= 2).all():
+                contagem[linha] -= 1
+                mantidos.remove(i)
+        return mantidos
+
+    def _busca_local(self, escolhidos: List[int], coberturaveis: np.ndarray, iteracoes: int,
+                     tempo_limite: Optional[float], semente: Optional[int]) -> List[int]:
+        """
+        Tenta cobrir com um bilhete a menos (busca ponderada no estilo NuSC):
+        a cada passo sai o bilhete de menor perda e entra, entre os que cobrem
+        um alvo descoberto sorteado, o de maior ganho. Alvos que continuam
+        descobertos ganham peso, o que tira a busca de mínimos locais.
+        Ganhos e perdas só leem os bits dos alvos descobertos/únicos.
+        """
+        rng = np.random.default_rng(semente)
+        prazo = time.perf_counter() + tempo_limite if tempo_limite else None
+        melhor = list(escolhidos)
+        atual = list(escolhidos)
+        # Contagens e pesos em float64: os produtos escalares usam BLAS
+        contagem = self._contagem(atual).astype(np.float64)
+        alcancavel = np.unpackbits(coberturaveis.view(np.uint8), count=len(self.alvos),
+                                   bitorder="little").astype(bool)
+        pesos = np.ones(len(self.alvos), dtype=np.float64)
+        idade = np.zeros(len(self.candidatos), dtype=np.int64)
+        no_atual = np.zeros(len(self.candidatos), dtype=bool)
+        no_atual[atual] = True
+
+        def descobertos() -> np.ndarray:
+            return np.flatnonzero((contagem == 0) & alcancavel)
+
+        def mais_antigo(opcoes: np.ndarray, valores: np.ndarray, melhor_valor) -> int:
+            empatados = opcoes[valores == melhor_valor]
+            return int(empatados[np.argmin(idade[empatados])])
+
+        # Linhas desempacotadas só dos bilhetes atuais
+        linhas = {i: self._linha(i).astype(np.float64) for i in atual}
+
+        def perdas() -> np.ndarray:
+            """Peso dos alvos que só o bilhete cobre, para cada bilhete atual."""
+            unicos = np.where(contagem == 1, pesos, 0.0)
+            return np.array([linhas[i] @ unicos for i in atual])
+
+        def remover(i: int, passo: int):
+            atual.remove(i)
+            no_atual[i] = False
+            contagem[:] -= linhas.pop(i)
+            idade[i] = passo
+
+        def adicionar(i: int, passo: int):
+            atual.append(i)
+            no_atual[i] = True
+            linhas[i] = self._linha(i).astype(np.float64)
+            contagem[:] += linhas[i]
+            idade[i] = passo
+
+        def remover_menor_perda(passo: int, exceto: int = -1):
+            valores = perdas()
+            opcoes = np.array(atual)
+            if len(opcoes) > 1:
+                valores[opcoes == exceto] = np.inf
+            remover(mais_antigo(opcoes, valores, valores.min()), passo)
+
+        if len(atual) <= 1:
+            return melhor
+        remover_menor_perda(0)
+        ultimo = -1
+
+        for passo in range(1, iteracoes + 1):
+            if len(descobertos()) == 0:
+                melhor = list(atual)
+                if len(atual) <= 1:
+                    break
+                remover_menor_perda(passo)
+                continue
+            if prazo and time.perf_counter() > prazo:
+                break
+
+            # Sai o de menor perda (menos o que acabou de entrar)
+            remover_menor_perda(passo, exceto=ultimo)
+
+            # Entra o de maior ganho entre os que cobrem um alvo descoberto sorteado
+            abertos = descobertos()
+            alvo = int(rng.choice(abertos))
+            coluna = ((self.cobertura[:, alvo >> 6] >> np.uint64(alvo & 63)) & np.uint64(1)).astype(bool)
+            entradas = np.flatnonzero(coluna & ~no_atual)
+            ganhos = self._bits(entradas, abertos) @ pesos[abertos]
+            ultimo = mais_antigo(entradas, ganhos, ganhos.max())
+            adicionar(ultimo, passo)
+
+            pesos[descobertos()] += 1
+        return melhor
+
+    # =============================
+    # VERIFICAÇÃO
+    # =============================
+    def verificar(self, bilhetes: np.ndarray) -> Dict[str, Any]:
+        """
+        Garantia exata dos bilhetes: para cada quantidade m de dezenas
+        escolhidas sorteadas, o menor 'melhor acerto' entre todos os casos.
+        """
+        bilhetes = np.asarray(bilhetes, dtype=np.uint32)
+        por_condicao = {}
+        for m in range(self.garantia, min(settings.NUMEROS_SORTEIO, len(self.dezenas)) + 1):
+            alvos = self._alvos(m)
+            if len(alvos) == 0 or len(bilhetes) == 0:
+                continue
+            melhor = melhores_acertos(alvos, bilhetes)
+            por_condicao[m] = {
+                "minimo": int(melhor.min()),
+                "fracao_garantia": float(np.mean(melhor >= self.garantia)),
+            }
+
+        alvo = por_condicao.get(self.condicao, {"minimo": 0, "fracao_garantia": 0.0})
+        return {
+            "garantia": self.garantia,
+            "condicao": self.condicao,
+            "cumprida": alvo["minimo"] >= self.garantia,
+            "minimo": alvo["minimo"],
+            "fracao": alvo["fracao_garantia"],
+            "por_condicao": por_condicao,
+            "fixas": self.fixas,
+            "condicionar_fixas": self.condicionar_fixas,
+        }
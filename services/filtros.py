@@ -0,0 +1,358 @@
+# services/filtros.py
+import re
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from services.indice_combinacoes import IndiceCombinacoes
+from services.mascara import (
+    Mascara,
+    popcount,
+    mascaras_para_matriz,
+    MASCARA_PARES,
+    MASCARA_PRIMOS,
+    MASCARA_MOLDURA,
+    MASCARA_BAIXOS,
+    MASCARA_MEDIOS,
+    MASCARA_ALTOS,
+    PLANOS_SOMA,
+)
+
+Universo = Union[IndiceCombinacoes, np.ndarray, None]
+
+TAMANHO_BLOCO_FILTRO = 1 << 20
+
+# Campos numéricos do filtro -> máscara usada no popcount
+_CAMPOS_POPCOUNT = {
+    "pares": MASCARA_PARES,
+    "primos": MASCARA_PRIMOS,
+    "moldura": MASCARA_MOLDURA,
+    "baixos": MASCARA_BAIXOS,
+    "medios": MASCARA_MEDIOS,
+    "altos": MASCARA_ALTOS,
+}
+CAMPOS = ("soma", "impares", "maior_sequencia", "sequencias", *_CAMPOS_POPCOUNT)
+_COLUNAS_DO_INDICE = ("soma", *_CAMPOS_POPCOUNT)
+
+# Sinônimos aceitos no texto do filtro
+_ALIASES = {
+    "sequencia": "maior_sequencia",
+    "sequência": "maior_sequencia",
+    "seq": "maior_sequencia",
+    "médios": "medios",
+    "ímpares": "impares",
+    "repetidos": "repetidas",
+}
+
+
+class _Bloco:
+    """Fatia do universo com colunas calculadas sob demanda."""
+
+    def __init__(self, mascaras: np.ndarray, indice: Optional[IndiceCombinacoes] = None,
+                 fatia: Optional[slice] = None):
+        self.mascaras = mascaras
+        self._indice = indice
+        self._fatia = fatia
+        self._colunas: Dict[str, np.ndarray] = {}
+
+    def __getitem__(self, campo: str) -> np.ndarray:
+        if campo not in self._colunas:
+            self._colunas[campo] = self._calcular(campo)
+        return self._colunas[campo]
+
+    def _calcular(self, campo: str) -> np.ndarray:
+        m = self.mascaras
+        if self._indice is not None and campo in _COLUNAS_DO_INDICE:
+            # Universo completo: usa as colunas pré-calculadas do índice
+            return np.asarray(self._indice.coluna(campo)[self._fatia])
+        if campo in _CAMPOS_POPCOUNT:
+            return popcount(m & np.uint32(_CAMPOS_POPCOUNT[campo]))
+        if campo == "soma":
+            return sum(
+                popcount(m & np.uint32(plano)).astype(np.uint16) << b
+                for b, plano in enumerate(PLANOS_SOMA)
+            )
+        if campo == "impares":
+            return popcount(m) - self["pares"]
+        if campo == "maior_sequencia":
+            # Mesma regra de LoteriaAPI.analisar_sequencias: sequências têm 2+ dezenas
+            maior = IndiceCombinacoes.maior_sequencia(m)
+            return np.where(maior >= 2, maior, 0).astype(np.uint8)
+        if campo == "sequencias":
+            # Início de sequência: bit ligado, anterior desligado, seguinte ligado
+            return popcount(m & ~(m << np.uint32(1)) & (m >> np.uint32(1)))
+        raise ValueError(f"Campo de filtro desconhecido: {campo}")
+
+
+class Predicado:
+    """Uma restrição compilada: descrição + função vetorizada sobre um bloco."""
+
+    def __init__(self, descricao: str, funcao: Callable[[_Bloco], np.ndarray]):
+        self.descricao = descricao
+        self.funcao = funcao
+
+    def __call__(self, bloco: _Bloco) -> np.ndarray:
+        return self.funcao(bloco)
+
+    def __repr__(self) -> str:
+        return f"Predicado({self.descricao!r})"
+
+
+class Filtro:
+    """
+    Filtro declarativo de jogos compilado para operações NumPy.
+
+    Pode ser montado em Python:
+        Filtro().soma(185, 205).pares(7, 8).incluir(5, 15)
+                .repetidas(maximo=9, referencia=ultimo).maior_sequencia(maximo=4)
+    ou a partir de texto (cláusulas separadas por ';' ou quebra de linha):
+        Filtro.compilar("soma 185-205; pares 7-8; incluir 5 15; "
+                        "repetidas <=9; sequencia <=4", referencia=ultimo)
+    """
+
+    def __init__(self):
+        self.predicados: List[Predicado] = []
+
+    # =============================
+    # CONSTRUTOR (BUILDER)
+    # =============================
+    def faixa(self, campo: str, minimo: Optional[int] = None,
+              maximo: Optional[int] = None) -> "Filtro":
+        campo = _ALIASES.get(campo, campo)
+        if campo not in CAMPOS:
+            raise ValueError(f"Campo de filtro desconhecido: {campo}")
+        descricao = f"{campo} {_texto_faixa(minimo, maximo)}"
+        minimo = 0 if minimo is None else minimo
+        maximo = 325 if maximo is None else maximo
+        self.predicados.append(Predicado(
+            descricao, lambda b: _entre(b[campo], minimo, maximo)
+        ))
+        return self
+
+    def soma(self, minimo=None, maximo=None) -> "Filtro":
+        return self.faixa("soma", minimo, maximo)
+
+    def pares(self, minimo=None, maximo=None) -> "Filtro":
+        return self.faixa("pares", minimo, maximo)
+
+    def primos(self, minimo=None, maximo=None) -> "Filtro":
+        return self.faixa("primos", minimo, maximo)
+
+    def moldura(self, minimo=None, maximo=None) -> "Filtro":
+        return self.faixa("moldura", minimo, maximo)
+
+    def distribuicao(self, baixos: int, medios: int, altos: int) -> "Filtro":
+        return (self.faixa("baixos", baixos, baixos)
+                .faixa("medios", medios, medios)
+                .faixa("altos", altos, altos))
+
+    def maior_sequencia(self, minimo=None, maximo=None) -> "Filtro":
+        return self.faixa("maior_sequencia", minimo, maximo)
+
+    def incluir(self, *dezenas: int) -> "Filtro":
+        bits = np.uint32(int(Mascara.de_dezenas(dezenas)))
+        self.predicados.append(Predicado(
+            f"incluir {' '.join(map(str, sorted(dezenas)))}",
+            lambda b: (b.mascaras & bits) == bits
+        ))
+        return self
+
+    def excluir(self, *dezenas: int) -> "Filtro":
+        bits = np.uint32(int(Mascara.de_dezenas(dezenas)))
+        self.predicados.append(Predicado(
+            f"excluir {' '.join(map(str, sorted(dezenas)))}",
+            lambda b: (b.mascaras & bits) == 0
+        ))
+        return self
+
+    def grupo(self, dezenas: Iterable[int], minimo=None, maximo=None) -> "Filtro":
+        """Quantidade de dezenas do jogo dentro de um conjunto (ex.: 10+ de 18)."""
+        dezenas = sorted(dezenas)
+        bits = np.uint32(int(Mascara.de_dezenas(dezenas)))
+        descricao = f"grupo {','.join(map(str, dezenas))} {_texto_faixa(minimo, maximo)}"
+        minimo = 0 if minimo is None else minimo
+        maximo = 15 if maximo is None else maximo
+        self.predicados.append(Predicado(
+            descricao, lambda b: _entre(popcount(b.mascaras & bits), minimo, maximo)
+        ))
+        return self
+
+    def repetidas(self, minimo=None, maximo=None,
+                  referencia: Iterable[int] = ()) -> "Filtro":
+        """Dezenas repetidas em relação a um concurso de referência."""
+        referencia = list(referencia)
+        if not referencia:
+            raise ValueError("Filtro de repetidas exige as dezenas de referência")
+        self.grupo(referencia, minimo, maximo)
+        self.predicados[-1].descricao = f"repetidas {_texto_faixa(minimo, maximo)}"
+        return self
+
+    # =============================
+    # LINGUAGEM TEXTUAL
+    # =============================
+    @staticmethod
+    def compilar(texto: str, referencia: Iterable[int] = ()) -> "Filtro":
+        """
+        Cláusulas aceitas (uma por ';' ou linha):
+            <campo> <faixa>          soma 185-205 | pares 7 | primos >=4 | sequencia <=4
+            incluir <dezenas>        incluir 5 15
+            excluir <dezenas>        excluir 1,2
+            repetidas <faixa>        repetidas <=9   (usa 'referencia')
+            grupo <dezenas> <faixa>  grupo 1,2,3,4,5,6 >=3
+        """
+        filtro = Filtro()
+        for clausula in re.split(r"[;\n]+", texto.lower()):
+            tokens = re.split(r"[\s,]+", clausula.strip())
+            if not tokens or not tokens[0]:
+                continue
+            campo = _ALIASES.get(tokens[0], tokens[0])
+            resto = tokens[1:]
+
+            if campo in ("incluir", "excluir"):
+                dezenas = [int(t) for t in resto]
+                getattr(filtro, campo)(*dezenas)
+            elif campo == "grupo" and len(resto) >= 2:
+                filtro.grupo([int(t) for t in resto[:-1]], *_ler_faixa(resto[-1]))
+            elif campo == "repetidas" and len(resto) == 1:
+                filtro.repetidas(*_ler_faixa(resto[0]), referencia=referencia)
+            elif campo in CAMPOS and len(resto) == 1:
+                filtro.faixa(campo, *_ler_faixa(resto[0]))
+            else:
+                raise ValueError(f"Cláusula de filtro inválida: {clausula.strip()!r}")
+        return filtro
+
+    # =============================
+    # EXECUÇÃO
+    # =============================
+    def avaliar(self, mascaras: np.ndarray) -> np.ndarray:
+        """Vetor booleano para um array de máscaras."""
+        return self._avaliar_bloco(_Bloco(np.asarray(mascaras, dtype=np.uint32)))
+
+    def contar(self, universo: Universo = None) -> int:
+        return sum(int(np.count_nonzero(sel)) for _, sel in self._percorrer(universo))
+
+    def posicoes(self, universo: Universo = None) -> np.ndarray:
+        """Posições (no universo) dos jogos aceitos."""
+        partes = [inicio + np.flatnonzero(sel) for inicio, sel in self._percorrer(universo)]
+        return np.concatenate(partes) if partes else np.empty(0, dtype=np.int64)
+
+    def iterar(self, universo: Universo = None) -> Iterator[List[int]]:
+        """Jogos aceitos, gerados sob demanda bloco a bloco."""
+        mascaras = _mascaras_do_universo(universo)
+        for inicio, sel in self._percorrer(universo):
+            aceitos = np.asarray(mascaras[inicio:inicio + len(sel)])[sel]
+            for linha in mascaras_para_matriz(aceitos):
+                yield (np.flatnonzero(linha) + 1).tolist()
+
+    def amostrar(self, quantidade: int, universo: Universo = None,
+                 rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """Sorteio uniforme (com reposição) entre os aceitos. Retorna máscaras."""
+        posicoes = self.posicoes(universo)
+        if not len(posicoes):
+            raise ValueError(f"Nenhum jogo atende ao filtro: {self}")
+        rng = rng or np.random.default_rng()
+        escolhidos = posicoes[rng.integers(0, len(posicoes), size=quantidade)]
+        return np.asarray(_mascaras_do_universo(universo)[escolhidos])
+
+    def seletividade(self, universo: Universo = None) -> List[Dict]:
+        """
+        Quanto cada predicado corta do universo, isoladamente e na sequência
+        em que foi declarado.
+        """
+        total = len(_mascaras_do_universo(universo))
+        isolados = np.zeros(len(self.predicados), dtype=np.int64)
+        acumulados = np.zeros(len(self.predicados), dtype=np.int64)
+
+        for bloco in _blocos(universo):
+            selecao = np.ones(len(bloco.mascaras), dtype=bool)
+            for i, predicado in enumerate(self.predicados):
+                resultado = predicado(bloco)
+                isolados[i] += np.count_nonzero(resultado)
+                selecao &= resultado
+                acumulados[i] += np.count_nonzero(selecao)
+
+        relatorio = []
+        anterior = total
+        for i, predicado in enumerate(self.predicados):
+            relatorio.append({
+                "predicado": predicado.descricao,
+                "isolado": int(isolados[i]),
+                "fracao_isolado": round(float(isolados[i]) / total, 6) if total else 0.0,
+                "acumulado": int(acumulados[i]),
+                "fracao_etapa": round(float(acumulados[i]) / anterior, 6) if anterior else 0.0,
+            })
+            anterior = int(acumulados[i])
+        return relatorio
+
+    def _percorrer(self, universo: Universo) -> Iterator[Tuple[int, np.ndarray]]:
+        inicio = 0
+        for bloco in _blocos(universo):
+            yield inicio, self._avaliar_bloco(bloco)
+            inicio += len(bloco.mascaras)
+
+    def _avaliar_bloco(self, bloco: _Bloco) -> np.ndarray:
+        selecao = np.ones(len(bloco.mascaras), dtype=bool)
+        for predicado in self.predicados:
+            selecao &= predicado(bloco)
+        return selecao
+
+    def __str__(self) -> str:
+        return "; ".join(p.descricao for p in self.predicados)
+
+    def __repr__(self) -> str:
+        return f"Filtro({str(self)!r})"
+
+
+# =============================
+# AUXILIARES
+# =============================
+def _mascaras_do_universo(universo: Universo) -> np.ndarray:
+    if universo is None:
+        universo = IndiceCombinacoes.obter()
+    if isinstance(universo, IndiceCombinacoes):
+        return universo.coluna("mascara")
+    return np.asarray(universo, dtype=np.uint32)
+
+
+def _blocos(universo: Universo, tamanho: int = TAMANHO_BLOCO_FILTRO) -> Iterator[_Bloco]:
+    if universo is None:
+        universo = IndiceCombinacoes.obter()
+    indice = universo if isinstance(universo, IndiceCombinacoes) else None
+    mascaras = _mascaras_do_universo(universo)
+    for inicio in range(0, len(mascaras), tamanho):
+        fatia = slice(inicio, inicio + tamanho)
+        yield _Bloco(np.asarray(mascaras[fatia]), indice, fatia)
+
+
+def _entre(valores: np.ndarray, minimo: int, maximo: int) -> np.ndarray:
+    return (valores >= minimo) & (valores <= maximo)
+
+
+def _ler_faixa(texto: str) -> Tuple[Optional[int], Optional[int]]:
+    """'185-205' | '7' | '<=9' | '>=4' | '<5' | '>3' -> (min, max)"""
+    m = re.fullmatch(r"(\d+)-(\d+)", texto)
+    if m:
+        return int(m.group(1)), int(m.group(2))
+    m = re.fullmatch(r"(<=|>=|<|>|=)?(\d+)", texto)
+    if not m:
+        raise ValueError(f"Faixa inválida: {texto!r}")
+    operador, valor = m.group(1) or "=", int(m.group(2))
+    return {
+        "=": (valor, valor),
+        "<=": (None, valor),
+        "<": (None, valor - 1),
+        ">=": (valor, None),
+        ">": (valor + 1, None),
+    }[operador]
+
+
+def _texto_faixa(minimo: Optional[int], maximo: Optional[int]) -> str:
+    """Faixa no formato do texto do filtro; limite ausente não aparece."""
+    if minimo is None and maximo is None:
+        return "qualquer"
+    if minimo is None:
+        return f"<={maximo}"
+    if maximo is None:
+        return f">={minimo}"
+    return str(minimo) if minimo == maximo else f"{minimo}-{maximo}"
+
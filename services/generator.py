@@ -1,18 +1,38 @@
 # services/generator.py - VERSÃO COMPLETA E ATUALIZADA
 import random
-from typing import Tuple, List, Dict
+from typing import Tuple, List, Dict, Optional, Union
 from collections import Counter
+
+import numpy as np
+
 from config import settings
+from services.amostrador import AmostradorRestrito
+from services.fechamento import Fechamento
+from services.indice_combinacoes import IndiceCombinacoes
+from services.indice_frequencia import IndiceFrequencia
+from services.mascara import (
+    Mascara,
+    dezenas_para_mascaras,
+    popcount,
+    MASCARA_PRIMOS,
+    MASCARAS_LINHAS,
+    MASCARAS_COLUNAS,
+    MASCARAS_QUADRANTES,
+)
 
 class JogoGenerator:
     """Gerador de jogos estratégicos com análise avançada"""
     
     @staticmethod
-    def gerar_555(ultimo_resultado: List[int]) -> Tuple[List[int], List[int]]:
+    def gerar_555(ultimo_resultado: List[int],
+                  rng: Optional[random.Random] = None) -> Tuple[List[int], List[int]]:
         """
         Método Estratégico: 5 Baixos, 5 Médios, 5 Altos
         Com análise inteligente do último resultado
+        Args:
+            rng: gerador para sorteios reprodutíveis (padrão: módulo random)
         """
+        rng = rng or random
         baixos_pool = list(range(settings.RANGES['baixos'][0], settings.RANGES['baixos'][1] + 1))
         medios_pool = list(range(settings.RANGES['medios'][0], settings.RANGES['medios'][1] + 1))
         altos_pool = list(range(settings.RANGES['altos'][0], settings.RANGES['altos'][1] + 1))
@@ -28,8 +48,8 @@ class JogoGenerator:
         
         # Define fixos estratégicos baseados no último resultado
         # Usa os números mais comuns em cada faixa
-        fixo_b = 5 if 5 in ultimo_resultado else (3 if 3 in ultimo_resultado else random.choice(baixos_pool))
-        fixo_m = 15 if 15 in ultimo_resultado else (13 if 13 in ultimo_resultado else random.choice(medios_pool))
+        fixo_b = 5 if 5 in ultimo_resultado else (3 if 3 in ultimo_resultado else rng.choice(baixos_pool))
+        fixo_m = 15 if 15 in ultimo_resultado else (13 if 13 in ultimo_resultado else rng.choice(medios_pool))
         
         def montar_grupo(pool: List[int], meta: int, fixo: int, 
                         ausentes_lista: List[int], grupo_ultimo: List[int]) -> List[int]:
@@ -48,16 +68,16 @@ class JogoGenerator:
             
             # Adiciona ausentes
             if grupo_ausentes and qtd_ausentes > 0:
-                selecionados.extend(random.sample(grupo_ausentes, qtd_ausentes))
+                selecionados.extend(rng.sample(grupo_ausentes, qtd_ausentes))
             
             # Adiciona presentes
             if grupo_presentes and qtd_presentes > 0 and len(grupo_presentes) >= qtd_presentes:
-                selecionados.extend(random.sample(grupo_presentes, qtd_presentes))
+                selecionados.extend(rng.sample(grupo_presentes, qtd_presentes))
             else:
                 # Completa com qualquer número disponível
                 disponiveis = [n for n in pool_clean if n not in selecionados]
                 if len(disponiveis) >= qtd_presentes:
-                    selecionados.extend(random.sample(disponiveis, qtd_presentes))
+                    selecionados.extend(rng.sample(disponiveis, qtd_presentes))
             
             return selecionados
         
@@ -68,7 +88,7 @@ class JogoGenerator:
         # Para altos, usa estratégia diferente (todos os números disponíveis)
         grupo_altos = []
         altos_disponiveis = altos_pool.copy()
-        random.shuffle(altos_disponiveis)
+        rng.shuffle(altos_disponiveis)
         grupo_altos = altos_disponiveis[:5]
         
         jogo = grupo_baixos + grupo_medios + grupo_altos
@@ -122,15 +142,18 @@ class JogoGenerator:
                 'recomendacoes': ["Sem dados históricos suficientes para análise"]
             }
         
+        # KPIs do palpite uma vez só; por concurso muda apenas 'repetidas'
+        kpis_palpite = KPICalculator.calcular(palpite)
         analises = []
         for i, resultado in enumerate(resultados_anteriores):
-            kpis = KPICalculator.calcular(palpite, resultado)
+            repetidos = len(set(palpite) & set(resultado))
+            kpis = {**kpis_palpite, 'repetidas': repetidos} if len(palpite) == 15 else kpis_palpite
             analise = {
                 'concurso': f"Anterior-{i+1}",
-                'repetidos': len(set(palpite) & set(resultado)),
+                'repetidos': repetidos,
                 'kpis': kpis,
                 'diferenca_soma': abs(kpis['soma'] - sum(resultado)),
-                'distribuicao_original': KPICalculator.calcular(resultado)['dist']
+                'distribuicao_original': JogoGenerator._distribuicao(resultado)
             }
             analises.append(analise)
         
@@ -138,18 +161,16 @@ class JogoGenerator:
         media_repeticao = sum(a['repetidos'] for a in analises) / len(analises) if analises else 0
         
         # Análise de números quentes/frios no palpite
-        todos_numeros_anteriores = [num for resultado in resultados_anteriores for num in resultado]
-        frequencia_numeros = Counter(todos_numeros_anteriores)
+        frequencia_numeros = IndiceFrequencia.contar(resultados_anteriores)
         
         # Números quentes: aparecem em pelo menos 50% dos concursos
         limite_quente = len(resultados_anteriores) * 0.5
-        numeros_palpite_quentes = [n for n in palpite if frequencia_numeros.get(n, 0) >= limite_quente]
+        numeros_palpite_quentes = [n for n in palpite if frequencia_numeros[n - 1] >= limite_quente]
         
         # Números frios: não apareceram em nenhum concurso anterior
-        numeros_palpite_frios = [n for n in palpite if n not in todos_numeros_anteriores]
+        numeros_palpite_frios = [n for n in palpite if frequencia_numeros[n - 1] == 0]
         
         # Verifica se segue padrões históricos
-        kpis_palpite = KPICalculator.calcular(palpite)
         soma_ideal = 180 <= kpis_palpite['soma'] <= 210
         distribuicao_ideal = kpis_palpite['dist'] == "5B | 5M | 5A"
         
@@ -168,6 +189,86 @@ class JogoGenerator:
             'recomendacoes': JogoGenerator._gerar_recomendacoes_detalhadas(analises, kpis_palpite)
         }
     
+    @staticmethod
+    def buscar_similares(
+        jogos: Union[List[int], List[List[int]]],
+        k: int = 5,
+        pesos: Optional[Dict[str, float]] = None,
+        historico: Optional[Tuple[np.ndarray, np.ndarray]] = None
+    ) -> Union[List[Dict], List[List[Dict]]]:
+        """
+        Concursos do histórico mais parecidos com o(s) jogo(s).
+        Args:
+            jogos: um jogo ou uma lista de jogos (consulta em lote)
+            k: quantidade de concursos por jogo
+            pesos: similaridade ponderada; chaves 'intersecao' (padrão 1),
+                'soma' (por 10 de diferença), 'pares' e 'distribuicao'
+                (diferença B/M/A). Sem pesos: só a interseção.
+            historico: (concursos, máscaras); padrão: histórico oficial local
+        Returns:
+            Para cada jogo, k dicts {'concurso', 'dezenas', 'acertos', 'similaridade'}
+            em ordem decrescente (empates: concurso mais recente primeiro)
+        """
+        if len(jogos) == 0:
+            return []
+        lote = isinstance(jogos[0], (list, tuple, np.ndarray))
+        consultas = dezenas_para_mascaras(jogos if lote else [jogos])
+
+        if historico is None:
+            from services.loteria_api import LoteriaAPI
+            historico = LoteriaAPI().carregar_mascaras()
+        concursos, mascaras = historico
+        mascaras = np.asarray(mascaras, dtype=np.uint32)
+        k = min(k, len(mascaras))
+        if k == 0:
+            return [[] for _ in consultas] if lote else []
+
+        pesos = {"intersecao": 1.0, **(pesos or {})}
+        usar_kpis = any(pesos.get(c) for c in ("soma", "pares", "distribuicao"))
+        if usar_kpis:
+            kpis_hist = JogoGenerator._vetor_similaridade(mascaras)
+            kpis_cons = JogoGenerator._vetor_similaridade(consultas)
+
+        # Desempate pelo concurso mais recente: pequeno bônus crescente
+        desempate = np.arange(len(mascaras), dtype=np.float64) / (len(mascaras) * 1e6)
+
+        resultados = []
+        bloco = max(1, (1 << 22) // len(mascaras))  # limita a matriz Q x N por vez
+        for inicio in range(0, len(consultas), bloco):
+            parte = consultas[inicio:inicio + bloco]
+            acertos = popcount(parte[:, None] & mascaras[None, :])
+            pontos = pesos["intersecao"] * acertos.astype(np.float64)
+            if usar_kpis:
+                cons = kpis_cons[inicio:inicio + bloco]
+                pontos -= pesos.get("soma", 0) * np.abs(cons[:, None, 0] - kpis_hist[None, :, 0]) / 10
+                pontos -= pesos.get("pares", 0) * np.abs(cons[:, None, 1] - kpis_hist[None, :, 1])
+                pontos -= pesos.get("distribuicao", 0) * np.abs(
+                    cons[:, None, 2:] - kpis_hist[None, :, 2:]
+                ).sum(axis=2) / 2
+            ordenacao = pontos + desempate
+
+            melhores = np.argpartition(-ordenacao, k - 1, axis=1)[:, :k]
+            for linha, candidatos in enumerate(melhores):
+                candidatos = candidatos[np.argsort(-ordenacao[linha, candidatos])]
+                resultados.append([{
+                    "concurso": int(concursos[i]),
+                    "dezenas": Mascara(int(mascaras[i])).para_dezenas(),
+                    "acertos": int(acertos[linha, i]),
+                    "similaridade": round(float(pontos[linha, i]), 3)
+                } for i in candidatos])
+
+        return resultados if lote else resultados[0]
+
+    @staticmethod
+    def _vetor_similaridade(mascaras: np.ndarray) -> np.ndarray:
+        """Colunas soma, pares, baixos, médios, altos (faixas dos KPIs)."""
+        from services.kpi_calculator import KPICalculator
+
+        kpis = KPICalculator.calcular_lote(mascaras)
+        return np.column_stack([
+            kpis["soma"], kpis["pares"], kpis["baixos"], kpis["medios"], kpis["altos"]
+        ]).astype(np.float64)
+
     @staticmethod
     def _gerar_recomendacao(kpis: Dict) -> str:
         """Gera recomendação baseada nos KPIs do palpite"""
@@ -258,18 +359,22 @@ class JogoGenerator:
     def gerar_palpite_inteligente(resultados_anteriores: List[List[int]], 
                                  usar_numeros_quentes: bool = True,
                                  balancear_distribuicao: bool = True,
-                                 incluir_numeros_frios: bool = True) -> Tuple[List[int], Dict]:
+                                 incluir_numeros_frios: bool = True,
+                                 rng: Optional[random.Random] = None,
+                                 frequencia: Optional[np.ndarray] = None) -> Tuple[List[int], Dict]:
         """
         Gera palpite inteligente baseado em análises anteriores
+        Args:
+            rng: gerador para sorteios reprodutíveis (padrão: módulo random)
+            frequencia: contagem por dezena já calculada (evita recontar o histórico)
         Returns:
             Tuple (palpite, análise_da_geração)
         """
-        from collections import Counter
-        
+        rng = rng or random
         if not resultados_anteriores:
             # Fallback: gera palpite básico
             ultimo = resultados_anteriores[-1] if resultados_anteriores else list(range(1, 16))
-            palpite, fixos = JogoGenerator.gerar_555(ultimo)
+            palpite, fixos = JogoGenerator.gerar_555(ultimo, rng)
             return palpite, {
                 'estrategia': 'Fallback (sem histórico)',
                 'fixos': fixos,
@@ -277,17 +382,18 @@ class JogoGenerator:
             }
         
         # Analisa frequência dos números
-        todos_numeros = [num for resultado in resultados_anteriores for num in resultado]
-        frequencia = Counter(todos_numeros)
+        if frequencia is None:
+            frequencia = IndiceFrequencia.contar(resultados_anteriores)
+        frequencia = np.asarray(frequencia).tolist()  # comparações com int nativo
         
         # Separa números por frequência
         limite_quente = len(resultados_anteriores) * 0.7
         limite_frio = len(resultados_anteriores) * 0.3
         
-        numeros_quentes = [num for num, freq in frequencia.items() 
-                          if freq >= limite_quente]
+        numeros_quentes = [num for num in range(1, 26) 
+                          if frequencia[num - 1] >= limite_quente]
         numeros_frios = [num for num in range(1, 26) 
-                        if num not in frequencia or frequencia[num] <= limite_frio]
+                        if frequencia[num - 1] <= limite_frio]
         numeros_medianos = [num for num in range(1, 26) 
                            if num not in numeros_quentes and num not in numeros_frios]
         
@@ -305,22 +411,22 @@ class JogoGenerator:
         selecionados = []
         
         if numeros_quentes and qtd_quentes > 0:
-            selecionados.extend(random.sample(numeros_quentes, qtd_quentes))
+            selecionados.extend(rng.sample(numeros_quentes, qtd_quentes))
         
         if numeros_medianos and qtd_medianos > 0:
-            selecionados.extend(random.sample(numeros_medianos, qtd_medianos))
+            selecionados.extend(rng.sample(numeros_medianos, qtd_medianos))
         
         if numeros_frios and qtd_frios > 0:
-            selecionados.extend(random.sample(numeros_frios, qtd_frios))
+            selecionados.extend(rng.sample(numeros_frios, qtd_frios))
         
         # Completa até 15 se necessário
         if len(selecionados) < 15:
             numeros_disponiveis = [n for n in range(1, 26) if n not in selecionados]
-            selecionados.extend(random.sample(numeros_disponiveis, 15 - len(selecionados)))
+            selecionados.extend(rng.sample(numeros_disponiveis, 15 - len(selecionados)))
         
         # Balanceia distribuição se solicitado
         if balancear_distribuicao:
-            selecionados = JogoGenerator._balancear_distribuicao(selecionados)
+            selecionados = JogoGenerator._balancear_distribuicao(selecionados, rng)
         
         # Define fixos estratégicos
         ultimo_resultado = resultados_anteriores[-1]
@@ -330,14 +436,14 @@ class JogoGenerator:
         # Garante que os fixos estão no palpite
         if fixo_b not in selecionados and len(selecionados) > 0:
             # Substitui um número aleatório pelo fixo
-            index = random.randint(0, len(selecionados)-1)
+            index = rng.randint(0, len(selecionados)-1)
             selecionados[index] = fixo_b
         
         if fixo_m not in selecionados and len(selecionados) > 0:
             # Encontra um número que não seja fixo_b para substituir
             disponiveis = [i for i, n in enumerate(selecionados) if n != fixo_b]
             if disponiveis:
-                index = random.choice(disponiveis)
+                index = rng.choice(disponiveis)
                 selecionados[index] = fixo_m
         
         palpite_final = sorted(selecionados)
@@ -362,8 +468,10 @@ class JogoGenerator:
         return palpite_final, analise_geracao
     
     @staticmethod
-    def _balancear_distribuicao(numeros: List[int]) -> List[int]:
+    def _balancear_distribuicao(numeros: List[int],
+                                rng: Optional[random.Random] = None) -> List[int]:
         """Balanceia a distribuição dos números"""
+        rng = rng or random
         baixos = [n for n in numeros if settings.RANGES['baixos'][0] <= n <= settings.RANGES['baixos'][1]]
         medios = [n for n in numeros if settings.RANGES['medios'][0] <= n <= settings.RANGES['medios'][1]]
         altos = [n for n in numeros if settings.RANGES['altos'][0] <= n <= settings.RANGES['altos'][1]]
@@ -384,7 +492,7 @@ class JogoGenerator:
         # Se faltarem números, completa
         if len(ajustados) < 15:
             numeros_disponiveis = [n for n in range(1, 26) if n not in ajustados]
-            ajustados.extend(random.sample(numeros_disponiveis, 15 - len(ajustados)))
+            ajustados.extend(rng.sample(numeros_disponiveis, 15 - len(ajustados)))
         
         return sorted(ajustados)
     
@@ -441,26 +549,68 @@ class JogoGenerator:
                 })
             
             elif estrategia == 'aleatorio':
-                # Gera palpite aleatório balanceado
-                import numpy as np
-                while True:
-                    palpite = sorted(random.sample(range(1, 26), 15))
-                    from services.kpi_calculator import KPICalculator
-                    kpis = KPICalculator.calcular(palpite)
-                    # Aceita apenas palpites razoáveis
-                    if 160 <= kpis['soma'] <= 220 and 4 <= kpis['pares'] <= 11:
-                        analise = JogoGenerator.analisar_palpite(palpite, ultimo_resultado)
-                        palpites.append({
-                            'numero': i + 1,
-                            'estrategia': 'Aleatório Balanceado',
-                            'palpite': palpite,
-                            'fixos': [],
-                            'analise': analise
-                        })
-                        break
+                # Sorteio uniforme exato entre os palpites razoáveis (sem rejeição)
+                palpite = AmostradorRestrito.obter(
+                    soma=(160, 220), pares=(4, 11)
+                ).amostrar_dezenas(1)[0]
+                analise = JogoGenerator.analisar_palpite(palpite, ultimo_resultado)
+                palpites.append({
+                    'numero': i + 1,
+                    'estrategia': 'Aleatório Balanceado',
+                    'palpite': palpite,
+                    'fixos': [],
+                    'analise': analise
+                })
         
         return palpites
     
+    @staticmethod
+    def gerar_fechamento(dezenas: List[int],
+                         garantia: int = 13,
+                         condicao: int = 15,
+                         fixos: Optional[List[int]] = None,
+                         condicionar_fixos: bool = False,
+                         tempo_limite: Optional[float] = 30.0,
+                         semente: Optional[int] = None) -> Dict:
+        """
+        Fechamento: menor conjunto de bilhetes que garante 'garantia' pontos
+        se 'condicao' das dezenas escolhidas forem sorteadas
+        Args:
+            dezenas: 16 a 20 dezenas escolhidas
+            fixos: dezenas obrigatórias em todos os bilhetes (ex.: fixos do gerar_555)
+            condicionar_fixos: a garantia só vale se os fixos forem sorteados
+        Returns:
+            Bilhetes e a garantia exata verificada (ver Fechamento.gerar)
+        """
+        fechamento = Fechamento(dezenas, garantia=garantia, condicao=condicao,
+                                fixas=fixos or (), condicionar_fixas=condicionar_fixos)
+        return fechamento.gerar(tempo_limite=tempo_limite, semente=semente)
+
+    @staticmethod
+    def gerar_em_massa(estrategia: str = "aleatorio",
+                       quantidade: int = 1000,
+                       restricoes: Optional[Dict] = None,
+                       semente: Optional[int] = None,
+                       processos: Optional[int] = None,
+                       ultimo_resultado: Optional[List[int]] = None,
+                       historico: Optional[List[List[int]]] = None,
+                       analisar: bool = False) -> Dict:
+        """
+        Gera muitos palpites de uma vez, em paralelo e reprodutível
+        Args:
+            estrategia: "555", "inteligente", "aleatorio" ou "uniforme"
+            restricoes: fixas, excluidas e faixas de KPI (ex.: soma=(180, 210))
+            semente: a mesma semente gera a mesma carteira
+            analisar: inclui KPIs por bilhete (vetorizadas)
+        Returns:
+            Máscaras uint32 dos bilhetes, semente e desempenho (ver GeradorMassa.gerar)
+        """
+        from services.geracao_massa import GeradorMassa
+
+        gerador = GeradorMassa(estrategia, ultimo_resultado=ultimo_resultado,
+                               historico=historico, restricoes=restricoes)
+        return gerador.gerar(quantidade, semente=semente, processos=processos, analisar=analisar)
+
     @staticmethod
     def obter_estatisticas_palpite(palpite: List[int], historico: List[List[int]] = None) -> Dict:
         """
@@ -493,42 +643,55 @@ class JogoGenerator:
         
         return estatisticas
     
+    @staticmethod
+    def _linha_indice(jogo: List[int]) -> Optional[Dict]:
+        """Linha pré-calculada do IndiceCombinacoes; None se não for um jogo de 15 dezenas válidas."""
+        dezenas = set(jogo)
+        if len(dezenas) != 15 or not all(1 <= n <= 25 for n in dezenas):
+            return None
+        return IndiceCombinacoes.obter().consultar(dezenas)
+
+    @staticmethod
+    def _distribuicao(jogo: List[int]) -> str:
+        """Distribuição baixos/médios/altos lida do índice (ex.: '5B | 5M | 5A')."""
+        from services.kpi_calculator import KPICalculator
+
+        linha = JogoGenerator._linha_indice(jogo)
+        if linha is None:
+            return KPICalculator.calcular(jogo)['dist']
+        return f"{linha['baixos']}B | {linha['medios']}M | {linha['altos']}A"
+
+    @staticmethod
+    def _bits_palpite(palpite: List[int]) -> int:
+        """Máscara do palpite ignorando dezenas fora de 1-25 (não entram em nenhuma faixa)."""
+        return int(Mascara.de_dezenas([n for n in palpite if 1 <= n <= 25]))
+
     @staticmethod
     def _analisar_distribuicao_detalhada(palpite: List[int]) -> Dict:
         """Análise detalhada da distribuição do palpite"""
-        # Análise por quadrantes (matriz 5x5)
-        quadrantes = {
-            'Q1': [1, 2, 3, 4, 5, 6, 11, 12, 13, 14, 15],
-            'Q2': [7, 8, 9, 10, 16, 17, 18, 19, 20],
-            'Q3': [21, 22, 23, 24, 25]
-        }
-        
-        # Análise por linhas (matriz 5x5)
-        linhas = {
-            'Linha1': [1, 2, 3, 4, 5],
-            'Linha2': [6, 7, 8, 9, 10],
-            'Linha3': [11, 12, 13, 14, 15],
-            'Linha4': [16, 17, 18, 19, 20],
-            'Linha5': [21, 22, 23, 24, 25]
-        }
-        
-        # Análise por colunas (matriz 5x5)
-        colunas = {
-            'Col1': [1, 6, 11, 16, 21],
-            'Col2': [2, 7, 12, 17, 22],
-            'Col3': [3, 8, 13, 18, 23],
-            'Col4': [4, 9, 14, 19, 24],
-            'Col5': [5, 10, 15, 20, 25]
-        }
+        linha = JogoGenerator._linha_indice(palpite)
+        if linha is not None:
+            # Contagens por quadrante, linha e coluna já pré-calculadas no índice
+            quadrantes, linhas, colunas = linha['quadrantes'], linha['linhas'], linha['colunas']
+        else:
+            # Palpite fora do padrão (não tem linha no índice): popcount direto
+            bits = JogoGenerator._bits_palpite(palpite)
+            quadrantes = [(bits & m).bit_count() for m in MASCARAS_QUADRANTES]
+            linhas = [(bits & m).bit_count() for m in MASCARAS_LINHAS]
+            colunas = [(bits & m).bit_count() for m in MASCARAS_COLUNAS]
+
+        por_quadrante = {f'Q{i + 1}': c for i, c in enumerate(quadrantes)}
+        por_linha = {f'Linha{i + 1}': c for i, c in enumerate(linhas)}
+        por_coluna = {f'Col{i + 1}': c for i, c in enumerate(colunas)}
         
         return {
-            'por_quadrante': {q: len([n for n in palpite if n in nums]) for q, nums in quadrantes.items()},
-            'por_linha': {l: len([n for n in palpite if n in nums]) for l, nums in linhas.items()},
-            'por_coluna': {c: len([n for n in palpite if n in nums]) for c, nums in colunas.items()},
+            'por_quadrante': por_quadrante,
+            'por_linha': por_linha,
+            'por_coluna': por_coluna,
             'balanceamento': {
-                'ideal_quadrantes': all(3 <= count <= 7 for count in [len([n for n in palpite if n in nums]) for nums in quadrantes.values()]),
-                'ideal_linhas': all(1 <= count <= 5 for count in [len([n for n in palpite if n in nums]) for nums in linhas.values()]),
-                'ideal_colunas': all(1 <= count <= 5 for count in [len([n for n in palpite if n in nums]) for nums in colunas.values()])
+                'ideal_quadrantes': all(3 <= count <= 7 for count in por_quadrante.values()),
+                'ideal_linhas': all(1 <= count <= 5 for count in por_linha.values()),
+                'ideal_colunas': all(1 <= count <= 5 for count in por_coluna.values())
             }
         }
     
@@ -575,9 +738,10 @@ class JogoGenerator:
             terminacao = n % 10
             terminacoes[terminacao] = terminacoes.get(terminacao, 0) + 1
         
-        # Verifica números primos
-        primos = [2, 3, 5, 7, 11, 13, 17, 19, 23]
-        quantidade_primos = len([n for n in palpite if n in primos])
+        # Verifica números primos (do índice quando o palpite tem linha lá)
+        linha = JogoGenerator._linha_indice(palpite)
+        quantidade_primos = linha['primos'] if linha is not None else \
+            (JogoGenerator._bits_palpite(palpite) & MASCARA_PRIMOS).bit_count()
         
         return {
             'multiplos': multiplos,
@@ -0,0 +1,276 @@
+# services/geracao_massa.py
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from config import settings
+from services.amostrador import AmostradorRestrito
+from services.indice_combinacoes import IndiceCombinacoes
+from services.indice_frequencia import IndiceFrequencia
+from services.mascara import Mascara, dezenas_para_mascaras, popcount
+
+ESTRATEGIAS_MASSA = ("555", "inteligente", "aleatorio", "uniforme")
+# Bilhetes por tarefa: cada bloco tem a própria semente (SeedSequence.spawn),
+# então o resultado não depende do número de processos
+BLOCO_BILHETES = 1 << 16
+# Restrições padrão da estratégia "aleatorio" (as mesmas de gerar_multiplos_palpites)
+RESTRICOES_ALEATORIO = {"soma": (160, 220), "pares": (4, 11)}
+# Rodadas de rejeição para restrições aplicadas a 555/inteligente
+MAXIMO_RODADAS = 200
+KPIS_MASSA = ("soma", "pares", "primos", "moldura", "maior_sequencia")
+
+# Contexto do processo trabalhador (definido no initializer do pool)
+_contexto_trabalhador: Dict[str, Any] = {}
+
+
+class GeradorMassa:
+    """
+    Geração em massa e reprodutível de bilhetes (máscaras uint32).
+    Os blocos de BLOCO_BILHETES são distribuídos num ProcessPool; cada
+    bloco usa um fluxo próprio derivado da semente, então a mesma semente
+    gera a mesma carteira com qualquer quantidade de processos.
+    555, aleatorio e uniforme são vetorizadas; inteligente roda bilhete
+    a bilhete dentro dos trabalhadores.
+    """
+
+    def __init__(self, estrategia: str = "aleatorio",
+                 ultimo_resultado: Optional[Sequence[int]] = None,
+                 historico: Optional[List[List[int]]] = None,
+                 restricoes: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            estrategia: "555", "inteligente", "aleatorio" ou "uniforme"
+            ultimo_resultado: base do 5-5-5 (padrão: último do histórico)
+            historico: resultados anteriores (obrigatório para "inteligente")
+            restricoes: fixas, excluidas e faixas do AmostradorRestrito,
+                ex.: {"soma": (180, 210), "fixas": [5, 15]}
+        """
+        if estrategia not in ESTRATEGIAS_MASSA:
+            raise ValueError(f"Estratégia desconhecida: {estrategia}")
+        if estrategia == "inteligente" and not historico:
+            raise ValueError("A estratégia inteligente precisa do histórico")
+        if ultimo_resultado is None:
+            ultimo_resultado = historico[-1] if historico else list(range(1, 16))
+
+        self.estrategia = estrategia
+        self.contexto = {
+            "estrategia": estrategia,
+            "ultimo": sorted(int(n) for n in ultimo_resultado),
+            "historico": historico if estrategia == "inteligente" else None,
+            "frequencia": IndiceFrequencia.contar(historico) if estrategia == "inteligente" else None,
+            "restricoes": dict(restricoes or {}),
+        }
+        # Falha cedo se as restrições não tiverem solução
+        if self.contexto["restricoes"] or estrategia == "aleatorio":
+            _amostrador(self.contexto).amostrar(1)
+
+    # =============================
+    # GERAÇÃO
+    # =============================
+    def gerar(self, quantidade: int, semente: Optional[int] = None,
+              processos: Optional[int] = None, analisar: bool = False,
+              progresso: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
+        """
+        Args:
+            quantidade: bilhetes gerados
+            semente: torna a carteira reprodutível (None = aleatória)
+            processos: tamanho do pool (None = CPUs; 1 = sem pool)
+            analisar: inclui KPIs vetorizadas por bilhete (soma, pares, ...)
+            progresso: callback(bilhetes_gerados, quantidade)
+        Returns:
+            Máscaras uint32 na ordem dos blocos, semente usada e desempenho
+        """
+        raiz = np.random.SeedSequence(semente)
+        tamanhos = [min(BLOCO_BILHETES, quantidade - a) for a in range(0, quantidade, BLOCO_BILHETES)]
+        sementes = raiz.spawn(len(tamanhos))
+        mascaras = np.empty(quantidade, dtype=np.uint32)
+        inicios = np.cumsum([0] + tamanhos[:-1])
+
+        relogio = time.perf_counter()
+        processos = processos or os.cpu_count() or 1
+        gerados = 0
+        if processos <= 1 or len(tamanhos) <= 1:
+            _definir_contexto(self.contexto)
+            blocos = (_gerar_bloco(t, s) for t, s in zip(tamanhos, sementes))
+            for inicio, bloco in zip(inicios, blocos):
+                mascaras[inicio:inicio + len(bloco)] = bloco
+                gerados += len(bloco)
+                if progresso:
+                    progresso(gerados, quantidade)
+        else:
+            with ProcessPoolExecutor(max_workers=processos, initializer=_definir_contexto,
+                                     initargs=(self.contexto,)) as pool:
+                for inicio, bloco in zip(inicios, pool.map(_gerar_bloco, tamanhos, sementes)):
+                    mascaras[inicio:inicio + len(bloco)] = bloco
+                    gerados += len(bloco)
+                    if progresso:
+                        progresso(gerados, quantidade)
+        segundos = time.perf_counter() - relogio
+
+        resultado = {
+            "estrategia": self.estrategia,
+            "mascaras": mascaras,
+            "semente": raiz.entropy,
+            "desempenho": {
+                "segundos": round(segundos, 3),
+                "bilhetes_por_segundo": round(quantidade / segundos) if segundos else None,
+                "processos": processos,
+            },
+        }
+        if analisar:
+            resultado["kpis"] = self.analisar(mascaras)
+        return resultado
+
+    def analisar(self, mascaras: np.ndarray) -> Dict[str, np.ndarray]:
+        """KPIs por bilhete lidas do IndiceCombinacoes (sem analisar_palpite por bilhete)."""
+        indice = IndiceCombinacoes.obter()
+        posicoes = indice.posicao(mascaras)
+        kpis = {nome: np.asarray(indice.coluna(nome)[posicoes]) for nome in KPIS_MASSA}
+        ultimo = np.uint32(int(Mascara.de_dezenas(self.contexto["ultimo"])))
+        kpis["repetidas"] = popcount(mascaras & ultimo)
+        return kpis
+
+
+# =============================
+# TRABALHADORES
+# =============================
+def _definir_contexto(contexto: Dict[str, Any]):
+    global _contexto_trabalhador
+    _contexto_trabalhador = contexto
+
+
+def _amostrador(contexto: Dict[str, Any]) -> AmostradorRestrito:
+    restricoes = dict(contexto["restricoes"])
+    if contexto["estrategia"] == "aleatorio":
+        restricoes = {**RESTRICOES_ALEATORIO, **restricoes}
+    return AmostradorRestrito.obter(**restricoes)
+
+
+def _gerar_bloco(quantidade: int, semente: np.random.SeedSequence) -> np.ndarray:
+    """Máscaras de um bloco; 555/inteligente com restrições usam rejeição."""
+    contexto = _contexto_trabalhador
+    estrategia = contexto["estrategia"]
+    rng = np.random.default_rng(semente)
+
+    if estrategia == "aleatorio" or (estrategia == "uniforme" and contexto["restricoes"]):
+        return _amostrador(contexto).amostrar(quantidade, rng)
+    if estrategia == "uniforme":
+        return _uniforme(quantidade, rng)
+
+    rng_py = random.Random(int(semente.generate_state(1, np.uint64)[0]))
+    if not contexto["restricoes"]:
+        return _gerar_estrategia(contexto, quantidade, rng, rng_py)
+
+    # Restrições em 555/inteligente: gera, filtra pelo amostrador e repete
+    amostrador = _amostrador(contexto)
+    validas = amostrador.indice.coluna("mascara")[amostrador.posicoes]
+    aceitos: List[np.ndarray] = []
+    faltam = quantidade
+    for _ in range(MAXIMO_RODADAS):
+        jogos = _gerar_estrategia(contexto, max(faltam, 256), rng, rng_py)
+        posicao = np.minimum(np.searchsorted(validas, jogos), len(validas) - 1)
+        jogos = jogos[validas[posicao] == jogos][:faltam]
+        aceitos.append(jogos)
+        faltam -= len(jogos)
+        if faltam == 0:
+            return np.concatenate(aceitos)
+    raise ValueError(f"A estratégia {estrategia} quase nunca atende às restrições: "
+                     f"{contexto['restricoes']}")
+
+
+def _gerar_estrategia(contexto: Dict[str, Any], quantidade: int,
+                      rng: np.random.Generator, rng_py: random.Random) -> np.ndarray:
+    if contexto["estrategia"] == "555":
+        return _555(contexto["ultimo"], quantidade, rng)
+
+    from services.generator import JogoGenerator
+    jogos = [
+        JogoGenerator.gerar_palpite_inteligente(
+            contexto["historico"], rng=rng_py, frequencia=contexto["frequencia"]
+        )[0]
+        for _ in range(quantidade)
+    ]
+    return dezenas_para_mascaras(jogos)
+
+
+def _uniforme(quantidade: int, rng: np.random.Generator) -> np.ndarray:
+    escolhidas = rng.random((quantidade, 25)).argpartition(15, axis=1)[:, :15]
+    return np.bitwise_or.reduce(np.uint32(1) << escolhidas.astype(np.uint32), axis=1)
+
+
+def _sortear_por_linha(disponiveis: np.ndarray, quantidades: np.ndarray,
+                       rng: np.random.Generator) -> np.ndarray:
+    """Escolhe quantidades[i] posições uniformes entre as disponíveis da linha i."""
+    chaves = rng.random(disponiveis.shape)
+    chaves[~disponiveis] = np.inf
+    ordenadas = np.sort(chaves, axis=1)
+    indice = np.clip(quantidades - 1, 0, disponiveis.shape[1] - 1)
+    limite = np.take_along_axis(ordenadas, indice[:, None], axis=1)
+    return disponiveis & (chaves <= limite) & (quantidades > 0)[:, None]
+
+
+def _555(ultimo: Sequence[int], quantidade: int, rng: np.random.Generator) -> np.ndarray:
+    """Versão vetorizada de JogoGenerator.gerar_555 (mesmas regras por faixa)."""
+    linhas = np.arange(quantidade)
+    no_ultimo = np.zeros(settings.NUMEROS_TOTAL + 1, dtype=bool)
+    no_ultimo[list(ultimo)] = True
+    mascaras = np.zeros(quantidade, dtype=np.uint32)
+
+    for faixa, preferidos in (("baixos", (5, 3)), ("medios", (15, 13)), ("altos", None)):
+        a, b = settings.RANGES[faixa]
+        pool = np.arange(a, b + 1)
+        largura = len(pool)
+        if preferidos is None:
+            # Altos: 5 quaisquer da faixa, sem fixo
+            escolhidos = _sortear_por_linha(np.ones((quantidade, largura), dtype=bool),
+                                            np.full(quantidade, 5), rng)
+        else:
+            fixo = next((n for n in preferidos if no_ultimo[n]), None)
+            colunas_fixo = (np.full(quantidade, fixo - a) if fixo is not None
+                            else rng.integers(0, largura, size=quantidade))
+            limpo = np.ones((quantidade, largura), dtype=bool)
+            limpo[linhas, colunas_fixo] = False
+            ausentes = limpo & ~no_ultimo[pool]
+            presentes = limpo & no_ultimo[pool]
+
+            # 1 ausente (se houver) e o resto presentes; sem presentes suficientes, qualquer um
+            qtd_ausentes = np.minimum(1, ausentes.sum(axis=1))
+            escolhidos = ~limpo | _sortear_por_linha(ausentes, qtd_ausentes, rng)
+            qtd_presentes = 4 - qtd_ausentes
+            usa_presentes = presentes.sum(axis=1) >= qtd_presentes
+            opcoes = np.where(usa_presentes[:, None], presentes, limpo & ~escolhidos)
+            escolhidos |= _sortear_por_linha(opcoes, qtd_presentes, rng)
+
+        bits = (np.uint32(1) << (pool - 1).astype(np.uint32))
+        mascaras |= np.bitwise_or.reduce(np.where(escolhidos, bits, np.uint32(0)), axis=1)
+    return mascaras
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from services.loteria_api import LoteriaAPI
+    from services.mascara import mascaras_para_matriz
+
+    parser = argparse.ArgumentParser(description="Geração em massa de bilhetes (máscaras .npy)")
+    parser.add_argument("saida", help="arquivo .npy com as máscaras uint32")
+    parser.add_argument("--estrategia", choices=ESTRATEGIAS_MASSA, default="aleatorio")
+    parser.add_argument("--quantidade", type=int, default=1_000_000)
+    parser.add_argument("--semente", type=int, default=None)
+    parser.add_argument("--processos", type=int, default=None)
+    args = parser.parse_args()
+
+    _, historico_mascaras = LoteriaAPI().carregar_mascaras()
+    historico_dezenas = [(np.flatnonzero(linha) + 1).tolist()
+                         for linha in mascaras_para_matriz(historico_mascaras)]
+    gerado = GeradorMassa(args.estrategia, historico=historico_dezenas).gerar(
+        args.quantidade, semente=args.semente, processos=args.processos,
+        progresso=lambda feitos, total: print(f"\r{feitos / total:6.1%}", end="", flush=True),
+    )
+    print()
+    np.save(args.saida, gerado["mascaras"])
+    print(f"{args.quantidade} bilhetes em {args.saida} | semente {gerado['semente']} | {gerado['desempenho']}")
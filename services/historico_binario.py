@@ -0,0 +1,182 @@
+# services/historico_binario.py
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from services.datas import ler_data
+from services.mascara import Mascara, mascaras_para_matriz
+
+# =============================
+# PATHS COMPATÍVEIS COM CLOUD
+# =============================
+BASE_DIR = Path(__file__).resolve().parent.parent
+DATA_DIR = BASE_DIR / "data"
+HISTORICO_BIN_PATH = DATA_DIR / "historico.bin"
+HISTORICO_CSV_PATH = DATA_DIR / "historico.csv"
+
+# Registro de largura fixa (16 bytes, sem padding)
+DTYPE_REGISTRO = np.dtype([
+    ("concurso", "<u4"),
+    ("timestamp", "<i8"),
+    ("mascara", "<u4"),
+])
+
+
+class HistoricoBinario:
+    """
+    Histórico em arquivo binário append-only.
+    Cada concurso é um registro de 16 bytes (concurso, timestamp, máscara).
+    Gravação O(1) com O_APPEND, deduplicação por índice em memória e leitura
+    via np.memmap. Em concursos repetidos vale o último registro gravado.
+    """
+
+    def __init__(self, caminho: Path = HISTORICO_BIN_PATH):
+        self.caminho = Path(caminho)
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._indice: Dict[int, int] = {}   # concurso -> máscara
+        self._lidos = 0                      # bytes já indexados
+        self._sincronizar_indice()
+
+    # =============================
+    # GRAVAÇÃO
+    # =============================
+    def salvar(self, dezenas: List[int], numero_concurso: Any,
+               data: Optional[str] = None) -> bool:
+        """Acrescenta um concurso. Concursos não numéricos não são aceitos."""
+        try:
+            concurso = int(str(numero_concurso))
+            mascara = int(Mascara.de_dezenas(dezenas))
+            timestamp = self._para_timestamp(data)
+        except (TypeError, ValueError):
+            return False
+
+        with self._lock:
+            self._sincronizar_indice()
+            if self._indice.get(concurso) == mascara:
+                return True
+
+            registro = np.array([(concurso, timestamp, mascara)], dtype=DTYPE_REGISTRO)
+            fd = os.open(self.caminho, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                # Escrita única de 16 bytes: atômica com O_APPEND
+                os.write(fd, registro.tobytes())
+            finally:
+                os.close(fd)
+
+            self._sincronizar_indice()
+        return True
+
+    def _sincronizar_indice(self):
+        """Indexa apenas os registros acrescentados desde a última leitura."""
+        tamanho = self.caminho.stat().st_size if self.caminho.exists() else 0
+        tamanho -= tamanho % DTYPE_REGISTRO.itemsize
+        if tamanho <= self._lidos:
+            return
+
+        novos = np.memmap(self.caminho, dtype=DTYPE_REGISTRO, mode="r",
+                          offset=self._lidos,
+                          shape=((tamanho - self._lidos) // DTYPE_REGISTRO.itemsize,))
+        self._indice.update(zip(novos["concurso"].tolist(), novos["mascara"].tolist()))
+        self._lidos = tamanho
+        del novos
+
+    # =============================
+    # LEITURA
+    # =============================
+    def carregar_registros(self) -> np.ndarray:
+        """Registros deduplicados (último vence), ordenados por concurso."""
+        tamanho = self.caminho.stat().st_size if self.caminho.exists() else 0
+        total = tamanho // DTYPE_REGISTRO.itemsize
+        if total == 0:
+            return np.empty(0, dtype=DTYPE_REGISTRO)
+
+        brutos = np.memmap(self.caminho, dtype=DTYPE_REGISTRO, mode="r", shape=(total,))
+        # Última ocorrência de cada concurso
+        invertidos = brutos[::-1]
+        _, posicoes = np.unique(invertidos["concurso"], return_index=True)
+        return np.array(invertidos[posicoes])
+
+    def carregar_matriz(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(concursos uint32, matriz de incidência N x 25 uint8)."""
+        registros = self.carregar_registros()
+        return registros["concurso"], mascaras_para_matriz(registros["mascara"])
+
+    def carregar_historico(self) -> pd.DataFrame:
+        """Mesmo formato de LoteriaAPI.carregar_historico."""
+        registros = self.carregar_registros()
+        matriz = mascaras_para_matriz(registros["mascara"])
+        listas = [(np.flatnonzero(linha) + 1).tolist() for linha in matriz]
+        return pd.DataFrame({
+            "concurso": registros["concurso"].astype(str),
+            "data": pd.to_datetime(registros["timestamp"], unit="s").strftime("%Y-%m-%d %H:%M:%S"),
+            "dezenas": [",".join(map(str, lst)) for lst in listas],
+            "dezenas_lista": listas,
+        })
+
+    def buscar_por_numero(self, numero_concurso: Any) -> List[int]:
+        try:
+            concurso = int(str(numero_concurso))
+        except ValueError:
+            return []
+        with self._lock:
+            self._sincronizar_indice()
+            mascara = self._indice.get(concurso)
+        return Mascara(mascara).para_dezenas() if mascara is not None else []
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._sincronizar_indice()
+            return len(self._indice)
+
+    def __contains__(self, numero_concurso: Any) -> bool:
+        return bool(self.buscar_por_numero(numero_concurso))
+
+    # =============================
+    # MIGRAÇÃO
+    # =============================
+    @classmethod
+    def migrar_csv(cls, origem: Path = HISTORICO_CSV_PATH,
+                   destino: Path = HISTORICO_BIN_PATH) -> Dict:
+        """Importação única do CSV. Linhas sem concurso numérico são ignoradas."""
+        df = pd.read_csv(origem, dtype=str).fillna("")
+        armazenamento = cls(destino)
+        migrados, ignorados = 0, []
+
+        for concurso, data, dezenas in df[["concurso", "data", "dezenas"]].itertuples(index=False):
+            lista = [int(n) for n in dezenas.split(",") if n.isdigit()]
+            if concurso.isdigit() and len(lista) == 15 and armazenamento.salvar(lista, concurso, data or None):
+                migrados += 1
+            else:
+                ignorados.append(concurso)
+
+        return {"migrados": migrados, "ignorados": ignorados}
+
+    def exportar_csv(self, destino: Path = HISTORICO_CSV_PATH) -> Path:
+        df = self.carregar_historico()
+        df[["concurso", "data", "dezenas"]].to_csv(destino, index=False, encoding="utf-8")
+        return Path(destino)
+
+    @staticmethod
+    def _para_timestamp(data: Optional[str]) -> int:
+        """Segundos Unix; aceita 'dd/mm/aaaa' (API) e ISO. Sem data: agora."""
+        momento = ler_data(data)
+        if momento is None:
+            momento = pd.Timestamp.now()
+        return int(momento.value // 10**9)
+
+
+if __name__ == "__main__":
+    import sys
+
+    comando = sys.argv[1] if len(sys.argv) > 1 else "migrar"
+    if comando == "migrar":
+        print(HistoricoBinario.migrar_csv())
+    elif comando == "exportar":
+        print(f"✅ Exportado para {HistoricoBinario().exportar_csv()}")
+    else:
+        print("Uso: python -m services.historico_binario [migrar|exportar]")
@@ -0,0 +1,172 @@
+# services/historico_sqlite.py
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, List, Optional
+
+import pandas as pd
+
+from services.datas import normalizar_data
+from services.mascara import Mascara, jogo_valido
+
+# =============================
+# PATHS COMPATÍVEIS COM CLOUD
+# =============================
+BASE_DIR = Path(__file__).resolve().parent.parent
+DATA_DIR = BASE_DIR / "data"
+HISTORICO_DB_PATH = DATA_DIR / "historico.db"
+HISTORICO_CSV_PATH = DATA_DIR / "historico.csv"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS historico (
+    concurso TEXT PRIMARY KEY,
+    numero   INTEGER,
+    data     TEXT NOT NULL,
+    dezenas  TEXT NOT NULL,
+    mascara  INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_historico_numero ON historico (numero);
+CREATE INDEX IF NOT EXISTS idx_historico_data ON historico (data);
+"""
+
+_UPSERT = """
+INSERT INTO historico (concurso, numero, data, dezenas, mascara)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (concurso) DO UPDATE SET
+    numero = excluded.numero,
+    data = excluded.data,
+    dezenas = excluded.dezenas,
+    mascara = excluded.mascara
+"""
+
+# Bancos antigos guardavam a data da API ('dd/mm/aaaa'): converte para ISO
+_MIGRAR_DATAS = """
+UPDATE historico
+SET data = substr(data, 7, 4) || '-' || substr(data, 4, 2) || '-' || substr(data, 1, 2) || ' 00:00:00'
+WHERE data GLOB '[0-9][0-9]/[0-9][0-9]/[0-9][0-9][0-9][0-9]'
+"""
+
+_COLUNAS = "concurso, data, dezenas"
+# Concursos oficiais pelo número; registros sem número (manuais) no fim
+_ORDEM = "ORDER BY numero IS NULL, numero, rowid"
+
+logger = logging.getLogger(__name__)
+
+
+class HistoricoSQLite:
+    """
+    Histórico em SQLite para várias sessões simultâneas.
+    Modo WAL (leitores não bloqueiam o escritor), upsert por concurso e
+    índices por número do concurso e por data. Uma conexão por thread.
+    """
+
+    def __init__(self, caminho: Path = HISTORICO_DB_PATH):
+        self.caminho = Path(caminho)
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._conexao() as con:
+            con.executescript(_SCHEMA)
+            con.execute(_MIGRAR_DATAS)
+
+    def _conexao(self) -> sqlite3.Connection:
+        con = getattr(self._local, "con", None)
+        if con is None:
+            con = sqlite3.connect(self.caminho, timeout=30)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            con.execute("PRAGMA busy_timeout=30000")
+            self._local.con = con
+        return con
+
+    # =============================
+    # GRAVAÇÃO
+    # =============================
+    def salvar(self, dezenas: List[int], numero_concurso: Any,
+               data: Optional[str] = None) -> bool:
+        try:
+            concurso = str(numero_concurso)
+            data = normalizar_data(data) or pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S")
+            with self._conexao() as con:
+                con.execute(_UPSERT, (
+                    concurso,
+                    int(concurso) if concurso.isdigit() else None,
+                    data,
+                    ",".join(map(str, dezenas)),
+                    int(Mascara.de_dezenas(dezenas)),
+                ))
+            return True
+        except (sqlite3.Error, ValueError):
+            return False
+
+    def importar_csv(self, origem: Path = HISTORICO_CSV_PATH) -> int:
+        """
+        Importação em lote do CSV atual (uma única transação). Linhas com
+        dezenas fora de 1-25 são puladas e registradas no log.
+        """
+        df = pd.read_csv(origem, dtype=str).fillna("")
+        agora = pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S")
+        linhas, invalidos = [], []
+        for concurso, data, dezenas in df[["concurso", "data", "dezenas"]].itertuples(index=False):
+            lista = [int(n) for n in dezenas.split(",") if n.isdigit()]
+            if not lista or not jogo_valido(lista):
+                invalidos.append(concurso)
+                continue
+            linhas.append((
+                concurso,
+                int(concurso) if concurso.isdigit() else None,
+                normalizar_data(data) or agora,
+                ",".join(map(str, lista)),
+                int(Mascara.de_dezenas(lista)),
+            ))
+        if invalidos:
+            logger.warning("Importação: %d linha(s) com dezenas inválidas ignorada(s) (concursos %s)",
+                           len(invalidos), invalidos[:10])
+        with self._conexao() as con:
+            con.executemany(_UPSERT, linhas)
+        return len(linhas)
+
+    # =============================
+    # LEITURA
+    # =============================
+    def carregar_historico(self) -> pd.DataFrame:
+        """Mesmo formato de LoteriaAPI.carregar_historico (em ordem de concurso)."""
+        return self._consultar(f"SELECT {_COLUNAS} FROM historico {_ORDEM}")
+
+    def buscar_por_numero(self, numero_concurso: Any) -> List[int]:
+        linha = self._conexao().execute(
+            "SELECT dezenas FROM historico WHERE concurso = ?", (str(numero_concurso),)
+        ).fetchone()
+        return [int(n) for n in linha[0].split(",")] if linha else []
+
+    def buscar_intervalo(self, inicio: int, fim: int) -> pd.DataFrame:
+        """Concursos oficiais com número entre inicio e fim (inclusive)."""
+        return self._consultar(
+            f"SELECT {_COLUNAS} FROM historico WHERE numero BETWEEN ? AND ? ORDER BY numero",
+            (int(inicio), int(fim)),
+        )
+
+    def buscar_por_data(self, inicio: str, fim: str) -> pd.DataFrame:
+        """Registros com data entre inicio e fim ('YYYY-MM-DD[ HH:MM:SS]')."""
+        return self._consultar(
+            f"SELECT {_COLUNAS} FROM historico WHERE data BETWEEN ? AND ? {_ORDEM}",
+            (inicio, fim if len(fim) > 10 else f"{fim} 23:59:59"),
+        )
+
+    def ultimo_numero(self) -> Optional[int]:
+        linha = self._conexao().execute("SELECT MAX(numero) FROM historico").fetchone()
+        return linha[0] if linha else None
+
+    def __len__(self) -> int:
+        return self._conexao().execute("SELECT COUNT(*) FROM historico").fetchone()[0]
+
+    def _consultar(self, sql: str, parametros: tuple = ()) -> pd.DataFrame:
+        df = pd.read_sql_query(sql, self._conexao(), params=parametros, dtype=str)
+        df["dezenas_lista"] = [
+            [int(n) for n in dezenas.split(",") if n.isdigit()] for dezenas in df["dezenas"]
+        ]
+        return df
+
+
+if __name__ == "__main__":
+    print(f"✅ {HistoricoSQLite().importar_csv()} registros importados de {HISTORICO_CSV_PATH}")
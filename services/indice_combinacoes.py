@@ -0,0 +1,222 @@
+# services/indice_combinacoes.py
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+import numpy as np
+
+from services.kpi_calculator import KPICalculator
+from services.mascara import (
+    Mascara,
+    popcount,
+    MASCARAS_LINHAS,
+    MASCARAS_COLUNAS,
+    MASCARAS_QUADRANTES,
+)
+
+# =============================
+# PATHS COMPATÍVEIS COM CLOUD
+# =============================
+BASE_DIR = Path(__file__).resolve().parent.parent
+DATA_DIR = BASE_DIR / "data"
+INDICE_PATH = DATA_DIR / "combinacoes_v1"
+
+TOTAL_COMBINACOES = 3268760  # C(25, 15)
+
+# Uma coluna por arquivo .npy (contígua em disco): nome -> (dtype, largura)
+COLUNAS_INDICE = {
+    "mascara": (np.uint32, None),
+    "soma": (np.uint16, None),
+    "pares": (np.uint8, None),
+    "primos": (np.uint8, None),
+    "moldura": (np.uint8, None),
+    "baixos": (np.uint8, None),
+    "medios": (np.uint8, None),
+    "altos": (np.uint8, None),
+    "maior_sequencia": (np.uint8, None),
+    "linhas": (np.uint8, 5),
+    "colunas": (np.uint8, 5),
+    "quadrantes": (np.uint8, 3),
+}
+
+Faixa = Union[int, Tuple[int, int]]
+
+
+class IndiceCombinacoes:
+    """
+    Índice em disco de todas as C(25,15) combinações da Lotofácil.
+    Uma linha por combinação, em ordem crescente de máscara (ordem colex),
+    com as KPIs pré-calculadas em colunas. Carregado via np.memmap.
+    """
+
+    _instancia: Optional["IndiceCombinacoes"] = None
+    _lock = threading.Lock()
+
+    def __init__(self, colunas: Dict[str, np.ndarray]):
+        self.colunas = colunas
+
+    # =============================
+    # CARGA / CONSTRUÇÃO
+    # =============================
+    @classmethod
+    def obter(cls) -> "IndiceCombinacoes":
+        """Instância compartilhada pelo processo (constrói na primeira vez)."""
+        if cls._instancia is None:
+            with cls._lock:
+                if cls._instancia is None:
+                    cls._instancia = cls.carregar()
+        return cls._instancia
+
+    @classmethod
+    def carregar(cls, caminho: Path = INDICE_PATH,
+                 construir_se_ausente: bool = True) -> "IndiceCombinacoes":
+        caminho = Path(caminho)
+        if not caminho.exists():
+            if not construir_se_ausente:
+                raise FileNotFoundError(f"Índice não encontrado: {caminho}")
+            cls.construir(caminho)
+
+        colunas = {}
+        for nome, (dtype, largura) in COLUNAS_INDICE.items():
+            coluna = np.load(caminho / f"{nome}.npy", mmap_mode="r")
+            formato = (TOTAL_COMBINACOES,) + ((largura,) if largura else ())
+            if coluna.dtype != dtype or coluna.shape != formato:
+                raise ValueError(f"Índice inválido ou desatualizado: {caminho}")
+            colunas[nome] = coluna
+        return cls(colunas)
+
+    @staticmethod
+    def enumerar_mascaras(tamanho_bloco: int = 1 << 21) -> np.ndarray:
+        """Todas as máscaras de 25 bits com 15 bits ligados, em ordem crescente."""
+        partes = []
+        for inicio in range(0, 1 << 25, tamanho_bloco):
+            bloco = np.arange(inicio, inicio + tamanho_bloco, dtype=np.uint32)
+            partes.append(bloco[popcount(bloco) == 15])
+        return np.concatenate(partes)
+
+    @staticmethod
+    def maior_sequencia(mascaras: np.ndarray) -> np.ndarray:
+        """Maior sequência de dezenas consecutivas de cada máscara."""
+        atual = np.asarray(mascaras, dtype=np.uint32).copy()
+        resultado = np.zeros(len(atual), dtype=np.uint8)
+        while True:
+            ativos = atual != 0
+            if not ativos.any():
+                return resultado
+            resultado += ativos
+            atual &= atual >> 1
+
+    @staticmethod
+    def construir(caminho: Path = INDICE_PATH) -> Path:
+        """
+        Materializa o índice em disco (escrita atômica do diretório).
+        Seguro com vários processos construindo ao mesmo tempo: cada um
+        escreve no seu temporário e só publica por rename; quem perde a
+        corrida descarta o seu e fica com o já publicado.
+        """
+        caminho = Path(caminho)
+        inicio = time.time()
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+        temporario = caminho.with_name(caminho.name + f".{os.getpid()}.{threading.get_ident()}.tmp")
+        temporario.mkdir(exist_ok=True)
+
+        mascaras = IndiceCombinacoes.enumerar_mascaras()
+        kpis = KPICalculator.calcular_lote(mascaras)
+
+        def contagens(grupos) -> np.ndarray:
+            return np.stack([popcount(mascaras & np.uint32(m)) for m in grupos], axis=1)
+
+        valores = {
+            "mascara": mascaras,
+            **{nome: kpis[nome] for nome in ("soma", "pares", "primos", "moldura",
+                                             "baixos", "medios", "altos")},
+            "maior_sequencia": IndiceCombinacoes.maior_sequencia(mascaras),
+            "linhas": contagens(MASCARAS_LINHAS),
+            "colunas": contagens(MASCARAS_COLUNAS),
+            "quadrantes": contagens(MASCARAS_QUADRANTES),
+        }
+        for nome, (dtype, _) in COLUNAS_INDICE.items():
+            np.save(temporario / f"{nome}.npy", valores[nome].astype(dtype, copy=False))
+
+        antigo = None
+        if caminho.exists() and caminho.stat().st_mtime < inicio:
+            # Versão anterior à construção: sai do caminho por rename (nunca
+            # apaga no lugar um índice que outro processo acabou de publicar)
+            antigo = caminho.with_name(caminho.name + f".{os.getpid()}.{threading.get_ident()}.old")
+            try:
+                os.replace(caminho, antigo)
+            except OSError:
+                antigo = None
+        try:
+            os.replace(temporario, caminho)
+        except OSError:
+            # Outro processo publicou o índice primeiro
+            shutil.rmtree(temporario, ignore_errors=True)
+        if antigo is not None:
+            shutil.rmtree(antigo, ignore_errors=True)
+        return caminho
+
+    # =============================
+    # CONSULTAS
+    # =============================
+    def __len__(self) -> int:
+        return len(self.colunas["mascara"])
+
+    def coluna(self, nome: str) -> np.ndarray:
+        return self.colunas[nome]
+
+    def posicao(self, mascaras: Union[np.ndarray, int]) -> np.ndarray:
+        """Posição (rank colex) de máscaras com 15 dezenas, via busca binária."""
+        return np.searchsorted(self.colunas["mascara"], np.asarray(mascaras, dtype=np.uint32))
+
+    def consultar(self, dezenas: Iterable[int]) -> Optional[Dict]:
+        """Linha pré-calculada de um jogo de 15 dezenas."""
+        bits = int(Mascara.de_dezenas(dezenas))
+        pos = int(self.posicao(bits))
+        if pos >= len(self) or int(self.colunas["mascara"][pos]) != bits:
+            return None
+
+        return {
+            "posicao": pos,
+            **{nome: coluna[pos].tolist() for nome, coluna in self.colunas.items()}
+        }
+
+    def filtrar(self, fixas: Iterable[int] = (), excluidas: Iterable[int] = (),
+                **faixas: Faixa) -> np.ndarray:
+        """
+        Posições das combinações que atendem aos critérios.
+        Args:
+            fixas / excluidas: dezenas obrigatórias / proibidas
+            faixas: coluna=valor ou coluna=(min, max), ex.: soma=(180, 210)
+        """
+        return np.flatnonzero(self.selecionar(fixas, excluidas, **faixas))
+
+    def contar(self, fixas: Iterable[int] = (), excluidas: Iterable[int] = (),
+               **faixas: Faixa) -> int:
+        return int(np.count_nonzero(self.selecionar(fixas, excluidas, **faixas)))
+
+    def selecionar(self, fixas: Iterable[int] = (), excluidas: Iterable[int] = (),
+                   **faixas: Faixa) -> np.ndarray:
+        """Vetor booleano (uma posição por combinação) dos critérios."""
+        selecao = np.ones(len(self), dtype=bool)
+
+        bits_fixas = int(Mascara.de_dezenas(fixas))
+        bits_excluidas = int(Mascara.de_dezenas(excluidas))
+        if bits_fixas or bits_excluidas:
+            mascaras = self.colunas["mascara"]
+            if bits_fixas:
+                selecao &= (mascaras & np.uint32(bits_fixas)) == bits_fixas
+            if bits_excluidas:
+                selecao &= (mascaras & np.uint32(bits_excluidas)) == 0
+
+        for nome, faixa in faixas.items():
+            if COLUNAS_INDICE.get(nome, (None, 1))[1] is not None:
+                raise ValueError(f"Coluna de filtro inválida: {nome}")
+            minimo, maximo = faixa if isinstance(faixa, tuple) else (faixa, faixa)
+            valores = self.colunas[nome]
+            selecao &= (valores >= minimo) & (valores <= maximo)
+
+        return selecao
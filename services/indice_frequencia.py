@@ -0,0 +1,230 @@
+# services/indice_frequencia.py
+import json
+import logging
+import os
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from services.mascara import filtrar_jogos_validos, mascaras_para_matriz
+
+# Janelas padrão (últimos N concursos)
+JANELAS_PADRAO = (10, 25, 100)
+VERSAO_FORMATO = 1
+logger = logging.getLogger(__name__)
+
+
+class IndiceFrequencia:
+    """
+    Índice persistente de frequência e atraso por dezena.
+    Mantém, para cada número 1-25: total de aparições, contagem nas últimas
+    N rodadas (janelas), atraso atual, maior atraso e intervalo médio entre
+    aparições. Cada novo concurso custa O(15 x janelas), sem reler o histórico.
+    Os concursos entram em ordem crescente; fora de ordem exige reconstruir().
+    """
+
+    def __init__(self, caminho: Optional[Path] = None,
+                 janelas: Sequence[int] = JANELAS_PADRAO):
+        self.caminho = Path(caminho) if caminho else None
+        self.janelas = tuple(sorted(set(int(j) for j in janelas)))
+        self._lock = threading.RLock()
+        self._zerar()
+        if self.caminho and self.caminho.exists():
+            self._carregar()
+
+    def _zerar(self):
+        self.sorteios = 0                         # concursos processados
+        self.ultimo_concurso: Optional[int] = None
+        self.versao_historico: Any = None         # versão do arquivo de origem
+        self.total = [0] * 25
+        self.ultimo_visto = [-1] * 25             # posição da última aparição
+        self.maior_intervalo = [0] * 25           # maior atraso já encerrado
+        self.soma_intervalos = [0] * 25
+        self.qtd_intervalos = [0] * 25
+        self.recentes: deque = deque(maxlen=max(self.janelas, default=0))
+        self.contagem_janela = {j: [0] * 25 for j in self.janelas}
+
+    # =============================
+    # ATUALIZAÇÃO
+    # =============================
+    def registrar(self, concurso: int, dezenas: Iterable[int]) -> bool:
+        """Acrescenta um concurso. False se não for o próximo em ordem."""
+        concurso = int(concurso)
+        indices = sorted({int(n) - 1 for n in dezenas})
+        with self._lock:
+            if self.ultimo_concurso is not None and concurso <= self.ultimo_concurso:
+                return False
+
+            posicao = self.sorteios
+            for i in indices:
+                anterior = self.ultimo_visto[i]
+                atraso = posicao - anterior - 1
+                if atraso > self.maior_intervalo[i]:
+                    self.maior_intervalo[i] = atraso
+                if anterior >= 0:
+                    self.soma_intervalos[i] += posicao - anterior
+                    self.qtd_intervalos[i] += 1
+                self.ultimo_visto[i] = posicao
+                self.total[i] += 1
+
+            # Janelas deslizantes: entra o novo, sai o que ficou além de N
+            for janela, contagem in self.contagem_janela.items():
+                for i in indices:
+                    contagem[i] += 1
+                if len(self.recentes) >= janela:
+                    for i in self.recentes[-janela]:
+                        contagem[i] -= 1
+            self.recentes.append(tuple(indices))
+
+            self.sorteios += 1
+            self.ultimo_concurso = concurso
+        return True
+
+    def reconstruir(self, concursos: Sequence[int], mascaras: np.ndarray):
+        """Recalcula tudo (concursos em ordem crescente) de forma vetorizada."""
+        matriz = mascaras_para_matriz(np.asarray(mascaras, dtype=np.uint32)).astype(bool)
+        with self._lock:
+            self._zerar()
+            n = len(matriz)
+            if n == 0:
+                return
+
+            posicoes = np.arange(n)
+            self.total = matriz.sum(axis=0).tolist()
+            for janela in self.janelas:
+                self.contagem_janela[janela] = matriz[-janela:].sum(axis=0).tolist()
+            for linha in matriz[max(0, n - self.recentes.maxlen):]:
+                self.recentes.append(tuple(np.flatnonzero(linha).tolist()))
+
+            for i in range(25):
+                aparicoes = posicoes[matriz[:, i]]
+                if len(aparicoes) == 0:
+                    continue
+                # Atrasos encerrados: antes da 1ª aparição e entre aparições
+                atrasos = np.diff(aparicoes, prepend=-1) - 1
+                self.maior_intervalo[i] = int(atrasos.max())
+                self.ultimo_visto[i] = int(aparicoes[-1])
+                self.soma_intervalos[i] = int(aparicoes[-1] - aparicoes[0])
+                self.qtd_intervalos[i] = len(aparicoes) - 1
+
+            self.sorteios = n
+            self.ultimo_concurso = int(concursos[-1])
+
+    # =============================
+    # CONSULTAS
+    # =============================
+    def frequencia(self, janela: Optional[int] = None) -> Dict[int, int]:
+        """{dezena: contagem} no histórico inteiro ou nas últimas 'janela' rodadas."""
+        contagem = self.total if janela is None else self.contagem_janela[janela]
+        return {n: contagem[n - 1] for n in range(1, 26)}
+
+    def atraso(self, dezena: int) -> int:
+        """Concursos seguidos sem a dezena até o último registrado."""
+        return self.sorteios - 1 - self.ultimo_visto[dezena - 1]
+
+    def maior_atraso(self, dezena: int) -> int:
+        return max(self.maior_intervalo[dezena - 1], self.atraso(dezena))
+
+    def intervalo_medio(self, dezena: int) -> Optional[float]:
+        qtd = self.qtd_intervalos[dezena - 1]
+        return round(self.soma_intervalos[dezena - 1] / qtd, 2) if qtd else None
+
+    def quentes(self, k: int = 5, janela: Optional[int] = None) -> List[int]:
+        freq = self.frequencia(janela)
+        return sorted(freq, key=lambda n: (-freq[n], n))[:k]
+
+    def frios(self, k: int = 5, janela: Optional[int] = None) -> List[int]:
+        freq = self.frequencia(janela)
+        return sorted(freq, key=lambda n: (freq[n], n))[:k]
+
+    def atrasados(self, k: int = 5) -> List[int]:
+        return sorted(range(1, 26), key=lambda n: (-self.atraso(n), n))[:k]
+
+    def resumo(self) -> Dict[int, Dict[str, Any]]:
+        """Tabela completa por dezena."""
+        return {
+            n: {
+                "total": self.total[n - 1],
+                **{f"ultimos_{j}": self.contagem_janela[j][n - 1] for j in self.janelas},
+                "atraso": self.atraso(n),
+                "maior_atraso": self.maior_atraso(n),
+                "intervalo_medio": self.intervalo_medio(n),
+            }
+            for n in range(1, 26)
+        }
+
+    def verificar(self, concursos: Sequence[int], mascaras: np.ndarray) -> Dict[str, Any]:
+        """Compara o índice com uma recontagem completa do histórico."""
+        referencia = IndiceFrequencia(janelas=self.janelas)
+        referencia.reconstruir(concursos, mascaras)
+        divergencias = [
+            campo for campo in ("sorteios", "ultimo_concurso", "total", "ultimo_visto",
+                                "maior_intervalo", "soma_intervalos", "qtd_intervalos",
+                                "contagem_janela", "recentes")
+            if getattr(self, campo) != getattr(referencia, campo)
+        ]
+        return {"ok": not divergencias, "divergencias": divergencias}
+
+    @staticmethod
+    def contar(jogos: Sequence[Sequence[int]]) -> np.ndarray:
+        """
+        Contagem por dezena (índice 0 = dezena 1) de uma lista de jogos.
+        Jogos com dezenas fora de 1-25 não entram (e são registrados no log).
+        """
+        if len(jogos) == 0:
+            return np.zeros(25, dtype=np.int64)
+        mascaras, validos = filtrar_jogos_validos(jogos)
+        if not validos.all():
+            logger.warning("Contagem: %d jogo(s) com dezenas inválidas ignorado(s)", int((~validos).sum()))
+        matriz = mascaras_para_matriz(mascaras)
+        return matriz.sum(axis=0, dtype=np.int64)
+
+    # =============================
+    # PERSISTÊNCIA
+    # =============================
+    def salvar(self):
+        if self.caminho is None:
+            return
+        with self._lock:
+            estado = {
+                "versao": VERSAO_FORMATO,
+                "janelas": list(self.janelas),
+                "sorteios": self.sorteios,
+                "ultimo_concurso": self.ultimo_concurso,
+                "versao_historico": self.versao_historico,
+                "total": self.total,
+                "ultimo_visto": self.ultimo_visto,
+                "maior_intervalo": self.maior_intervalo,
+                "soma_intervalos": self.soma_intervalos,
+                "qtd_intervalos": self.qtd_intervalos,
+                "recentes": [list(r) for r in self.recentes],
+                "contagem_janela": {str(j): c for j, c in self.contagem_janela.items()},
+            }
+        temporario = self.caminho.with_name(f"{self.caminho.name}.{os.getpid()}.tmp")
+        try:
+            temporario.write_text(json.dumps(estado), encoding="utf-8")
+            os.replace(temporario, self.caminho)
+        except OSError:
+            temporario.unlink(missing_ok=True)
+
+    def _carregar(self):
+        try:
+            estado = json.loads(self.caminho.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if estado.get("versao") != VERSAO_FORMATO or tuple(estado.get("janelas", ())) != self.janelas:
+            return
+
+        self.sorteios = estado["sorteios"]
+        self.ultimo_concurso = estado["ultimo_concurso"]
+        self.versao_historico = estado["versao_historico"]
+        self.total = estado["total"]
+        self.ultimo_visto = estado["ultimo_visto"]
+        self.maior_intervalo = estado["maior_intervalo"]
+        self.soma_intervalos = estado["soma_intervalos"]
+        self.qtd_intervalos = estado["qtd_intervalos"]
+        self.recentes.extend(tuple(r) for r in estado["recentes"])
+        self.contagem_janela = {int(j): c for j, c in estado["contagem_janela"].items()}
@@ -0,0 +1,204 @@
+# services/indice_invertido.py
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Iterable, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from services.datas import ler_data
+from services.mascara import mascaras_para_matriz, popcount
+
+# Timestamp de concursos sem data válida
+SEM_DATA = np.iinfo(np.int64).min
+
+Data = Union[str, pd.Timestamp, None]
+
+logger = logging.getLogger(__name__)
+
+
+class IndiceInvertido:
+    """
+    Índice invertido do histórico: para cada dezena, um bitmap compactado
+    (np.packbits, 1 bit por concurso) dos concursos que a contêm.
+    Consultas E / OU / NÃO, "pelo menos k destas dezenas" e intervalo de
+    datas viram operações bit a bit sobre poucos KB. Persistido com
+    np.savez_compressed ao lado do histórico; cresce por acréscimo.
+    """
+
+    def __init__(self, caminho: Optional[Path] = None):
+        self.caminho = Path(caminho) if caminho else None
+        self._lock = threading.RLock()
+        self.versao_historico: Any = None
+        self._zerar()
+        if self.caminho and self.caminho.exists():
+            self._carregar()
+
+    def _zerar(self):
+        self.concursos = np.empty(0, dtype=np.int64)
+        self.timestamps = np.empty(0, dtype=np.int64)
+        self.bitmaps = np.zeros((25, 0), dtype=np.uint8)
+
+    def __len__(self) -> int:
+        return len(self.concursos)
+
+    # =============================
+    # CONSTRUÇÃO / ACRÉSCIMO
+    # =============================
+    def reconstruir(self, concursos: Sequence[int], mascaras: np.ndarray,
+                    timestamps: Optional[Sequence[int]] = None):
+        """Concursos em ordem crescente, com máscaras e timestamps (s) alinhados."""
+        with self._lock:
+            self.concursos = np.asarray(concursos, dtype=np.int64).copy()
+            self.timestamps = (
+                np.asarray(timestamps, dtype=np.int64).copy() if timestamps is not None
+                else np.full(len(self.concursos), SEM_DATA, dtype=np.int64)
+            )
+            matriz = mascaras_para_matriz(np.asarray(mascaras, dtype=np.uint32))
+            self.bitmaps = np.packbits(matriz.T, axis=1, bitorder="little")
+
+    def registrar(self, concurso: int, dezenas: Iterable[int], data: Data = None) -> bool:
+        """Acrescenta um concurso no fim. False se não for o próximo em ordem."""
+        concurso = int(concurso)
+        with self._lock:
+            if len(self.concursos) and concurso <= self.concursos[-1]:
+                return False
+
+            posicao = len(self.concursos)
+            if posicao % 8 == 0:
+                self.bitmaps = np.concatenate(
+                    [self.bitmaps, np.zeros((25, 1), dtype=np.uint8)], axis=1
+                )
+            byte, bit = divmod(posicao, 8)
+            for n in set(dezenas):
+                self.bitmaps[int(n) - 1, byte] |= np.uint8(1 << bit)
+
+            self.concursos = np.append(self.concursos, concurso)
+            self.timestamps = np.append(self.timestamps, self._para_timestamp(data))
+        return True
+
+    # =============================
+    # CONSULTAS (bitmaps compactados)
+    # =============================
+    def todos(self) -> np.ndarray:
+        bitmap = np.full(self.bitmaps.shape[1], 0xFF, dtype=np.uint8)
+        return self._aparar(bitmap)
+
+    def contendo(self, incluir: Iterable[int] = (), excluir: Iterable[int] = (),
+                 qualquer: Iterable[int] = ()) -> np.ndarray:
+        """Bitmap de: todas de 'incluir' E nenhuma de 'excluir' E ao menos uma de 'qualquer'."""
+        bitmap = self.todos()
+        for n in incluir:
+            bitmap &= self.bitmaps[n - 1]
+        for n in excluir:
+            bitmap &= ~self.bitmaps[n - 1]
+        qualquer = list(qualquer)
+        if qualquer:
+            bitmap &= np.bitwise_or.reduce(self.bitmaps[np.asarray(qualquer) - 1], axis=0)
+        return self._aparar(bitmap)
+
+    def pelo_menos(self, dezenas: Sequence[int], k: int) -> np.ndarray:
+        """Bitmap dos concursos com k ou mais das dezenas dadas."""
+        dezenas = list(dezenas)
+        if not dezenas:
+            return self.todos() if k <= 0 else self._empacotar(np.zeros(len(self), dtype=bool))
+        linhas = np.unpackbits(
+            self.bitmaps[np.asarray(dezenas) - 1], axis=1,
+            count=len(self), bitorder="little"
+        )
+        return self._empacotar(linhas.sum(axis=0, dtype=np.int16) >= k)
+
+    def entre_datas(self, inicio: Data = None, fim: Data = None) -> np.ndarray:
+        """Bitmap dos concursos com data em [inicio, fim] (fim inclui o dia todo)."""
+        selecao = self.timestamps != SEM_DATA
+        if inicio is not None:
+            selecao &= self.timestamps >= self._para_timestamp(inicio)
+        if fim is not None:
+            limite = ler_data(fim)
+            if limite is None:
+                raise ValueError(f"Data inválida: {fim!r}")
+            if limite == limite.normalize():
+                limite += pd.Timedelta(days=1) - pd.Timedelta(seconds=1)
+            selecao &= self.timestamps <= int(limite.value // 10**9)
+        return self._empacotar(selecao)
+
+    def entre_concursos(self, inicio: int, fim: int) -> np.ndarray:
+        return self._empacotar((self.concursos >= inicio) & (self.concursos <= fim))
+
+    def consultar(self, incluir: Iterable[int] = (), excluir: Iterable[int] = (),
+                  qualquer: Iterable[int] = (), pelo_menos: Optional[tuple] = None,
+                  inicio: Data = None, fim: Data = None) -> np.ndarray:
+        """
+        Combina os filtros (E lógico) e devolve os números dos concursos.
+        Args:
+            pelo_menos: (dezenas, k)
+            inicio / fim: intervalo de datas
+        """
+        with self._lock:
+            bitmap = self.contendo(incluir, excluir, qualquer)
+            if pelo_menos is not None:
+                bitmap &= self.pelo_menos(*pelo_menos)
+            if inicio is not None or fim is not None:
+                bitmap &= self.entre_datas(inicio, fim)
+            return self.concursos_de(bitmap)
+
+    def concursos_de(self, bitmap: np.ndarray) -> np.ndarray:
+        bits = np.unpackbits(bitmap, count=len(self), bitorder="little").astype(bool)
+        return self.concursos[bits]
+
+    @staticmethod
+    def contar(bitmap: np.ndarray) -> int:
+        return int(popcount(bitmap).sum(dtype=np.int64))
+
+    def _empacotar(self, selecao: np.ndarray) -> np.ndarray:
+        return np.packbits(selecao, bitorder="little")
+
+    def _aparar(self, bitmap: np.ndarray) -> np.ndarray:
+        """Zera os bits além do último concurso (o NÃO os liga)."""
+        sobra = len(self) % 8
+        if sobra:
+            bitmap[-1] &= np.uint8((1 << sobra) - 1)
+        return bitmap
+
+    @staticmethod
+    def _para_timestamp(data: Data) -> int:
+        """Segundos Unix; aceita 'dd/mm/aaaa' (API) e ISO."""
+        momento = ler_data(data)
+        return SEM_DATA if momento is None else int(momento.value // 10**9)
+
+    # =============================
+    # PERSISTÊNCIA
+    # =============================
+    def salvar(self):
+        if self.caminho is None:
+            return
+        with self._lock:
+            temporario = self.caminho.with_name(f"{self.caminho.stem}.{os.getpid()}.tmp.npz")
+            try:
+                np.savez_compressed(
+                    temporario,
+                    concursos=self.concursos,
+                    timestamps=self.timestamps,
+                    bitmaps=self.bitmaps,
+                    versao_historico=np.array(json.dumps(self.versao_historico)),
+                )
+                os.replace(temporario, self.caminho)
+            except OSError:
+                # O índice em memória continua válido; o arquivo é refeito na próxima gravação
+                temporario.unlink(missing_ok=True)
+                logger.warning("Não foi possível gravar o índice invertido em %s", self.caminho,
+                               exc_info=True)
+
+    def _carregar(self):
+        try:
+            with np.load(self.caminho) as dados:
+                self.concursos = dados["concursos"]
+                self.timestamps = dados["timestamps"]
+                self.bitmaps = dados["bitmaps"]
+                self.versao_historico = json.loads(str(dados["versao_historico"]))
+        except (OSError, ValueError, KeyError):
+            self._zerar()
+            self.versao_historico = None
@@ -1,5 +1,49 @@
 # services/kpi_calculator.py
-from typing import Dict, List, Optional
+from typing import Dict, List, NamedTuple, Optional, Union
+
+import numpy as np
+
+from services.mascara import (
+    Mascara,
+    mascaras_para_matriz,
+    PRIMOS,
+    MOLDURA,
+    MASCARA_PARES,
+    MASCARA_PRIMOS,
+    MASCARA_MOLDURA,
+    MASCARA_BAIXOS,
+    MASCARA_MEDIOS,
+    MASCARA_ALTOS,
+    soma_mascara,
+)
+
+
+# Colunas da matriz de pesos 25 x K usada no cálculo em lote
+_NUMEROS = np.arange(1, 26)
+_PESOS_LOTE = np.stack([
+    np.ones(25),                                # quantidade
+    _NUMEROS,                                   # soma
+    _NUMEROS % 2 == 0,                          # pares
+    np.isin(_NUMEROS, list(PRIMOS)),            # primos
+    np.isin(_NUMEROS, list(MOLDURA)),           # moldura
+    (_NUMEROS >= 1) & (_NUMEROS <= 8),          # baixos
+    (_NUMEROS >= 9) & (_NUMEROS <= 17),         # medios
+    (_NUMEROS >= 18) & (_NUMEROS <= 25),        # altos
+], axis=1).astype(np.float32)
+
+TAMANHO_BLOCO_LOTE = 1 << 18
+
+
+class KPIsRapidos(NamedTuple):
+    """KPIs planos calculados a partir de máscaras (sem listas nem dicts)."""
+    soma: int
+    pares: int
+    primos: int
+    moldura: int
+    baixos: int
+    medios: int
+    altos: int
+    repetidas: int
 
 
 class KPICalculator:
@@ -22,12 +66,8 @@ class KPICalculator:
         # =============================
         # DEFINIÇÕES FIXAS (SEM SETTINGS)
         # =============================
-        primos = {2, 3, 5, 7, 11, 13, 17, 19, 23}
-        moldura = {
-            1, 2, 3, 4, 5,
-            6, 10, 11, 15, 16,
-            20, 21, 22, 23, 24, 25
-        }
+        primos = PRIMOS
+        moldura = MOLDURA
 
         # Faixas padrão Lotofácil
         baixos = [n for n in dezenas if 1 <= n <= 8]
@@ -68,6 +108,90 @@ class KPICalculator:
             }
         }
 
+    @staticmethod
+    def calcular_mascara(
+        mascara: Union[Mascara, int],
+        mascara_anterior: Union[Mascara, int, None] = None
+    ) -> KPIsRapidos:
+        """
+        Caminho rápido: KPIs via popcount sobre máscaras pré-calculadas.
+        Não valida a quantidade de dezenas (use com jogos de 15).
+        """
+        bits = int(mascara)
+        pares = (bits & MASCARA_PARES).bit_count()
+
+        return KPIsRapidos(
+            soma=soma_mascara(bits),
+            pares=pares,
+            primos=(bits & MASCARA_PRIMOS).bit_count(),
+            moldura=(bits & MASCARA_MOLDURA).bit_count(),
+            baixos=(bits & MASCARA_BAIXOS).bit_count(),
+            medios=(bits & MASCARA_MEDIOS).bit_count(),
+            altos=(bits & MASCARA_ALTOS).bit_count(),
+            repetidas=(bits & int(mascara_anterior)).bit_count() if mascara_anterior else 0
+        )
+
+    @staticmethod
+    def calcular_lote(
+        jogos: np.ndarray,
+        dezenas_anterior: Union[List[int], Mascara, int, None] = None,
+        tamanho_bloco: int = TAMANHO_BLOCO_LOTE
+    ) -> Dict[str, np.ndarray]:
+        """
+        KPIs em lote, em formato colunar.
+
+        Args:
+            jogos: matriz N x 25 (bool/uint8) ou array (N,) de máscaras
+            dezenas_anterior: concurso de referência para 'repetidas'
+            tamanho_bloco: linhas processadas por vez (limita a memória)
+        Returns:
+            Dicionário coluna -> array de N posições. Linha a linha equivale
+            a calcular(); jogos sem 15 dezenas saem zerados, com valido=False.
+        """
+        jogos = np.asarray(jogos)
+        por_mascara = jogos.ndim == 1
+        if not por_mascara and (jogos.ndim != 2 or jogos.shape[1] != 25):
+            raise ValueError(f"Esperado N x 25 ou array de máscaras, recebido {jogos.shape}")
+
+        if isinstance(dezenas_anterior, (list, tuple)):
+            dezenas_anterior = Mascara.de_dezenas(dezenas_anterior)
+        pesos = np.column_stack([
+            _PESOS_LOTE,
+            mascaras_para_matriz(np.array([int(dezenas_anterior or 0)]))[0]
+        ]).astype(np.float32)
+
+        n = len(jogos)
+        contagens = np.empty((n, pesos.shape[1]), dtype=np.int16)
+        for inicio in range(0, n, tamanho_bloco):
+            bloco = jogos[inicio:inicio + tamanho_bloco]
+            if por_mascara:
+                bloco = mascaras_para_matriz(bloco)
+            # Produto matricial único: contagens de todas as KPIs do bloco
+            contagens[inicio:inicio + len(bloco)] = (bloco != 0).astype(np.float32) @ pesos
+
+        valido = contagens[:, 0] == 15
+        contagens[~valido] = 0
+        _, soma, pares, primos, moldura, baixos, medios, altos, repetidas = contagens.T
+        impares = np.where(valido, 15 - pares, 0)
+
+        return {
+            "valido": valido,
+            "soma": soma,
+            "pares": pares.astype(np.uint8),
+            "impares": impares.astype(np.uint8),
+            "primos": primos.astype(np.uint8),
+            "moldura": moldura.astype(np.uint8),
+            "baixos": baixos.astype(np.uint8),
+            "medios": medios.astype(np.uint8),
+            "altos": altos.astype(np.uint8),
+            "repetidas": repetidas.astype(np.uint8),
+            "soma_ideal": valido & (soma >= 180) & (soma <= 210),
+            "dist_ideal": valido & (baixos == 5) & (medios == 5) & (altos == 5),
+            "pares_ideal": valido & (pares >= 6) & (pares <= 9),
+            "primos_ideal": valido & (primos >= 4) & (primos <= 6),
+            "moldura_ideal": valido & (moldura >= 7) & (moldura <= 10),
+        }
+
     @staticmethod
     def _kpi_vazio() -> Dict:
         return {
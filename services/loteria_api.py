@@ -1,10 +1,28 @@
 # services/loteria_api.py
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from pathlib import Path
-import requests
+import numpy as np
 import pandas as pd
-from typing import Optional, Dict, Any, List
-from collections import Counter
+from collections.abc import Sequence
+from typing import Optional, Dict, Any, List, Tuple
 from config import settings
+from services.cache_http import CacheRespostas
+from services.cache_processo import CacheProcesso
+from services.datas import normalizar_data
+from services.indice_frequencia import IndiceFrequencia
+from services.indice_invertido import SEM_DATA, IndiceInvertido
+from services.mascara import (
+    Mascara,
+    filtrar_jogos_validos,
+    jogo_valido,
+    mascaras_para_matriz,
+    popcount,
+)
 
 # =============================
 # PATHS COMPATÍVEIS COM CLOUD
@@ -12,25 +30,76 @@ from config import settings
 BASE_DIR = Path(__file__).resolve().parent.parent
 DATA_DIR = BASE_DIR / "data"
 HISTORICO_PATH = DATA_DIR / "historico.csv"
+SYNC_WATERMARK_PATH = DATA_DIR / "sync_watermark.json"
+
+logger = logging.getLogger(__name__)
+
+# Gravações no CSV do histórico: uma por vez no processo
+_historico_lock = threading.Lock()
+
+
+class ComparacaoDetalhada(Sequence):
+    """Linhas {'concurso', 'repetidos', 'numeros'} geradas só quando acessadas."""
+
+    def __init__(self, concursos: np.ndarray, repetidas: np.ndarray, qtd_repetidos: np.ndarray):
+        self._concursos = concursos
+        self._repetidas = repetidas
+        self._qtd = qtd_repetidos
+
+    def __len__(self) -> int:
+        return len(self._repetidas)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        return {
+            "concurso": self._concursos[i],
+            "repetidos": int(self._qtd[i]),
+            "numeros": Mascara(int(self._repetidas[i])).para_dezenas()
+        }
 
 
 class LoteriaAPI:
     """Serviço para buscar, armazenar e analisar dados da Lotofácil"""
 
-    def __init__(self):
+    # Cache de respostas compartilhado por todas as instâncias do processo
+    _cache: Optional[CacheRespostas] = None
+
+    def __init__(self, armazenamento=None):
         DATA_DIR.mkdir(exist_ok=True)
+        # Backend opcional do histórico (None = CSV)
+        self.armazenamento = (
+            armazenamento if armazenamento is not None else self._criar_armazenamento()
+        )
+
+    @staticmethod
+    def _criar_armazenamento():
+        backend = settings.HISTORICO_BACKEND.lower()
+        if backend == "binario":
+            from services.historico_binario import HistoricoBinario
+            return HistoricoBinario()
+        if backend == "sqlite":
+            from services.historico_sqlite import HistoricoSQLite
+            return HistoricoSQLite()
+        return None
 
     # =============================
     # API
     # =============================
     def buscar_concurso(self, concurso: str = "latest") -> Optional[Dict[str, Any]]:
-        try:
-            url = f"{settings.LOTERIA_API_URL}/{concurso}"
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            return response.json()
-        except Exception:
-            return None
+        # Concursos numerados nunca mudam: ficam em cache permanente
+        url = f"{settings.LOTERIA_API_URL}/{concurso}"
+        dados = self.cache().obter_json(url, imutavel=str(concurso).isdigit())
+        return dados if isinstance(dados, dict) else None
+
+    @classmethod
+    def cache(cls) -> CacheRespostas:
+        if cls._cache is None:
+            cls._cache = CacheRespostas()
+        return cls._cache
+
+    def estatisticas_cache(self) -> Dict[str, Any]:
+        return self.cache().estatisticas()
 
     def processar_dezenas(self, dados: Dict[str, Any]) -> List[int]:
         if not dados:
@@ -49,27 +118,92 @@ class LoteriaAPI:
     # =============================
     # HISTÓRICO
     # =============================
-    def salvar_historico(self, dezenas: List[int], numero_concurso: Any) -> bool:
-        try:
-            novo = pd.DataFrame([{
-                "concurso": str(numero_concurso),
-                "data": pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "dezenas": ",".join(map(str, dezenas))
-            }])
-
-            if HISTORICO_PATH.exists():
-                df = pd.read_csv(HISTORICO_PATH, dtype=str)
-                df = pd.concat([df, novo], ignore_index=True)
-                df = df.drop_duplicates(subset="concurso", keep="last")
-            else:
-                df = novo
+    def salvar_historico(self, dezenas: List[int], numero_concurso: Any,
+                         data: Optional[str] = None) -> bool:
+        return self.salvar_historico_lote([{
+            "concurso": numero_concurso,
+            "dezenas": dezenas,
+            "data": data
+        }]) == 1
+
+    def salvar_historico_lote(self, registros: List[Dict[str, Any]]) -> int:
+        """
+        Salva vários concursos de uma vez (uma única regravação do CSV).
+        Args:
+            registros: [{'concurso': ..., 'dezenas': [...], 'data': opcional}]
+        Returns:
+            Quantidade de registros salvos
+        """
+        if not registros:
+            return 0
+
+        # Data de gravação fixada uma vez: arquivo e índices ficam iguais
+        agora = pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S")
+        registros = [{**r, "data": r.get("data") or agora} for r in registros]
+
+        versao_anterior = self.versao_historico()
+        salvos = self._gravar_historico(registros)
+        if salvos:
+            self._atualizar_indices(registros, versao_anterior)
+        return salvos
+
+    def _gravar_historico(self, registros: List[Dict[str, Any]]) -> int:
+        if self.armazenamento is not None:
+            return sum(
+                bool(self.armazenamento.salvar(r["dezenas"], r["concurso"], r.get("data")))
+                for r in registros
+            )
 
-            df.to_csv(HISTORICO_PATH, index=False, encoding="utf-8")
-            return True
-        except Exception:
-            return False
+        agora = pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S")
+        novo = pd.DataFrame([{
+            "concurso": str(r["concurso"]),
+            "data": r.get("data") or agora,
+            "dezenas": ",".join(map(str, r["dezenas"]))
+        } for r in registros])
+
+        # Ler -> concatenar -> gravar é uma seção crítica (páginas e
+        # agendador gravam no mesmo arquivo); a troca por os.replace
+        # garante que leitores nunca vejam um CSV pela metade
+        caminho = HISTORICO_PATH
+        temporario = caminho.with_name(f"{caminho.name}.{os.getpid()}.tmp")
+        with _historico_lock:
+            try:
+                if caminho.exists():
+                    df = pd.read_csv(caminho, dtype=str)
+                    df = pd.concat([df, novo], ignore_index=True)
+                    df = df.drop_duplicates(subset="concurso", keep="last")
+                else:
+                    df = novo
+
+                df.to_csv(temporario, index=False, encoding="utf-8")
+                os.replace(temporario, caminho)
+                return len(registros)
+            except (OSError, ValueError, pd.errors.ParserError):
+                temporario.unlink(missing_ok=True)
+                logger.exception("Falha ao gravar %d concurso(s) em %s", len(registros), caminho)
+                return 0
 
     def carregar_historico(self) -> pd.DataFrame:
+        """Histórico interpretado uma vez por versão do arquivo (cache do processo)."""
+        return CacheProcesso.historico(
+            str(self._arquivo_historico()), self.versao_historico(), self._ler_historico
+        )
+
+    def _arquivo_historico(self) -> Path:
+        return Path(getattr(self.armazenamento, "caminho", HISTORICO_PATH))
+
+    def versao_historico(self) -> tuple:
+        """Muda a cada gravação no histórico (inclui o WAL do SQLite)."""
+        arquivo = self._arquivo_historico()
+        return CacheProcesso.versao_arquivo(arquivo, arquivo.with_name(arquivo.name + "-wal"))
+
+    def _ler_historico(self) -> pd.DataFrame:
+        if self.armazenamento is not None:
+            try:
+                return self.armazenamento.carregar_historico()
+            except Exception:
+                return self._df_vazio()
+
         if not HISTORICO_PATH.exists():
             return self._df_vazio()
 
@@ -82,11 +216,320 @@ class LoteriaAPI:
         except Exception:
             return self._df_vazio()
 
+    def buscar_por_numero(self, numero_concurso: Any) -> List[int]:
+        """Dezenas de um concurso do histórico local ([] se não existir)."""
+        if self.armazenamento is not None:
+            try:
+                return self.armazenamento.buscar_por_numero(numero_concurso)
+            except Exception:
+                return []
+
+        df = self.carregar_historico()
+        linhas = df[df["concurso"] == str(numero_concurso)]
+        if linhas.empty:
+            return []
+        return linhas.iloc[-1]["dezenas_lista"]
+
+    def carregar_mascaras(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Concursos oficiais em ordem crescente e suas máscaras (uint32).
+        Em concursos repetidos vale o último gravado. Arrays somente leitura,
+        compartilhados enquanto o histórico não mudar.
+        """
+        def converter():
+            concursos, mascaras = self._mascaras_em_ordem()
+            linhas = self._linhas_oficiais()
+            unicos = concursos[linhas].astype(np.int64)
+            selecionadas = mascaras[linhas]
+            unicos.flags.writeable = False
+            selecionadas.flags.writeable = False
+            return unicos, selecionadas
+
+        return CacheProcesso.analise(
+            "historico", "mascaras_oficiais", converter, versao=self.versao_historico()
+        )
+
+    def carregar_timestamps(self) -> np.ndarray:
+        """Data (segundos Unix) de cada concurso de carregar_mascaras(); sem data = SEM_DATA."""
+        def converter():
+            df = self.carregar_historico()
+            # Mesmas linhas de _mascaras_em_ordem (sem as de dezenas inválidas)
+            df = df[df["dezenas_lista"].map(jogo_valido).astype(bool)] if len(df) else df
+            # 'dd/mm/aaaa' (API) lido com o dia primeiro; ISO como está
+            datas = pd.to_datetime(df["data"].map(normalizar_data), errors="coerce")
+            segundos = np.where(
+                datas.isna(), SEM_DATA, datas.to_numpy(dtype="datetime64[s]").astype(np.int64)
+            )[self._linhas_oficiais()]
+            segundos.flags.writeable = False
+            return segundos
+
+        return CacheProcesso.analise(
+            "historico", "timestamps_oficiais", converter, versao=self.versao_historico()
+        )
+
+    def _linhas_oficiais(self) -> np.ndarray:
+        """Linhas do histórico com concursos oficiais: a última de cada número, em ordem."""
+        def converter():
+            concursos, mascaras = self._mascaras_em_ordem()
+            oficiais = np.array([str(c).isdigit() for c in concursos], dtype=bool)
+            oficiais &= popcount(mascaras) == settings.NUMEROS_SORTEIO
+            linhas = np.flatnonzero(oficiais)
+            if len(linhas) == 0:
+                return linhas
+
+            numeros = concursos[linhas].astype(np.int64)
+            # Última ocorrência de cada concurso, ordenada
+            _, posicoes = np.unique(numeros[::-1], return_index=True)
+            return linhas[::-1][posicoes]
+
+        return CacheProcesso.analise(
+            "historico", "linhas_oficiais", converter, versao=self.versao_historico()
+        )
+
+    # =============================
+    # ÍNDICE DE FREQUÊNCIA
+    # =============================
+    def indice_frequencia(self) -> IndiceFrequencia:
+        """Índice de frequência/atraso sincronizado com o histórico atual."""
+        indice = self._indice_frequencia()
+        with indice._lock:
+            if indice.versao_historico != self._versao_serializavel():
+                self.reconstruir_indice_frequencia(indice)
+        return indice
+
+    def reconstruir_indice_frequencia(self, indice: Optional[IndiceFrequencia] = None) -> IndiceFrequencia:
+        indice = indice or self._indice_frequencia()
+        with indice._lock:
+            indice.reconstruir(*self.carregar_mascaras())
+            indice.versao_historico = self._versao_serializavel()
+            indice.salvar()
+        return indice
+
+    def verificar_indice_frequencia(self) -> Dict[str, Any]:
+        """Confere o índice contra uma recontagem completa do histórico."""
+        return self.indice_frequencia().verificar(*self.carregar_mascaras())
+
+    def _indice_frequencia(self) -> IndiceFrequencia:
+        arquivo = self._arquivo_historico()
+        caminho = arquivo.with_name(f"{arquivo.stem}_frequencia.json")
+        return CacheProcesso.servico(
+            f"indice_frequencia:{caminho}", lambda: IndiceFrequencia(caminho)
+        )
+
+    def _versao_serializavel(self) -> list:
+        return [list(v) if v else None for v in self.versao_historico()]
+
+    # =============================
+    # ÍNDICE INVERTIDO
+    # =============================
+    def indice_invertido(self) -> IndiceInvertido:
+        """Bitmaps por dezena (concursos que a contêm) sincronizados com o histórico."""
+        indice = self._indice_invertido()
+        with indice._lock:
+            if indice.versao_historico != self._versao_serializavel():
+                indice.reconstruir(*self.carregar_mascaras(), self.carregar_timestamps())
+                indice.versao_historico = self._versao_serializavel()
+                indice.salvar()
+        return indice
+
+    def _indice_invertido(self) -> IndiceInvertido:
+        arquivo = self._arquivo_historico()
+        caminho = arquivo.with_name(f"{arquivo.stem}_invertido.npz")
+        return CacheProcesso.servico(
+            f"indice_invertido:{caminho}", lambda: IndiceInvertido(caminho)
+        )
+
+    def _atualizar_indices(self, registros: List[Dict[str, Any]], versao_anterior: tuple):
+        """
+        Acrescenta os concursos novos aos índices persistentes (frequência e
+        invertido). Índice defasado ou concurso fora de ordem: fica para
+        reconstruir na próxima leitura.
+        """
+        anterior = [list(v) if v else None for v in versao_anterior]
+        novos = sorted(
+            (int(r["concurso"]), r["dezenas"], r.get("data")) for r in registros
+            if str(r["concurso"]).isdigit() and len(r["dezenas"]) == settings.NUMEROS_SORTEIO
+            and jogo_valido(r["dezenas"])
+        )
+        frequencia, invertido = self._indice_frequencia(), self._indice_invertido()
+        for indice, registrar in (
+            (frequencia, lambda c, d, data: frequencia.registrar(c, d)),
+            (invertido, invertido.registrar),
+        ):
+            with indice._lock:
+                if indice.versao_historico != anterior:
+                    continue
+                if all(registrar(*novo) for novo in novos):
+                    indice.versao_historico = self._versao_serializavel()
+                else:
+                    indice.versao_historico = None
+                indice.salvar()
+
+    def concursos_salvos(self) -> set:
+        """Números dos concursos oficiais presentes no histórico."""
+        df = self.carregar_historico()
+        return {int(c) for c in df["concurso"] if str(c).isdigit()}
+
     def _df_vazio(self) -> pd.DataFrame:
         return pd.DataFrame(
             columns=["concurso", "data", "dezenas", "dezenas_lista"]
         )
 
+    # =============================
+    # SINCRONIZAÇÃO
+    # =============================
+    def sincronizar(self, forcar: bool = False,
+                    intervalo: float = settings.SYNC_INTERVALO,
+                    maximo_concursos: int = settings.SYNC_MAXIMO_LACUNAS,
+                    watermark_path: Path = SYNC_WATERMARK_PATH,
+                    prazo_confirmacao: float = settings.SYNC_PRAZO_CONFIRMACAO) -> Dict[str, Any]:
+        """
+        Busca na API apenas os concursos mais novos que o maior salvo e as
+        falhas da rodada anterior (no máximo 'maximo_concursos' por vez, dos
+        mais antigos para os mais novos). Lacunas antigas ficam para o
+        BackfillHistorico explícito. Roda na thread do agendador, fora do
+        caminho das páginas.
+        Dentro de 'intervalo' desde a última verificação não acessa a rede;
+        se o 'latest' falhou, a espera dobra a cada falha seguida.
+        Returns:
+            {'adicionados': [...], 'ultimo_publicado', 'falhas': [...], 'pulado': bool}
+        """
+        marca = self._ler_watermark(watermark_path)
+        relatorio = {
+            "adicionados": [],
+            "ultimo_publicado": marca.get("ultimo_publicado"),
+            "falhas": [],
+            "pulado": False,
+        }
+        falhas_latest = int(marca.get("falhas_latest", 0))
+        espera = intervalo
+        if falhas_latest:
+            espera = min(intervalo * 2 ** (falhas_latest - 1), max(intervalo, settings.SYNC_BACKOFF_MAXIMO))
+        if not forcar and time.time() - marca.get("verificado_em", 0) < espera:
+            relatorio["pulado"] = True
+            return relatorio
+
+        ultimo = self.buscar_concurso("latest")
+        publicado = (ultimo or {}).get("concurso") or (ultimo or {}).get("numero")
+        if not str(publicado).isdigit():
+            relatorio["falhas"].append("latest")
+            # Grava a tentativa: as próximas cargas não voltam à rede de imediato
+            self._gravar_watermark(watermark_path, {
+                **marca,
+                "falhas_latest": falhas_latest + 1,
+                "verificado_em": time.time(),
+            })
+            logger.warning("Sincronização: 'latest' indisponível (%d falha(s) seguida(s))",
+                           falhas_latest + 1)
+            return relatorio
+        publicado = int(publicado)
+        relatorio["ultimo_publicado"] = publicado
+
+        salvos = self.concursos_salvos()
+        # 'inexistentes_404' só guarda 404 confirmados; a antiga chave
+        # 'inexistentes' misturava falhas transitórias e é descartada
+        inexistentes = set(marca.get("inexistentes_404", []))
+        # Falhas da rodada anterior voltam a ser buscadas
+        repetir = {int(c) for c in marca.get("falhas", []) if str(c).isdigit()} - salvos
+        inicio = max(salvos) + 1 if salvos else publicado
+        faltantes = sorted(
+            (set(range(max(inicio, 1), publicado + 1)) | repetir) - inexistentes
+        )[:maximo_concursos]
+
+        if faltantes:
+            from services.backfill import BackfillHistorico
+            from services.loteria_api_async import LoteriaAPIAsync
+
+            cliente = LoteriaAPIAsync(self)
+            try:
+                lote = cliente.buscar_varios_sync([c for c in faltantes if c != publicado])
+            finally:
+                cliente.fechar()
+            respostas = {int(c): dados for c, dados in lote["resultados"].items()}
+            respostas[publicado] = ultimo
+
+            registros = []
+            sem_resposta = []
+            for concurso in faltantes:
+                dados = respostas.get(concurso)
+                dezenas = self.processar_dezenas(dados)
+                if len(dezenas) == settings.NUMEROS_SORTEIO:
+                    registros.append({
+                        "concurso": concurso,
+                        "dezenas": dezenas,
+                        "data": BackfillHistorico._normalizar_data(dados.get("data")),
+                    })
+                else:
+                    sem_resposta.append(concurso)
+
+            # O cliente não distingue 404 de timeout/429/5xx: só um 404
+            # confirmado marca o concurso como inexistente; o resto é falha
+            # e volta a ser buscado na próxima sincronização
+            if sem_resposta:
+                for concurso, (situacao, registro) in self._confirmar_ausentes(sem_resposta, prazo_confirmacao).items():
+                    if situacao == "ok" and registro["concurso"] == concurso:
+                        registros.append(registro)
+                    elif situacao == "inexistente":
+                        inexistentes.add(concurso)
+                    else:
+                        relatorio["falhas"].append(concurso)
+
+            registros.sort(key=lambda r: r["concurso"])
+            if self.salvar_historico_lote(registros) == len(registros):
+                relatorio["adicionados"] = [r["concurso"] for r in registros]
+            else:
+                relatorio["falhas"].extend(r["concurso"] for r in registros)
+
+        ultimo_salvo = max(salvos | set(relatorio["adicionados"]), default=None)
+        self._gravar_watermark(watermark_path, {
+            "ultimo_publicado": publicado,
+            "ultimo_salvo": ultimo_salvo,
+            # Só os posteriores ao último salvo ainda afetam a sincronização
+            "inexistentes_404": sorted(c for c in inexistentes if ultimo_salvo is None or c > ultimo_salvo),
+            "falhas": sorted(relatorio["falhas"]),
+            "verificado_em": time.time(),
+        })
+        return relatorio
+
+    def _confirmar_ausentes(self, concursos: List[int],
+                            prazo: float) -> Dict[int, Tuple[str, Optional[Dict]]]:
+        """
+        Situação de cada concurso sem resposta, em paralelo e com prazo total:
+        o que não terminar dentro de 'prazo' segundos conta como falha.
+        """
+        from services.backfill import BackfillHistorico
+
+        confirmacao = BackfillHistorico(self, tentativas=1, timeout=min(10, max(prazo, 0.1)))
+        situacoes = {c: ("falha", None) for c in concursos}
+        pool = ThreadPoolExecutor(max_workers=min(confirmacao.trabalhadores, len(concursos)))
+        try:
+            futuros = {pool.submit(confirmacao.situacao_concurso, c): c for c in concursos}
+            concluidos, _ = wait(futuros, timeout=prazo)
+            for futuro in concluidos:
+                if futuro.exception() is None:
+                    situacoes[futuros[futuro]] = futuro.result()
+        finally:
+            # Não espera os atrasados: a página/agendador segue com o prazo
+            pool.shutdown(wait=False, cancel_futures=True)
+        return situacoes
+
+    @staticmethod
+    def _ler_watermark(caminho: Path) -> Dict[str, Any]:
+        try:
+            return json.loads(Path(caminho).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _gravar_watermark(caminho: Path, marca: Dict[str, Any]):
+        caminho = Path(caminho)
+        temporario = caminho.with_suffix(".tmp")
+        try:
+            temporario.write_text(json.dumps(marca), encoding="utf-8")
+            temporario.replace(caminho)
+        except OSError:
+            pass
+
     # =============================
     # CONSULTAS
     # =============================
@@ -111,44 +554,86 @@ class LoteriaAPI:
         return [n for n in range(1, 26) if n not in dezenas]
 
     def comparar_com_anteriores(self, dezenas_atual: List[int], quantidade: int = 5) -> Dict:
-        df = self.carregar_historico()
-
-        if df.empty:
+        comparacao = self.comparar_com_historico(dezenas_atual, quantidade)
+        if not comparacao["concursos_anteriores"] and not comparacao["tendencias"]:
             return self._comparacao_vazia()
 
-        df = df.tail(quantidade + 1)
-
-        comparacoes = []
-        repetidos_geral = []
-
-        for _, row in df.iterrows():
-            dezenas_ant = row["dezenas_lista"]
-            if dezenas_ant == dezenas_atual:
-                continue
-
-            repetidos = list(set(dezenas_atual) & set(dezenas_ant))
-            repetidos_geral.extend(repetidos)
-
-            comparacoes.append({
-                "concurso": row["concurso"],
-                "repetidos": len(repetidos),
-                "numeros": sorted(repetidos)
-            })
-
-        freq = Counter(repetidos_geral)
-
+        comparacao["comparacao_detalhada"] = list(comparacao["comparacao_detalhada"])
+        del comparacao["distribuicao_repeticoes"]
+        return comparacao
+
+    def comparar_com_historico(self, dezenas_atual: List[int], quantidade: Any = "todos",
+                               detalhado: bool = False) -> Dict:
+        """
+        Compara o jogo com o histórico inteiro (ou os últimos 'quantidade'+1
+        registros) de uma vez: AND das máscaras + popcount vetorizado.
+        Args:
+            quantidade: int ou "todos"
+            detalhado: materializa as linhas por concurso; senão
+                'comparacao_detalhada' é uma sequência preguiçosa
+        """
+        concursos, mascaras = self._mascaras_em_ordem()
+        if len(mascaras) == 0:
+            return {**self._comparacao_vazia(), "distribuicao_repeticoes": {}}
+
+        if quantidade != "todos":
+            concursos, mascaras = concursos[-(int(quantidade) + 1):], mascaras[-(int(quantidade) + 1):]
+
+        mascara_atual = np.uint32(int(Mascara.de_dezenas(dezenas_atual)))
+        manter = mascaras != mascara_atual
+        concursos, repetidas = concursos[manter], mascaras[manter] & mascara_atual
+        qtd_repetidos = popcount(repetidas)
+
+        # Quantas vezes cada dezena do jogo se repetiu
+        contagem = mascaras_para_matriz(repetidas).sum(axis=0, dtype=np.int64)
+        freq = {n: int(contagem[n - 1]) for n in range(1, 26) if contagem[n - 1]}
+        distribuicao = np.bincount(qtd_repetidos, minlength=16)
+
+        detalhes = ComparacaoDetalhada(concursos, repetidas, qtd_repetidos)
         return {
-            "concursos_anteriores": len(comparacoes),
-            "media_repeticao": round(
-                sum(c["repetidos"] for c in comparacoes) / len(comparacoes), 2
-            ) if comparacoes else 0,
+            "concursos_anteriores": len(repetidas),
+            "media_repeticao": round(float(qtd_repetidos.mean()), 2) if len(repetidas) else 0,
+            "distribuicao_repeticoes": {
+                k: int(v) for k, v in enumerate(distribuicao) if v
+            },
             "tendencias": {
                 "numeros_quentes": [n for n, f in freq.items() if f >= 3],
-                "frequencia": dict(freq)
+                "frequencia": freq,
+                "pares": self._pares_do_jogo(dezenas_atual)
             },
-            "comparacao_detalhada": comparacoes
+            "comparacao_detalhada": list(detalhes) if detalhado else detalhes
         }
 
+    def _mascaras_em_ordem(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Concursos e máscaras na ordem do histórico (uma conversão por versão).
+        Linhas com dezenas fora de 1-25 são puladas (e registradas no log):
+        uma linha corrompida não derruba as análises.
+        """
+        def converter():
+            df = self.carregar_historico()
+            concursos = df["concurso"].to_numpy(dtype=object)
+            if not len(df):
+                return concursos, np.empty(0, dtype=np.uint32)
+            mascaras, validos = filtrar_jogos_validos(df["dezenas_lista"].tolist())
+            if not validos.all():
+                logger.warning("Histórico: %d linha(s) com dezenas inválidas ignorada(s) (concursos %s)",
+                               int((~validos).sum()), concursos[~validos][:10].tolist())
+            return concursos[validos], mascaras
+
+        return CacheProcesso.analise(
+            "historico", "mascaras_em_ordem", converter, versao=self.versao_historico()
+        )
+
+    def _pares_do_jogo(self, dezenas: List[int]) -> Dict[str, List]:
+        """Pares do jogo mais/menos frequentes no histórico (consulta O(1) na matriz)."""
+        from services.coocorrencia import Coocorrencia
+
+        coocorrencia = Coocorrencia.obter(self)
+        if coocorrencia.sorteios == 0:
+            return {"mais_frequentes": [], "menos_frequentes": []}
+        return coocorrencia.resumo_pares(dezenas)
+
     def _comparacao_vazia(self) -> Dict:
         return {
             "concursos_anteriores": 0,
@@ -179,12 +664,19 @@ class LoteriaAPI:
             "maior": max((len(s) for s in sequencias), default=0)
         }
 
-    def obter_estatisticas_completas(self, dezenas: List[int]) -> Dict:
+    def obter_estatisticas_completas(self, dezenas: List[int],
+                                     concurso: Optional[Any] = None) -> Dict:
         from services.kpi_calculator import KPICalculator
 
-        return {
-            "kpis": KPICalculator.calcular(dezenas),
-            "nao_sorteados": self.obter_numeros_nao_sorteados(dezenas),
-            "comparacao": self.comparar_com_anteriores(dezenas),
-            "sequencias": self.analisar_sequencias(dezenas)
-        }
+        return CacheProcesso.analise(
+            concurso if concurso is not None else "avulso",
+            "estatisticas",
+            lambda: {
+                "kpis": KPICalculator.calcular(dezenas),
+                "nao_sorteados": self.obter_numeros_nao_sorteados(dezenas),
+                "comparacao": self.comparar_com_anteriores(dezenas),
+                "sequencias": self.analisar_sequencias(dezenas)
+            },
+            versao=self.versao_historico(),
+            detalhe=tuple(dezenas),
+        )
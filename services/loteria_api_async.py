@@ -0,0 +1,156 @@
+# services/loteria_api_async.py
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
+
+from services.loteria_api import LoteriaAPI
+
+
+class LoteriaAPIAsync:
+    """
+    Cliente assíncrono da API de resultados.
+    Espelha buscar_concurso / get_ultimo_concurso_info e busca vários
+    concursos em paralelo (semáforo + prazo total). As requisições usam a
+    sessão com pool e o cache em disco da LoteriaAPI, em um pool de threads
+    próprio (o prazo não fica preso a requisições lentas).
+    """
+
+    def __init__(self, api: Optional[LoteriaAPI] = None,
+                 limite: int = 8, prazo: float = 15.0):
+        self.api = api or LoteriaAPI()
+        self.limite = limite
+        self.prazo = prazo
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.limite, thread_name_prefix="loteria-async"
+            )
+        return self._executor
+
+    # =============================
+    # API (espelho da LoteriaAPI)
+    # =============================
+    async def buscar_concurso(self, concurso: Any = "latest") -> Optional[Dict[str, Any]]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool(), self.api.buscar_concurso, str(concurso))
+
+    async def get_ultimo_concurso_info(self) -> Optional[Dict]:
+        dados = await self.buscar_concurso("latest")
+        if not dados:
+            return None
+        return {
+            "numero": dados.get("concurso") or dados.get("numero"),
+            "data": dados.get("data"),
+            "dezenas": self.api.processar_dezenas(dados),
+            "acumulado": dados.get("acumulado")
+        }
+
+    # =============================
+    # LOTE
+    # =============================
+    async def buscar_varios(self, concursos: Iterable[Any],
+                            prazo: Optional[float] = None) -> Dict[str, Dict]:
+        """
+        Busca vários concursos ao mesmo tempo.
+        Returns:
+            {'resultados': {concurso: dados}, 'erros': {concurso: motivo}}
+            Resultados parciais são devolvidos quando o prazo estoura.
+        """
+        concursos = list(dict.fromkeys(str(c) for c in concursos))
+        semaforo = asyncio.Semaphore(self.limite)
+
+        async def buscar(concurso: str):
+            async with semaforo:
+                return await self.buscar_concurso(concurso)
+
+        tarefas = {asyncio.ensure_future(buscar(c)): c for c in concursos}
+        resultados: Dict[str, Dict] = {}
+        erros: Dict[str, str] = {}
+        if not tarefas:
+            return {"resultados": resultados, "erros": erros}
+
+        concluidas, pendentes = await asyncio.wait(
+            tarefas, timeout=self.prazo if prazo is None else prazo
+        )
+        for tarefa in pendentes:
+            tarefa.cancel()
+            erros[tarefas[tarefa]] = "prazo esgotado"
+
+        for tarefa in concluidas:
+            concurso = tarefas[tarefa]
+            if tarefa.exception() is not None:
+                erros[concurso] = f"erro: {tarefa.exception()}"
+            elif tarefa.result() is None:
+                erros[concurso] = "sem resposta ou inexistente"
+            else:
+                resultados[concurso] = tarefa.result()
+
+        return {"resultados": resultados, "erros": erros}
+
+    async def buscar_ultimos(self, quantidade: int = 10,
+                             prazo: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Último concurso + os 'quantidade' anteriores.
+        Os anteriores são disparados junto com o 'latest', estimados pelo maior
+        concurso salvo; só há uma segunda rodada se a estimativa errar.
+        """
+        palpite = self._ultimo_salvo()
+        tarefa_ultimo = asyncio.ensure_future(self.buscar_concurso("latest"))
+        antecipados = self._anteriores(palpite + 1, quantidade) if palpite else []
+        lote = await self.buscar_varios(antecipados, prazo)
+
+        ultimo = await tarefa_ultimo
+        numero = (ultimo or {}).get("concurso") or (ultimo or {}).get("numero")
+        if not str(numero).isdigit():
+            return {"ultimo": ultimo, "resultados": {}, "erros": {"latest": "sem resposta"}}
+
+        desejados = [str(c) for c in self._anteriores(int(numero), quantidade)]
+        faltantes = [c for c in desejados if c not in lote["resultados"] and c not in lote["erros"]]
+        if faltantes:
+            extra = await self.buscar_varios(faltantes, prazo)
+            lote["resultados"].update(extra["resultados"])
+            lote["erros"].update(extra["erros"])
+
+        return {
+            "ultimo": ultimo,
+            "resultados": {c: lote["resultados"][c] for c in desejados if c in lote["resultados"]},
+            "erros": {c: lote["erros"][c] for c in desejados if c in lote["erros"]},
+        }
+
+    @staticmethod
+    def _anteriores(numero: int, quantidade: int) -> List[int]:
+        return [numero - i for i in range(1, quantidade + 1) if numero - i > 0]
+
+    def _ultimo_salvo(self) -> int:
+        try:
+            concursos = self.api.carregar_historico()["concurso"]
+            return max((int(c) for c in concursos if str(c).isdigit()), default=0)
+        except Exception:
+            return 0
+
+    # =============================
+    # USO SÍNCRONO (STREAMLIT / SCRIPTS)
+    # =============================
+    def buscar_varios_sync(self, concursos: Iterable[Any],
+                           prazo: Optional[float] = None) -> Dict[str, Dict]:
+        return asyncio.run(self.buscar_varios(concursos, prazo))
+
+    def buscar_ultimos_sync(self, quantidade: int = 10,
+                            prazo: Optional[float] = None) -> Dict[str, Any]:
+        return asyncio.run(self.buscar_ultimos(quantidade, prazo))
+
+    def fechar(self):
+        """Libera o pool sem esperar requisições que estouraram o prazo."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    @staticmethod
+    def dezenas_por_concurso(lote: Dict[str, Dict], api: LoteriaAPI) -> Dict[int, List[int]]:
+        """Converte 'resultados' de um lote em {concurso: dezenas}."""
+        return {
+            int(c): api.processar_dezenas(dados)
+            for c, dados in lote.get("resultados", {}).items() if str(c).isdigit()
+        }
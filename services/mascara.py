@@ -0,0 +1,196 @@
+# services/mascara.py
+from typing import Iterable, Iterator, List, Sequence, Tuple, Union
+
+import numpy as np
+
+# =============================
+# MÁSCARAS PRÉ-CALCULADAS
+# =============================
+# Cada dezena n (1..25) ocupa o bit (n - 1) de um inteiro de 25 bits.
+
+
+def _mascara_de(numeros: Iterable[int]) -> int:
+    bits = 0
+    for n in numeros:
+        bits |= 1 << (n - 1)
+    return bits
+
+
+PRIMOS = frozenset({2, 3, 5, 7, 11, 13, 17, 19, 23})
+MOLDURA = frozenset({
+    1, 2, 3, 4, 5,
+    6, 10, 11, 15, 16,
+    20, 21, 22, 23, 24, 25
+})
+
+MASCARA_TOTAL = (1 << 25) - 1
+MASCARA_PARES = _mascara_de(range(2, 26, 2))
+MASCARA_PRIMOS = _mascara_de(PRIMOS)
+MASCARA_MOLDURA = _mascara_de(MOLDURA)
+
+# Faixas usadas pelo KPICalculator (B | M | A)
+MASCARA_BAIXOS = _mascara_de(range(1, 9))
+MASCARA_MEDIOS = _mascara_de(range(9, 18))
+MASCARA_ALTOS = _mascara_de(range(18, 26))
+
+# Volante 5x5
+MASCARAS_LINHAS = tuple(_mascara_de(range(5 * i + 1, 5 * i + 6)) for i in range(5))
+MASCARAS_COLUNAS = tuple(_mascara_de(range(j + 1, 26, 5)) for j in range(5))
+MASCARAS_QUADRANTES = (
+    _mascara_de([1, 2, 3, 4, 5, 6, 11, 12, 13, 14, 15]),
+    _mascara_de([7, 8, 9, 10, 16, 17, 18, 19, 20]),
+    _mascara_de([21, 22, 23, 24, 25]),
+)
+
+# Planos de bits das dezenas: soma = sum(popcount(m & PLANO[b]) << b)
+PLANOS_SOMA = tuple(
+    _mascara_de(n for n in range(1, 26) if n >> b & 1) for b in range(5)
+)
+
+
+def soma_mascara(bits: int) -> int:
+    """Soma das dezenas presentes na máscara (5 popcounts)."""
+    return (
+        (bits & PLANOS_SOMA[0]).bit_count()
+        + ((bits & PLANOS_SOMA[1]).bit_count() << 1)
+        + ((bits & PLANOS_SOMA[2]).bit_count() << 2)
+        + ((bits & PLANOS_SOMA[3]).bit_count() << 3)
+        + ((bits & PLANOS_SOMA[4]).bit_count() << 4)
+    )
+
+
+class Mascara:
+    """
+    Representação compacta de um jogo como máscara de 25 bits.
+    Imutável, hashable e conversível de/para List[int].
+    """
+
+    __slots__ = ("bits",)
+
+    def __init__(self, bits: int = 0):
+        bits = int(bits)
+        if bits < 0 or bits > MASCARA_TOTAL:
+            raise ValueError(f"Máscara fora do intervalo de 25 bits: {bits}")
+        object.__setattr__(self, "bits", bits)
+
+    def __setattr__(self, nome, valor):
+        raise AttributeError("Mascara é imutável")
+
+    # =============================
+    # CONVERSÕES
+    # =============================
+    @classmethod
+    def de_dezenas(cls, dezenas: Iterable[int]) -> "Mascara":
+        bits = 0
+        for n in dezenas:
+            n = int(n)
+            if not 1 <= n <= 25:
+                raise ValueError(f"Dezena inválida: {n}")
+            bits |= 1 << (n - 1)
+        return cls(bits)
+
+    def para_dezenas(self) -> List[int]:
+        bits = self.bits
+        dezenas = []
+        while bits:
+            menor = bits & -bits
+            dezenas.append(menor.bit_length())
+            bits ^= menor
+        return dezenas
+
+    # =============================
+    # OPERAÇÕES
+    # =============================
+    def intersecao(self, outra: Union["Mascara", int]) -> int:
+        """Quantidade de dezenas em comum."""
+        return (self.bits & int(outra)).bit_count()
+
+    def soma(self) -> int:
+        return soma_mascara(self.bits)
+
+    def __and__(self, outra: Union["Mascara", int]) -> "Mascara":
+        return Mascara(self.bits & int(outra))
+
+    def __or__(self, outra: Union["Mascara", int]) -> "Mascara":
+        return Mascara(self.bits | int(outra))
+
+    def __int__(self) -> int:
+        return self.bits
+
+    __index__ = __int__
+
+    def __len__(self) -> int:
+        return self.bits.bit_count()
+
+    def __contains__(self, n: int) -> bool:
+        return 1 <= n <= 25 and bool(self.bits >> (n - 1) & 1)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.para_dezenas())
+
+    def __eq__(self, outra) -> bool:
+        if isinstance(outra, Mascara):
+            return self.bits == outra.bits
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.bits)
+
+    def __repr__(self) -> str:
+        return f"Mascara({self.para_dezenas()})"
+
+
+# =============================
+# CONVERSÕES VETORIZADAS (NUMPY)
+# =============================
+_BITS = np.uint32(1) << np.arange(25, dtype=np.uint32)
+_POPCOUNT_BYTE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def popcount(valores: np.ndarray) -> np.ndarray:
+    """Popcount elemento a elemento de um array de inteiros sem sinal (uint8)."""
+    valores = np.asarray(valores)
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(valores).astype(np.uint8, copy=False)
+    # NumPy < 2.0: tabela por byte
+    bytes_ = np.ascontiguousarray(valores).view(np.uint8).reshape(valores.shape + (-1,))
+    return _POPCOUNT_BYTE[bytes_].sum(axis=-1, dtype=np.uint8)
+
+
+def mascaras_para_matriz(mascaras: np.ndarray) -> np.ndarray:
+    """Array de máscaras (N,) -> matriz de incidência N x 25 (uint8)."""
+    mascaras = np.asarray(mascaras, dtype=np.uint32)
+    return ((mascaras[:, None] & _BITS) != 0).view(np.uint8)
+
+
+def matriz_para_mascaras(matriz: np.ndarray) -> np.ndarray:
+    """Matriz de incidência N x 25 (bool/uint8) -> array de máscaras uint32."""
+    matriz = np.asarray(matriz)
+    if matriz.ndim != 2 or matriz.shape[1] != 25:
+        raise ValueError(f"Matriz deve ter formato N x 25, recebido {matriz.shape}")
+    return (matriz != 0).astype(np.uint32) @ _BITS
+
+
+def dezenas_para_mascaras(jogos: Iterable[Sequence[int]]) -> np.ndarray:
+    """Lista de jogos (List[List[int]]) -> array de máscaras uint32."""
+    return np.fromiter(
+        (int(Mascara.de_dezenas(jogo)) for jogo in jogos), dtype=np.uint32
+    )
+
+
+def jogo_valido(jogo: Sequence[int]) -> bool:
+    """Todas as dezenas inteiras entre 1 e 25."""
+    try:
+        return all(1 <= int(n) <= 25 for n in jogo)
+    except (TypeError, ValueError):
+        return False
+
+
+def filtrar_jogos_validos(jogos: Sequence[Sequence[int]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Como dezenas_para_mascaras, mas pula jogos com dezenas fora de 1-25
+    (ex.: linha corrompida no CSV). Returns: (máscaras dos válidos, vetor bool de válidos)
+    """
+    validos = np.fromiter((jogo_valido(jogo) for jogo in jogos), dtype=bool, count=len(jogos))
+    mascaras = dezenas_para_mascaras(jogo for jogo, ok in zip(jogos, validos) if ok)
+    return mascaras, validos
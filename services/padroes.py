@@ -0,0 +1,143 @@
+# services/padroes.py
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from services.coocorrencia import probabilidade_conjunto
+from services.mascara import mascaras_para_matriz
+
+# Tidsets do processo trabalhador (definidos no initializer do pool)
+_tidsets_trabalhador: List[int] = []
+
+
+class MineradorPadroes:
+    """
+    Mineração de conjuntos frequentes (Eclat) no histórico.
+    Cada dezena é um bitset (int) dos concursos em que saiu; o suporte de
+    um grupo é o popcount da interseção. A busca em profundidade é dividida
+    pela primeira dezena entre processos e poda pela anti-monotonicidade
+    do suporte.
+    """
+
+    def __init__(self, mascaras: np.ndarray, concursos: Optional[Sequence[int]] = None):
+        mascaras = np.asarray(mascaras, dtype=np.uint32)
+        self.sorteios = len(mascaras)
+        self.concursos = (
+            np.asarray(concursos, dtype=np.int64) if concursos is not None
+            else np.arange(1, self.sorteios + 1)
+        )
+        bits = np.packbits(mascaras_para_matriz(mascaras).T, axis=1, bitorder="little")
+        self.tidsets = [int.from_bytes(linha.tobytes(), "little") for linha in bits]
+        self.frequencias = [t.bit_count() for t in self.tidsets]
+
+    @classmethod
+    def do_historico(cls, api) -> "MineradorPadroes":
+        concursos, mascaras = api.carregar_mascaras()
+        return cls(mascaras, concursos)
+
+    # =============================
+    # MINERAÇÃO
+    # =============================
+    def minerar(self, tamanho_min: int = 2, tamanho_max: int = 6,
+                suporte_minimo: float = 0.0,
+                acima_do_esperado: Optional[float] = None,
+                processos: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Args:
+            suporte_minimo: fração (0-1) ou contagem absoluta (>= 1) de concursos
+            acima_do_esperado: exige suporte >= fator x esperado (hipergeométrica)
+                para o tamanho do grupo, ex.: 1.2
+            processos: tamanho do pool (None = CPUs; 1 = sem pool)
+        Returns:
+            Grupos com suporte, lift, esperado e último concurso, ordenados
+            por tamanho e suporte
+        """
+        if self.sorteios == 0:
+            return []
+        limiares = self._limiares(tamanho_min, tamanho_max, suporte_minimo, acima_do_esperado)
+
+        processos = processos or os.cpu_count() or 1
+        raizes = list(range(25))
+        if processos <= 1:
+            _definir_tidsets(self.tidsets)
+            brutos = [r for raiz in raizes for r in _minerar_raiz(raiz, tamanho_max, limiares)]
+        else:
+            # Raízes menores têm árvores maiores: intercaladas para equilibrar
+            grupos = [raizes[i::processos] for i in range(processos)]
+            with ProcessPoolExecutor(max_workers=processos, initializer=_definir_tidsets,
+                                     initargs=(self.tidsets,)) as pool:
+                partes = pool.map(_minerar_raizes, grupos,
+                                  [tamanho_max] * processos, [limiares] * processos)
+                brutos = [r for parte in partes for r in parte]
+
+        resultados = [
+            self._resultado(itens, suporte, ultimo)
+            for itens, suporte, ultimo in brutos if len(itens) >= tamanho_min
+        ]
+        resultados.sort(key=lambda r: (len(r["dezenas"]), -r["suporte"], r["dezenas"]))
+        return resultados
+
+    def _limiares(self, tamanho_min: int, tamanho_max: int, suporte_minimo: float,
+                  acima_do_esperado: Optional[float]) -> Tuple[Dict, Dict]:
+        """Suporte mínimo por tamanho e limiar de poda (mínimo dos maiores)."""
+        absoluto = suporte_minimo if suporte_minimo >= 1 else suporte_minimo * self.sorteios
+        exigido = {}
+        for k in range(1, tamanho_max + 1):
+            limite = absoluto
+            if acima_do_esperado is not None:
+                limite = max(limite, acima_do_esperado * self.sorteios * probabilidade_conjunto(k))
+            exigido[k] = max(1, math.ceil(limite)) if k >= tamanho_min else math.inf
+
+        # Um grupo de tamanho k só é expandido se algum tamanho >= k ainda for alcançável
+        poda = {
+            k: min(exigido[j] for j in range(k, tamanho_max + 1))
+            for k in range(1, tamanho_max + 1)
+        }
+        return exigido, poda
+
+    def _resultado(self, itens: Tuple[int, ...], suporte: int, ultimo: int) -> Dict[str, Any]:
+        n = self.sorteios
+        independente = math.prod(self.frequencias[i] / n for i in itens)
+        esperado = n * probabilidade_conjunto(len(itens))
+        return {
+            "dezenas": tuple(i + 1 for i in itens),
+            "suporte": suporte,
+            "suporte_relativo": round(suporte / n, 4),
+            "lift": round(suporte / n / independente, 3) if independente else 0.0,
+            "esperado": round(esperado, 2),
+            "razao_esperado": round(suporte / esperado, 3) if esperado else 0.0,
+            "ultimo_concurso": int(self.concursos[ultimo]),
+        }
+
+
+def _definir_tidsets(tidsets: List[int]):
+    global _tidsets_trabalhador
+    _tidsets_trabalhador = tidsets
+
+
+def _minerar_raizes(raizes: List[int], tamanho_max: int,
+                    limiares: Tuple[Dict, Dict]) -> List[Tuple]:
+    return [r for raiz in raizes for r in _minerar_raiz(raiz, tamanho_max, limiares)]
+
+
+def _minerar_raiz(raiz: int, tamanho_max: int, limiares: Tuple[Dict, Dict]) -> List[Tuple]:
+    """Eclat em profundidade a partir da dezena 'raiz' (índice 0-24)."""
+    tidsets = _tidsets_trabalhador
+    exigido, poda = limiares
+    saida: List[Tuple] = []
+    pilha = [((raiz,), tidsets[raiz])]
+    while pilha:
+        itens, tidset = pilha.pop()
+        tamanho = len(itens)
+        suporte = tidset.bit_count()
+        if suporte < poda[tamanho]:
+            continue
+        if suporte >= exigido[tamanho]:
+            saida.append((itens, suporte, tidset.bit_length() - 1))
+        if tamanho < tamanho_max:
+            for proximo in range(itens[-1] + 1, 25):
+                pilha.append((itens + (proximo,), tidset & tidsets[proximo]))
+    return saida
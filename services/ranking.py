@@ -0,0 +1,120 @@
+# services/ranking.py
+from math import comb
+from pathlib import Path
+from typing import Optional, Sequence, Union
+
+import numpy as np
+
+from services.mascara import mascaras_para_matriz
+
+TOTAL_COMBINACOES = comb(25, 15)
+
+# BINOMIAIS[n, k] = C(n, k) para n em 0..25, k em 0..15
+BINOMIAIS = np.array(
+    [[comb(n, k) for k in range(16)] for n in range(26)], dtype=np.int64
+)
+
+
+class RankingCombinatorio:
+    """
+    Bijeção entre jogos de 15 dezenas e inteiros em [0, C(25,15)).
+    Usa a ordem colexicográfica: rank = soma de C(d_i - 1, i) para as
+    dezenas ordenadas d_1 < ... < d_15. Coincide com a posição do jogo
+    no IndiceCombinacoes. Todas as operações são vetorizadas.
+    """
+
+    # =============================
+    # RANK
+    # =============================
+    @staticmethod
+    def rank(jogos: Union[Sequence[int], np.ndarray]) -> np.ndarray:
+        """
+        Args:
+            jogos: um jogo (15 dezenas) ou matriz N x 15 de dezenas 1..25
+        Returns:
+            Array uint32 de ranks (escalar 0-d se receber um único jogo)
+        """
+        jogos = np.asarray(jogos, dtype=np.int64)
+        unico = jogos.ndim == 1
+        jogos = np.atleast_2d(jogos)
+        if jogos.shape[1] != 15:
+            raise ValueError(f"Esperado N x 15 dezenas, recebido {jogos.shape}")
+        if jogos.size and (jogos.min() < 1 or jogos.max() > 25):
+            raise ValueError("Dezenas devem estar entre 1 e 25")
+
+        jogos = np.sort(jogos, axis=1)
+        if (np.diff(jogos, axis=1) == 0).any():
+            raise ValueError("Jogos com dezenas repetidas")
+
+        ranks = BINOMIAIS[jogos - 1, np.arange(1, 16)].sum(axis=1).astype(np.uint32)
+        return ranks[0] if unico else ranks
+
+    @staticmethod
+    def rank_mascaras(mascaras: np.ndarray) -> np.ndarray:
+        """Ranks de um array de máscaras de 25 bits com 15 bits ligados."""
+        bits = mascaras_para_matriz(np.atleast_1d(mascaras)).astype(np.int64)
+        if (bits.sum(axis=1) != 15).any():
+            raise ValueError("Máscaras devem ter exatamente 15 dezenas")
+
+        # k-ésimo bit ligado na posição j contribui C(j, k)
+        ordem = np.cumsum(bits, axis=1)
+        contribuicao = BINOMIAIS[np.arange(25), np.minimum(ordem, 15)] * bits
+        return contribuicao.sum(axis=1).astype(np.uint32)
+
+    # =============================
+    # UNRANK
+    # =============================
+    @staticmethod
+    def unrank(ranks: Union[int, np.ndarray]) -> np.ndarray:
+        """
+        Args:
+            ranks: inteiro ou array de ranks em [0, C(25,15))
+        Returns:
+            Matriz N x 15 (uint8) de dezenas em ordem crescente
+            (vetor de 15 se receber um único rank)
+        """
+        ranks = np.asarray(ranks, dtype=np.int64)
+        unico = ranks.ndim == 0
+        restante = np.atleast_1d(ranks).copy()
+        if restante.size and (restante.min() < 0 or restante.max() >= TOTAL_COMBINACOES):
+            raise ValueError(f"Rank fora do intervalo [0, {TOTAL_COMBINACOES})")
+
+        jogos = np.empty((len(restante), 15), dtype=np.uint8)
+        for i in range(15, 0, -1):
+            # Maior c com C(c, i) <= restante (coluna monotônica em c)
+            c = np.searchsorted(BINOMIAIS[:, i], restante, side="right") - 1
+            jogos[:, i - 1] = c + 1
+            restante -= BINOMIAIS[c, i]
+
+        return jogos[0] if unico else jogos
+
+    @staticmethod
+    def unrank_mascaras(ranks: Union[int, np.ndarray]) -> np.ndarray:
+        """Ranks -> array de máscaras uint32."""
+        jogos = np.atleast_2d(RankingCombinatorio.unrank(ranks)).astype(np.uint32)
+        return np.bitwise_or.reduce(np.uint32(1) << (jogos - 1), axis=1)
+
+    # =============================
+    # UTILITÁRIOS
+    # =============================
+    @staticmethod
+    def amostrar(quantidade: int, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """Ranks uniformes sobre todo o espaço de jogos (com reposição)."""
+        rng = rng or np.random.default_rng()
+        return rng.integers(0, TOTAL_COMBINACOES, size=quantidade, dtype=np.uint32)
+
+    @staticmethod
+    def deduplicar(ranks: np.ndarray) -> np.ndarray:
+        """Ranks únicos, em ordem crescente."""
+        return np.unique(np.asarray(ranks, dtype=np.uint32))
+
+    @staticmethod
+    def salvar(caminho: Union[str, Path], ranks: np.ndarray) -> Path:
+        """Arquivo de jogos compacto: 4 bytes por jogo (.npy uint32)."""
+        caminho = Path(caminho)
+        np.save(caminho, np.asarray(ranks, dtype=np.uint32))
+        return caminho
+
+    @staticmethod
+    def carregar(caminho: Union[str, Path], mmap: bool = False) -> np.ndarray:
+        return np.load(caminho, mmap_mode="r" if mmap else None)
@@ -0,0 +1,36 @@
+# test_agendador.py
+# Roda com pytest ou direto: python test_agendador.py
+import numpy as np
+import pytest
+
+from services.agendador import AgendadorSorteios
+
+
+def test_analise_gravada_em_json_volta_igual(tmp_path):
+    agendador = AgendadorSorteios(api=object(), ai=object(), diretorio=tmp_path)
+    analise = {
+        "concurso": 3000,
+        "dezenas": list(range(1, 16)),
+        "kpis": {"soma": np.int64(120), "dist": "5B | 5M | 5A", "flags": {"soma_ideal": True}},
+        "frequencia": {"contagem": {n: n * 10 for n in range(1, 26)}, "janelas": {10: {1: 4}}},
+        "estatisticas": {"nao_sorteados": np.arange(16, 26)},
+        "ia": None,
+    }
+    agendador._gravar(3000, analise)
+
+    assert [p.name for p in tmp_path.iterdir()] == ["concurso_3000.json"]
+    lida = AgendadorSorteios.obter_analise(3000, diretorio=tmp_path)
+    assert lida["kpis"] == {"soma": 120, "dist": "5B | 5M | 5A", "flags": {"soma_ideal": True}}
+    assert lida["frequencia"]["contagem"][25] == 250
+    assert lida["frequencia"]["janelas"][10] == {1: 4}
+    assert lida["estatisticas"]["nao_sorteados"] == list(range(16, 26))
+    assert AgendadorSorteios.obter_analise(3001, diretorio=tmp_path) is None
+
+
+def test_analise_corrompida_e_ignorada(tmp_path):
+    (tmp_path / "concurso_7.json").write_text("{incompleto", encoding="utf-8")
+    assert AgendadorSorteios.obter_analise(7, diretorio=tmp_path) is None
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main(["-q", __file__]))
@@ -0,0 +1,146 @@
+# test_backfill.py
+# Roda com pytest ou direto: python test_backfill.py
+# Servidor HTTP local (127.0.0.1) no lugar da API: 200, 404, 429 e 5xx.
+import json
+import tempfile
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+
+import services.backfill as backfill
+from services.backfill import BackfillHistorico, TokenBucket
+from services.historico_binario import HistoricoBinario
+from services.loteria_api import LoteriaAPI
+
+ULTIMO = 10
+# concurso -> respostas em sequência (a última se repete)
+ROTEIRO = {
+    4: [404],              # não existe
+    5: [503],              # fora do ar: esgota as tentativas
+    6: [429, 429, 200],    # limitado duas vezes, depois responde
+    7: [500, 200],
+}
+
+
+def _concurso(numero: int) -> dict:
+    dezenas = [f"{n:02d}" for n in range(1 + numero % 10, 16 + numero % 10)]
+    return {"concurso": numero, "data": f"{numero:02d}/03/2024", "dezenas": dezenas}
+
+
+class _ApiFalsa(BaseHTTPRequestHandler):
+    pedidos: Counter = Counter()
+
+    def do_GET(self):
+        ultimo = self.path.rstrip("/").rsplit("/", 1)[-1]
+        _ApiFalsa.pedidos[ultimo] += 1
+        if ultimo == "lotofacil":                       # endpoint em lote desligado
+            return self._responder(404, {})
+        numero = ULTIMO if ultimo == "latest" else int(ultimo)
+        roteiro = ROTEIRO.get(numero, [200])
+        status = roteiro[min(_ApiFalsa.pedidos[ultimo], len(roteiro)) - 1]
+        self._responder(status, _concurso(numero) if status == 200 else {"erro": status})
+
+    def _responder(self, status: int, corpo: dict):
+        conteudo = json.dumps(corpo).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(conteudo)))
+        self.end_headers()
+        self.wfile.write(conteudo)
+
+    def log_message(self, *args):
+        pass
+
+
+def _servidor():
+    _ApiFalsa.pedidos = Counter()
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), _ApiFalsa)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, f"http://127.0.0.1:{servidor.server_address[1]}/api/lotofacil"
+
+
+def test_backfill_retoma_e_classifica_404_e_falhas():
+    servidor, url = _servidor()
+    try:
+        with tempfile.TemporaryDirectory() as pasta:
+            pasta = Path(pasta)
+            api = LoteriaAPI(armazenamento=HistoricoBinario(pasta / "historico.bin"))
+            for c in (1, 2, 3):                         # histórico parcial
+                api.salvar_historico(_concurso(c)["dezenas"], c, _concurso(c)["data"])
+
+            executor = BackfillHistorico(
+                api, base_url=url, trabalhadores=4, taxa=200, tentativas=3,
+                backoff_base=0.01, checkpoint_path=pasta / "checkpoint.json",
+                sessao=requests.Session(),
+            )
+            relatorio = executor.executar()
+            assert relatorio["modo"] == "concorrente"
+            assert relatorio["inexistentes"] == [4]
+            assert relatorio["falhas"] == [5]
+            assert relatorio["salvos"] == 5                 # 6..10
+            assert not {"1", "2", "3"} & set(_ApiFalsa.pedidos)
+            assert _ApiFalsa.pedidos["4"] == 1              # 404 não é repetido
+            assert _ApiFalsa.pedidos["5"] == 3              # 5xx: todas as tentativas
+            assert _ApiFalsa.pedidos["6"] == 3
+            assert api.concursos_salvos() == {1, 2, 3, 6, 7, 8, 9, 10}
+            assert api.carregar_historico().iloc[-1]["data"] == "2024-03-10 00:00:00"
+
+            # Retomada: só o que falhou volta a ser pedido; o 404 fica no checkpoint
+            _ApiFalsa.pedidos.clear()
+            relatorio = executor.executar()
+            assert set(_ApiFalsa.pedidos) == {"latest", "lotofacil", "5"}
+            assert relatorio["falhas"] == [5] and relatorio["salvos"] == 0
+    finally:
+        servidor.shutdown()
+
+
+def test_retry_com_jitter_exponencial(monkeypatch):
+    sorteios = []
+    uniforme = backfill.random.uniform
+
+    def registrar(a, b):
+        valor = uniforme(a, b)
+        sorteios.append((a, b, valor))
+        return valor
+
+    monkeypatch.setattr(backfill.random, "uniform", registrar)
+    servidor, url = _servidor()
+    try:
+        with tempfile.TemporaryDirectory() as pasta:
+            executor = BackfillHistorico(
+                LoteriaAPI(armazenamento=HistoricoBinario(Path(pasta) / "historico.bin")),
+                base_url=url, taxa=200, tentativas=4, backoff_base=0.01,
+                checkpoint_path=Path(pasta) / "checkpoint.json", sessao=requests.Session(),
+            )
+            assert executor.situacao_concurso(5) == ("falha", None)
+            assert executor.situacao_concurso(4) == ("inexistente", None)
+    finally:
+        servidor.shutdown()
+
+    # Uma espera por tentativa sem sucesso, com teto dobrando e valor sorteado em [0, teto]
+    assert [b for _, b, _ in sorteios] == [0.01, 0.02, 0.04, 0.08]
+    assert all(a == 0 and 0 <= v <= b for a, b, v in sorteios)
+
+
+def test_normaliza_datas_da_api_e_iso():
+    assert BackfillHistorico._normalizar_data("05/03/2024") == "2024-03-05 00:00:00"
+    assert BackfillHistorico._normalizar_data("2024-03-05 20:00:00") == "2024-03-05 20:00:00"
+    assert BackfillHistorico._normalizar_data("") is None
+
+
+def test_token_bucket_limita_a_taxa():
+    limitador = TokenBucket(taxa=50, capacidade=5)
+    inicio = time.monotonic()
+    for _ in range(30):                                 # 5 na rajada + 25 a 50/s
+        limitador.adquirir()
+    assert time.monotonic() - inicio >= 25 / 50 * 0.9
+
+
+if __name__ == "__main__":
+    import pytest
+
+    raise SystemExit(pytest.main(["-q", __file__]))
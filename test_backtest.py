@@ -0,0 +1,50 @@
+# test_backtest.py
+# Roda com pytest ou direto: python test_backtest.py
+import numpy as np
+
+from services.backtest import Backtest
+from services.ranking import RankingCombinatorio
+
+
+def _historico_uniforme(concursos: int = 200, semente: int = 1000) -> np.ndarray:
+    rng = np.random.default_rng(semente)
+    return RankingCombinatorio.unrank_mascaras(RankingCombinatorio.amostrar(concursos, rng))
+
+
+def test_uniforme_sobre_historico_uniforme_e_compativel():
+    """Sem sinal nenhum, nenhuma faixa pode sair acima/abaixo do aleatório."""
+    resultado = Backtest(_historico_uniforme()).executar(
+        "uniforme", bilhetes=150, semente=7, processos=1
+    )
+    for acertos, faixa in resultado["faixas"].items():
+        assert faixa["veredito"] == "compatível com o aleatório", (acertos, faixa)
+        baixo, alto = faixa["ic95"]
+        assert baixo <= faixa["esperado_aleatorio"] <= alto
+    assert resultado["premiados"]["veredito"] == "compatível com o aleatório"
+
+
+def test_efeito_desenho_alarga_o_intervalo():
+    """
+    Os bilhetes do 5-5-5 partem do mesmo último resultado (correlacionados):
+    o efeito de desenho passa de 1. Os do uniforme são independentes (~1).
+    """
+    historico = _historico_uniforme()
+    correlacionado = Backtest(historico).executar("555", bilhetes=150, semente=7, processos=1)
+    independente = Backtest(historico).executar("uniforme", bilhetes=150, semente=7, processos=1)
+    assert correlacionado["premiados"]["efeito_desenho"] > 2
+    assert all(f["efeito_desenho"] >= 1 for f in correlacionado["faixas"].values())
+    assert independente["premiados"]["efeito_desenho"] < 2
+
+
+def test_semente_reprodutivel():
+    backtest = Backtest(_historico_uniforme(60))
+    a = backtest.executar("555", bilhetes=50, semente=3, processos=1)
+    b = backtest.executar("555", bilhetes=50, semente=3, processos=1)
+    assert a["histograma"] == b["histograma"]
+
+
+if __name__ == "__main__":
+    for nome, teste in list(globals().items()):
+        if nome.startswith("test_"):
+            teste()
+            print(f"✅ {nome}")
@@ -0,0 +1,80 @@
+# test_cache_http.py
+# Roda com pytest ou direto: python test_cache_http.py
+import json
+import tempfile
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+
+from services.cache_http import CacheRespostas
+
+
+class _Servidor(BaseHTTPRequestHandler):
+    pedidos: Counter = Counter()
+    condicionais: Counter = Counter()
+
+    def do_GET(self):
+        _Servidor.pedidos[self.path] += 1
+        if self.headers.get("If-None-Match") == '"v1"':
+            _Servidor.condicionais[self.path] += 1
+            self.send_response(304)
+            self.end_headers()
+            return
+        conteudo = json.dumps({"caminho": self.path}).encode()
+        self.send_response(200)
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", str(len(conteudo)))
+        self.end_headers()
+        self.wfile.write(conteudo)
+
+    def log_message(self, *args):
+        pass
+
+
+def _iniciar():
+    _Servidor.pedidos, _Servidor.condicionais = Counter(), Counter()
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), _Servidor)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, f"http://127.0.0.1:{servidor.server_address[1]}"
+
+
+def test_memoria_limitada_e_disco_continua_respondendo():
+    servidor, url = _iniciar()
+    try:
+        with tempfile.TemporaryDirectory() as pasta:
+            cache = CacheRespostas(Path(pasta), sessao=requests.Session(), maximo_memoria=4)
+            for i in range(10):
+                assert cache.obter_json(f"{url}/{i}", imutavel=True) == {"caminho": f"/{i}"}
+            assert len(cache._memoria) == 4
+
+            # Saiu da memória, mas continua no disco: nenhuma requisição nova
+            for i in range(10):
+                assert cache.obter_json(f"{url}/{i}", imutavel=True) == {"caminho": f"/{i}"}
+            assert sum(_Servidor.pedidos.values()) == 10
+            assert len(cache._memoria) == 4
+            assert cache.estatisticas()["hits"] == 10
+    finally:
+        servidor.shutdown()
+
+
+def test_mutavel_vencido_revalida_com_etag():
+    servidor, url = _iniciar()
+    try:
+        with tempfile.TemporaryDirectory() as pasta:
+            cache = CacheRespostas(Path(pasta), ttl=0, sessao=requests.Session())
+            assert cache.obter_json(f"{url}/latest", imutavel=False) == {"caminho": "/latest"}
+            assert cache.obter_json(f"{url}/latest", imutavel=False) == {"caminho": "/latest"}
+            assert _Servidor.condicionais["/latest"] == 1
+            assert cache.estatisticas()["revalidacoes"] == 1
+    finally:
+        servidor.shutdown()
+
+
+if __name__ == "__main__":
+    for nome, teste in list(globals().items()):
+        if nome.startswith("test_"):
+            teste()
+            print(f"✅ {nome}")
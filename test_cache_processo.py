@@ -0,0 +1,75 @@
+# test_cache_processo.py
+# Roda com pytest ou direto: python test_cache_processo.py
+import os
+
+import pandas as pd
+import pytest
+
+from services.cache_processo import CacheProcesso
+
+
+@pytest.fixture(autouse=True)
+def cache_limpo(monkeypatch):
+    monkeypatch.setattr(CacheProcesso, "_contadores", {"hits": 0, "misses": 0, "evictions": 0})
+    CacheProcesso.limpar()
+    yield
+    CacheProcesso.limpar()
+
+
+def _contador(chamadas: list, valor):
+    def calcular():
+        chamadas.append(valor)
+        return valor
+    return calcular
+
+
+def test_analises_lru_descarta_a_menos_usada(monkeypatch):
+    monkeypatch.setattr(CacheProcesso, "maximo_analises", 3)
+    chamadas = []
+    for concurso in (1, 2, 3):
+        CacheProcesso.analise(concurso, "kpis", _contador(chamadas, concurso))
+    CacheProcesso.analise(1, "kpis", _contador(chamadas, 1))       # 1 vira a mais recente
+    CacheProcesso.analise(4, "kpis", _contador(chamadas, 4))       # descarta 2
+
+    assert chamadas == [1, 2, 3, 4]
+    assert [c for c, _, _ in CacheProcesso._analises] == ["3", "1", "4"]
+    CacheProcesso.analise(1, "kpis", _contador(chamadas, 1))
+    CacheProcesso.analise(2, "kpis", _contador(chamadas, 2))
+    assert chamadas == [1, 2, 3, 4, 2]
+    relatorio = CacheProcesso.relatorio_memoria()
+    assert relatorio["analises"] == 3 and relatorio["evictions"] == 2
+    assert relatorio["hits"] == 2 and relatorio["misses"] == 5
+
+
+def test_analise_recalcula_quando_a_versao_muda():
+    chamadas = []
+    assert CacheProcesso.analise(7, "estatisticas", _contador(chamadas, "a"), versao=(1,)) == "a"
+    assert CacheProcesso.analise(7, "estatisticas", _contador(chamadas, "b"), versao=(1,)) == "a"
+    assert CacheProcesso.analise(7, "estatisticas", _contador(chamadas, "c"), versao=(2,)) == "c"
+    # O detalhe (ex.: as dezenas) faz parte da chave
+    assert CacheProcesso.analise(7, "estatisticas", _contador(chamadas, "d"), versao=(2,), detalhe=(1, 2)) == "d"
+    assert chamadas == ["a", "c", "d"]
+
+
+def test_historico_invalida_pela_versao_do_arquivo(tmp_path):
+    arquivo = tmp_path / "historico.csv"
+    arquivo.write_text("concurso\n1\n", encoding="utf-8")
+
+    def carregar():
+        return pd.read_csv(arquivo, dtype=str)
+
+    primeiro = CacheProcesso.historico(str(arquivo), CacheProcesso.versao_arquivo(arquivo), carregar)
+    primeiro["extra"] = 1     # cópia rasa: não afeta o cache
+    segundo = CacheProcesso.historico(str(arquivo), CacheProcesso.versao_arquivo(arquivo), carregar)
+    assert list(segundo.columns) == ["concurso"] and segundo["concurso"].tolist() == ["1"]
+
+    arquivo.write_text("concurso\n1\n2\n", encoding="utf-8")
+    info = arquivo.stat()
+    os.utime(arquivo, ns=(info.st_atime_ns, info.st_mtime_ns + 1))
+    terceiro = CacheProcesso.historico(str(arquivo), CacheProcesso.versao_arquivo(arquivo), carregar)
+    assert terceiro["concurso"].tolist() == ["1", "2"]
+    assert CacheProcesso.versao_arquivo(tmp_path / "ausente.csv") == (None,)
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main(["-q", __file__]))
@@ -0,0 +1,63 @@
+# test_cobertura.py
+# Roda com pytest ou direto: python test_cobertura.py
+from math import comb
+
+import numpy as np
+import pytest
+
+from services import cobertura
+from services.cobertura import AvaliadorCobertura, melhores_acertos
+from services.mascara import dezenas_para_mascaras
+from services.ranking import TOTAL_COMBINACOES, RankingCombinatorio
+
+
+def _jogos_aleatorios(quantidade: int, semente: int = 0) -> list:
+    rng = np.random.default_rng(semente)
+    return RankingCombinatorio.unrank(RankingCombinatorio.amostrar(quantidade, rng)).tolist()
+
+
+def _melhor_forca_bruta(sorteio, bilhetes) -> int:
+    return max(len(set(sorteio) & set(b)) for b in bilhetes)
+
+
+def test_melhores_acertos_igual_a_forca_bruta():
+    sorteios = _jogos_aleatorios(2000, semente=30)
+    bilhetes = _jogos_aleatorios(25, semente=31) + [list(range(1, 19))]   # um de 18 dezenas
+    melhor = melhores_acertos(dezenas_para_mascaras(sorteios), dezenas_para_mascaras(bilhetes))
+    assert melhor.tolist() == [_melhor_forca_bruta(s, bilhetes) for s in sorteios]
+
+
+def test_avaliar_faixa_igual_a_forca_bruta(monkeypatch):
+    # Blocos e tarefas pequenos: a faixa cruza vários dos dois
+    monkeypatch.setattr(cobertura, "BLOCO_SORTEIOS", 97)
+    monkeypatch.setattr(cobertura, "SORTEIOS_POR_TAREFA", 500)
+    bilhetes = _jogos_aleatorios(12, semente=32)
+    inicio, fim = 1_000_000, 1_003_000
+    sorteios = RankingCombinatorio.unrank(np.arange(inicio, fim)).tolist()
+    melhores = [_melhor_forca_bruta(s, bilhetes) for s in sorteios]
+
+    for processos in (1, 2):
+        relatorio = AvaliadorCobertura(bilhetes + bilhetes[:3]).avaliar(processos=processos, inicio=inicio, fim=fim)
+        assert relatorio["bilhetes"] == 15 and relatorio["bilhetes_distintos"] == 12
+        assert relatorio["histograma"] == {h: melhores.count(h) for h in set(melhores)}
+        assert relatorio["minimo_garantido"] == min(melhores)
+        assert relatorio["pior_sorteio"] == sorteios[melhores.index(min(melhores))]
+        for faixa, garantia in relatorio["garantia"].items():
+            assert garantia["sorteios"] == sum(m >= faixa for m in melhores)
+
+
+def test_um_bilhete_sobre_todos_os_sorteios_segue_a_hipergeometrica():
+    relatorio = AvaliadorCobertura([list(range(1, 16))]).avaliar(processos=1)
+    assert relatorio["sorteios"] == TOTAL_COMBINACOES
+    assert relatorio["histograma"] == {k: comb(15, k) * comb(10, 15 - k) for k in range(5, 16)}
+    assert relatorio["minimo_garantido"] == 5
+    assert relatorio["garantia"][15]["sorteios"] == 1
+
+
+def test_sem_bilhetes_e_erro():
+    with pytest.raises(ValueError):
+        AvaliadorCobertura([]).avaliar()
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main(["-q", __file__]))
@@ -0,0 +1,91 @@
+# test_conferencia.py
+# Roda com pytest ou direto: python test_conferencia.py
+import re
+
+import numpy as np
+import pytest
+
+from services import conferencia
+from services.conferencia import ConferenciaLote, mascaras_do_texto
+from services.mascara import dezenas_para_mascaras
+from services.ranking import RankingCombinatorio
+
+_SEPARADORES = re.compile(r"[\s,;\-\"']+")
+
+
+def _referencia(dados: bytes) -> list:
+    """Linha a linha, como Formatters.parse_dezenas_manual (mais aspas)."""
+    texto = dados.decode("utf-8")
+    linhas = texto.split("\n") if texto else []
+    if texto.endswith("\n"):
+        linhas.pop()
+    mascaras = []
+    for linha in linhas:
+        numeros = {int(t) for t in _SEPARADORES.split(linha) if t.isdigit() and 1 <= int(t) <= 25}
+        mascaras.append(sum(1 << (n - 1) for n in numeros))
+    return mascaras
+
+
+def _texto_largura_fixa(rng, linhas: int, larguras, separadores: str) -> bytes:
+    """Mesmo leiaute em toda linha; separadores sorteados por coluna e linha."""
+    saida = []
+    for _ in range(linhas):
+        partes = []
+        for largura in larguras:
+            partes.append(str(int(rng.integers(0, 10 ** largura))).zfill(largura))
+            partes.append(separadores[int(rng.integers(len(separadores)))])
+        saida.append("".join(partes[:-1]))
+    return ("\n".join(saida) + "\n").encode()
+
+
+def _conferir(dados: bytes, largura_fixa: bool):
+    b = np.frombuffer(dados, dtype=np.uint8)
+    assert (conferencia._mascaras_largura_fixa(b) is not None) == largura_fixa
+    obtido = mascaras_do_texto(dados)
+    assert obtido.tolist() == _referencia(dados)
+    assert (obtido == conferencia._mascaras_por_token(dados, b)).all()
+
+
+def test_largura_fixa_igual_ao_caminho_geral(monkeypatch):
+    monkeypatch.setattr(conferencia, "_LINHAS_POR_VEZ", 7)   # várias fatias
+    rng = np.random.default_rng(22)
+    jogos = RankingCombinatorio.unrank(RankingCombinatorio.amostrar(50, rng)).tolist()
+    comum = "".join(" ".join(f"{d:02d}" for d in j) + "\n" for j in jogos).encode()
+    _conferir(comum, True)
+    assert mascaras_do_texto(comum).tolist() == dezenas_para_mascaras(jogos).tolist()
+
+    _conferir(comum.replace(b"\n", b"\r\n"), True)
+    _conferir(_texto_largura_fixa(rng, 60, [2] * 15, " "), True)             # 00, 26-99
+    _conferir(_texto_largura_fixa(rng, 60, [1, 2, 2, 1, 2] * 3, ",;- "), True)
+    _conferir(_texto_largura_fixa(rng, 60, [2] * 20, "\t,"), True)
+
+
+def test_textos_fora_do_leiaute_usam_o_caminho_geral():
+    base = b"01 02 03 04 05 06 07 08 09 10 11 12 13 14 15\n"
+    casos = [
+        b"",
+        base + b"01 02 03 04 05 06 07 08 09 10 11 12 13 14 1x\n",      # letra
+        base + b"1 2 3 4 5 6 7 8 9 10 11 12 13 14 15\n",                # largura diferente
+        base + base.rstrip(b"\n"),                                       # sem quebra final
+        b"001 002 003\n004 005 006\n",                                   # 3 casas
+        b"\n\n",
+    ]
+    for dados in casos:
+        _conferir(dados, False)
+
+
+def test_conferir_arquivo_igual_a_forca_bruta(tmp_path):
+    rng = np.random.default_rng(23)
+    jogos = RankingCombinatorio.unrank(RankingCombinatorio.amostrar(3000, rng)).tolist()
+    sorteio = jogos[7]
+    arquivo = tmp_path / "bolao.txt"
+    arquivo.write_text("".join(" ".join(f"{d:02d}" for d in j) + "\n" for j in jogos), encoding="utf-8")
+
+    resultado = ConferenciaLote([sorteio]).conferir_arquivo(arquivo, tamanho_bloco=4096)
+    acertos = [len(set(j) & set(sorteio)) for j in jogos]
+    assert resultado["bilhetes"] == resultado["linhas"] == 3000
+    assert resultado["faixas"] == {f: acertos.count(f) for f in (11, 12, 13, 14, 15)}
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main(["-q", __file__]))
@@ -0,0 +1,72 @@
+# test_coocorrencia.py
+# Roda com pytest ou direto: python test_coocorrencia.py
+from itertools import combinations
+
+import numpy as np
+
+from services.coocorrencia import PROB_PAR, PROB_TRIO, Coocorrencia
+from services.mascara import dezenas_para_mascaras
+from services.ranking import RankingCombinatorio
+
+
+def _jogos_aleatorios(quantidade: int, semente: int = 0) -> list:
+    rng = np.random.default_rng(semente)
+    return RankingCombinatorio.unrank(RankingCombinatorio.amostrar(quantidade, rng)).tolist()
+
+
+def _contagens(jogos: list, tamanho: int, numeros=range(1, 26)) -> dict:
+    conjuntos = [set(j) for j in jogos]
+    return {
+        combo: sum(set(combo) <= s for s in conjuntos)
+        for combo in combinations(numeros, tamanho)
+    }
+
+
+def _top(contagens: dict, k: int, ordem: str) -> list:
+    sinal = -1 if ordem == "mais" else 1
+    return sorted(contagens, key=lambda combo: (sinal * contagens[combo], combo))[:k]
+
+
+def test_pares_e_trios_iguais_a_forca_bruta():
+    jogos = _jogos_aleatorios(203, semente=12)
+    mascaras = dezenas_para_mascaras(jogos)
+    # Em dois blocos (o segundo fora do limite de byte) = de uma vez
+    cooc = Coocorrencia(mascaras[:37])
+    cooc.adicionar(mascaras[37:])
+    assert (cooc.matriz == Coocorrencia(mascaras).matriz).all()
+    assert cooc.concursos.tolist() == list(range(1, 204))
+
+    pares = _contagens(jogos, 2)
+    trios = _contagens(jogos, 3)
+    assert all(cooc.par(a, b) == c for (a, b), c in pares.items())
+    assert all(cooc.trio(a, b, c) == n for (a, b, c), n in trios.items())
+    assert cooc.par(7, 7) == sum(7 in j for j in jogos)
+    assert cooc.conjunto([1, 2, 3, 4]) == sum({1, 2, 3, 4} <= set(j) for j in jogos)
+
+    for ordem in ("mais", "menos"):
+        assert [r["dezenas"] for r in cooc.pares(10, ordem)] == _top(pares, 10, ordem)
+        assert [r["dezenas"] for r in cooc.trios(10, ordem)] == _top(trios, 10, ordem)
+
+    topo = cooc.pares(1)[0]
+    assert topo["observado"] == max(pares.values())
+    assert topo["esperado"] == round(len(jogos) * PROB_PAR, 2)
+    assert cooc.trios(1)[0]["esperado"] == round(len(jogos) * PROB_TRIO, 2)
+
+
+def test_restricao_as_dezenas_do_jogo():
+    jogos = _jogos_aleatorios(120, semente=13)
+    cooc = Coocorrencia(dezenas_para_mascaras(jogos))
+    jogo = jogos[0]
+    pares = _contagens(jogos, 2, jogo)
+    trios = _contagens(jogos, 3, jogo)
+    assert [r["dezenas"] for r in cooc.pares(5, "menos", jogo)] == _top(pares, 5, "menos")
+    assert [r["dezenas"] for r in cooc.trios(5, "mais", jogo)] == _top(trios, 5, "mais")
+    resumo = cooc.resumo_pares(jogo, k=3)
+    assert all(set(r["dezenas"]) <= set(jogo) for r in resumo["mais_frequentes"] + resumo["menos_frequentes"])
+
+
+if __name__ == "__main__":
+    for nome, teste in list(globals().items()):
+        if nome.startswith("test_"):
+            teste()
+            print(f"✅ {nome}")
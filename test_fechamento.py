@@ -0,0 +1,50 @@
+# test_fechamento.py
+# Roda com pytest ou direto: python test_fechamento.py
+from itertools import combinations
+
+import pytest
+
+from services.fechamento import MAXIMO_BYTES_COBERTURA, Fechamento, bytes_cobertura, condicoes_viaveis
+from services.mascara import dezenas_para_mascaras
+
+
+def _garantia_forca_bruta(dezenas, jogos, condicao: int) -> int:
+    """Pior caso, entre todos os sorteios com 'condicao' das dezenas, do melhor bilhete."""
+    bilhetes = [set(j) for j in jogos]
+    return min(max(len(b & set(alvo)) for b in bilhetes) for alvo in combinations(dezenas, condicao))
+
+
+def test_fechamento_cumpre_garantia():
+    casos = [
+        (list(range(1, 17)), 13, 15, ()),
+        (list(range(3, 20)), 12, 14, ()),
+        (list(range(1, 18)), 13, 15, (1, 2, 3)),
+    ]
+    for dezenas, garantia, condicao, fixas in casos:
+        fechamento = Fechamento(dezenas, garantia=garantia, condicao=condicao, fixas=fixas)
+        resultado = fechamento.gerar(tempo_limite=2.0, semente=0)
+        assert resultado["garantia"]["cumprida"], (dezenas, garantia, condicao)
+        assert _garantia_forca_bruta(dezenas, resultado["jogos"], condicao) >= garantia
+        assert all(len(j) == 15 and set(fixas) <= set(j) <= set(dezenas) for j in resultado["jogos"])
+        assert resultado["quantidade"] <= resultado["quantidade_guloso"]
+
+
+def test_fechamento_verificar_detecta_garantia_falha():
+    dezenas = list(range(1, 17))
+    fechamento = Fechamento(dezenas, garantia=15, condicao=15)
+    um_bilhete = dezenas_para_mascaras([dezenas[:15]])
+    verificacao = fechamento.verificar(um_bilhete)
+    assert not verificacao["cumprida"]
+    assert verificacao["minimo"] == 14 == _garantia_forca_bruta(dezenas, [dezenas[:15]], 15)
+
+
+def test_matriz_grande_demais_e_recusada_antes_de_montar():
+    # 20 dezenas, condição 11: C(20,15) x C(20,11)/64 palavras (~310 MB)
+    assert bytes_cobertura(20, 11) > MAXIMO_BYTES_COBERTURA
+    with pytest.raises(ValueError, match="grande demais"):
+        Fechamento(list(range(1, 21)), garantia=11, condicao=11)
+    assert condicoes_viaveis(20, range(11, 16)) == [14, 15]
+    assert all(bytes_cobertura(20, c) <= MAXIMO_BYTES_COBERTURA for c in (14, 15))
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main(["-q", __file__]))
@@ -0,0 +1,44 @@
+# test_filtros.py
+# Roda com pytest ou direto: python test_filtros.py
+import numpy as np
+
+from services.filtros import Filtro
+from services.kpi_calculator import KPICalculator
+from services.mascara import dezenas_para_mascaras
+from services.ranking import RankingCombinatorio
+
+
+def _amostra(quantidade: int = 3000) -> np.ndarray:
+    return RankingCombinatorio.unrank_mascaras(
+        RankingCombinatorio.amostrar(quantidade, np.random.default_rng(11))
+    )
+
+
+def test_texto_compilado_igual_ao_calculo_por_jogo():
+    mascaras = _amostra()
+    ultimo = list(range(1, 16))
+    filtro = Filtro.compilar("soma 185-205; pares >=7; incluir 5; repetidas <=9", referencia=ultimo)
+    selecao = filtro.avaliar(mascaras)
+
+    kpis = KPICalculator.calcular_lote(mascaras, ultimo)
+    esperado = (
+        (kpis["soma"] >= 185) & (kpis["soma"] <= 205) & (kpis["pares"] >= 7)
+        & (mascaras & np.uint32(1 << 4) != 0) & (kpis["repetidas"] <= 9)
+    )
+    assert (selecao == esperado).all()
+    assert filtro.contar(mascaras) == int(esperado.sum())
+
+
+def test_descricao_omite_limite_ausente():
+    filtro = Filtro().soma(maximo=200).pares(minimo=7).primos().grupo([1, 2, 3], 2, 2)
+    assert str(filtro) == "soma <=200; pares >=7; primos qualquer; grupo 1,2,3 2"
+    assert "None" not in str(Filtro().repetidas(referencia=[1, 2, 3]))
+    relatorio = filtro.seletividade(dezenas_para_mascaras([list(range(1, 16))]))
+    assert [linha["predicado"] for linha in relatorio] == str(filtro).split("; ")
+
+
+if __name__ == "__main__":
+    for nome, teste in list(globals().items()):
+        if nome.startswith("test_"):
+            teste()
+            print(f"✅ {nome}")
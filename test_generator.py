@@ -0,0 +1,65 @@
+# test_generator.py
+# Roda com pytest ou direto: python test_generator.py
+import numpy as np
+
+from services.generator import JogoGenerator
+from services.kpi_calculator import KPICalculator
+from services.mascara import dezenas_para_mascaras
+from services.ranking import RankingCombinatorio
+
+
+def _jogos_aleatorios(quantidade: int, semente: int = 0) -> list:
+    rng = np.random.default_rng(semente)
+    return RankingCombinatorio.unrank(RankingCombinatorio.amostrar(quantidade, rng)).tolist()
+
+
+def _similares_forca_bruta(jogo, historico, concursos, k, pesos) -> list:
+    """Pontua todo concurso com calcular() e ordena (empate: mais recente primeiro)."""
+    kpis_jogo = KPICalculator.calcular(jogo)
+    pontuados = []
+    for posicao, (concurso, sorteio) in enumerate(zip(concursos, historico)):
+        kpis = KPICalculator.calcular(sorteio)
+        acertos = len(set(jogo) & set(sorteio))
+        pontos = pesos.get("intersecao", 1.0) * acertos
+        pontos -= pesos.get("soma", 0) * abs(kpis_jogo["soma"] - kpis["soma"]) / 10
+        pontos -= pesos.get("pares", 0) * abs(kpis_jogo["pares"] - kpis["pares"])
+        pontos -= pesos.get("distribuicao", 0) * sum(
+            abs(len(kpis_jogo["grupos"][g]) - len(kpis["grupos"][g])) for g in kpis["grupos"]
+        ) / 2
+        pontuados.append((round(pontos, 9), posicao, concurso, acertos))
+    pontuados.sort(key=lambda p: (-p[0], -p[1]))
+    return [(concurso, acertos, round(pontos, 3)) for pontos, _, concurso, acertos in pontuados[:k]]
+
+
+def test_buscar_similares_igual_a_forca_bruta():
+    historico = _jogos_aleatorios(300, semente=16)
+    concursos = list(range(2001, 2301))
+    consultas = _jogos_aleatorios(15, semente=17) + [historico[123]]
+    base = (np.array(concursos), dezenas_para_mascaras(historico))
+
+    for pesos in (None, {"soma": 1.0, "pares": 0.5, "distribuicao": 2.0}):
+        lote = JogoGenerator.buscar_similares(consultas, k=7, pesos=pesos, historico=base)
+        assert len(lote) == len(consultas)
+        for jogo, similares in zip(consultas, lote):
+            obtido = [(s["concurso"], s["acertos"], s["similaridade"]) for s in similares]
+            assert obtido == _similares_forca_bruta(jogo, historico, concursos, 7, pesos or {})
+            assert all(s["dezenas"] == historico[s["concurso"] - 2001] for s in similares)
+
+    # Jogo avulso: lista simples; o próprio sorteio vem primeiro
+    avulso = JogoGenerator.buscar_similares(historico[123], k=3, historico=base)
+    assert avulso[0]["concurso"] == 2124 and avulso[0]["acertos"] == 15
+
+
+def test_buscar_similares_k_maior_que_o_historico():
+    historico = _jogos_aleatorios(4, semente=18)
+    base = (np.arange(1, 5), dezenas_para_mascaras(historico))
+    similares = JogoGenerator.buscar_similares(historico[0], k=10, historico=base)
+    assert sorted(s["concurso"] for s in similares) == [1, 2, 3, 4]
+    assert JogoGenerator.buscar_similares([], historico=base) == []
+
+
+if __name__ == "__main__":
+    for nome, teste in list(globals().items()):
+        if nome.startswith("test_"):
+            teste()
+            print(f"✅ {nome}")
@@ -0,0 +1,49 @@
+# test_geracao_massa.py
+# Roda com pytest ou direto: python test_geracao_massa.py
+import numpy as np
+
+from config import settings
+from services.geracao_massa import BLOCO_BILHETES, RESTRICOES_ALEATORIO, GeradorMassa
+from services.mascara import mascaras_para_matriz, popcount
+
+
+def test_gerador_massa_reprodutivel_entre_processos():
+    quantidade = BLOCO_BILHETES * 2 + 123  # mais de um bloco
+    for estrategia in ("555", "aleatorio", "uniforme"):
+        gerador = GeradorMassa(estrategia, ultimo_resultado=list(range(1, 16)))
+        um = gerador.gerar(quantidade, semente=42, processos=1)["mascaras"]
+        dois = gerador.gerar(quantidade, semente=42, processos=2)["mascaras"]
+        outra = gerador.gerar(quantidade, semente=43, processos=1)["mascaras"]
+        assert (um == dois).all(), estrategia
+        assert not (um == outra).all(), estrategia
+        assert (popcount(um) == 15).all(), estrategia
+
+
+def test_555_e_restricoes_valem_para_todos_os_bilhetes():
+    numeros = np.arange(1, 26)
+
+    matriz = mascaras_para_matriz(
+        GeradorMassa("555", ultimo_resultado=list(range(3, 18))).gerar(5000, semente=1, processos=1)["mascaras"]
+    )
+    for a, b in settings.RANGES.values():
+        assert (matriz[:, a - 1:b].sum(axis=1) == 5).all()
+
+    matriz = mascaras_para_matriz(GeradorMassa("aleatorio").gerar(5000, semente=2, processos=1)["mascaras"])
+    soma, pares = matriz @ numeros, matriz[:, 1::2].sum(axis=1)
+    (smin, smax), (pmin, pmax) = RESTRICOES_ALEATORIO["soma"], RESTRICOES_ALEATORIO["pares"]
+    assert ((soma >= smin) & (soma <= smax) & (pares >= pmin) & (pares <= pmax)).all()
+
+    restricoes = {"fixas": [5, 15], "excluidas": [25], "soma": (180, 210)}
+    matriz = mascaras_para_matriz(
+        GeradorMassa("uniforme", restricoes=restricoes).gerar(5000, semente=3, processos=1)["mascaras"]
+    )
+    soma = matriz @ numeros
+    assert matriz[:, [4, 14]].all() and not matriz[:, 24].any()
+    assert ((soma >= 180) & (soma <= 210)).all()
+
+
+if __name__ == "__main__":
+    for nome, teste in list(globals().items()):
+        if nome.startswith("test_"):
+            teste()
+            print(f"✅ {nome}")
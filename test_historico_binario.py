@@ -0,0 +1,52 @@
+# test_historico_binario.py
+# Roda com pytest ou direto: python test_historico_binario.py
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+from services.historico_binario import DTYPE_REGISTRO, HistoricoBinario
+
+
+def test_migrar_csv_le_datas_da_api_com_dia_primeiro():
+    with tempfile.TemporaryDirectory() as pasta:
+        pasta = Path(pasta)
+        pd.DataFrame({
+            "concurso": ["2", "1", "3", "x"],
+            "data": ["05/03/2024", "2024-03-01 20:00:00", "", "01/01/2024"],
+            "dezenas": [",".join(map(str, range(2, 17))), ",".join(map(str, range(1, 16))),
+                        ",".join(map(str, range(11, 26))), ",".join(map(str, range(1, 16)))],
+        }).to_csv(pasta / "historico.csv", index=False)
+
+        resultado = HistoricoBinario.migrar_csv(pasta / "historico.csv", pasta / "historico.bin")
+        assert resultado == {"migrados": 3, "ignorados": ["x"]}
+
+        historico = HistoricoBinario(pasta / "historico.bin")
+        df = historico.carregar_historico()
+        assert df["concurso"].tolist() == ["1", "2", "3"]
+        assert df["data"].tolist()[:2] == ["2024-03-01 20:00:00", "2024-03-05 00:00:00"]
+
+        # Ida e volta pelo CSV preserva as datas
+        historico.exportar_csv(pasta / "exportado.csv")
+        HistoricoBinario.migrar_csv(pasta / "exportado.csv", pasta / "de_novo.bin")
+        assert HistoricoBinario(pasta / "de_novo.bin").carregar_historico()["data"].tolist() == df["data"].tolist()
+
+
+def test_acrescimo_e_ultimo_registro_vence():
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = Path(pasta) / "historico.bin"
+        historico = HistoricoBinario(caminho)
+        assert historico.salvar(list(range(1, 16)), 10, "01/02/2024")
+        assert historico.salvar(list(range(1, 16)), 10, "01/02/2024")   # igual: não regrava
+        assert historico.salvar(list(range(11, 26)), 10, "01/02/2024")   # correção: vence
+        assert not historico.salvar(list(range(12, 27)), 11)             # dezena 26
+        assert caminho.stat().st_size == 2 * DTYPE_REGISTRO.itemsize
+        assert HistoricoBinario(caminho).buscar_por_numero(10) == list(range(11, 26))
+        assert len(historico) == 1 and 11 not in historico
+
+
+if __name__ == "__main__":
+    for nome, teste in list(globals().items()):
+        if nome.startswith("test_"):
+            teste()
+            print(f"✅ {nome}")
@@ -0,0 +1,61 @@
+# test_historico_sqlite.py
+# Roda com pytest ou direto: python test_historico_sqlite.py
+import logging
+import sqlite3
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+from services.historico_sqlite import HistoricoSQLite
+
+
+def _dezenas(inicio: int) -> str:
+    return ",".join(map(str, range(inicio, inicio + 15)))
+
+
+def test_ordem_por_concurso_com_datas_em_formatos_mistos():
+    with tempfile.TemporaryDirectory() as pasta:
+        historico = HistoricoSQLite(Path(pasta) / "historico.db")
+        historico.salvar(list(range(1, 16)), 3200, "2025-01-02 20:00:00")
+        historico.salvar(list(range(2, 17)), 3202, "04/01/2025")   # formato da API
+        historico.salvar(list(range(3, 18)), 3201, "03/01/2025")
+        historico.salvar(list(range(4, 19)), "manual", None)
+
+        df = historico.carregar_historico()
+        assert df["concurso"].tolist() == ["3200", "3201", "3202", "manual"]
+        assert df["data"].tolist()[:3] == [
+            "2025-01-02 20:00:00", "2025-01-03 00:00:00", "2025-01-04 00:00:00"
+        ]
+        assert historico.buscar_por_data("2025-01-03", "2025-01-04")["concurso"].tolist() == ["3201", "3202"]
+
+
+def test_banco_antigo_com_datas_da_api_e_migrado():
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = Path(pasta) / "historico.db"
+        HistoricoSQLite(caminho)
+        with sqlite3.connect(caminho) as con:
+            con.execute("INSERT INTO historico VALUES ('10', 10, '05/03/2024', ?, 0)", (_dezenas(1),))
+        assert HistoricoSQLite(caminho).carregar_historico()["data"].tolist() == ["2024-03-05 00:00:00"]
+
+
+def test_importar_csv_pula_linhas_invalidas(caplog):
+    with tempfile.TemporaryDirectory() as pasta:
+        csv = Path(pasta) / "historico.csv"
+        pd.DataFrame({
+            "concurso": ["1", "2", "3"],
+            "data": ["01/03/2024", "2024-03-02 20:00:00", "03/03/2024"],
+            "dezenas": [_dezenas(1), _dezenas(12), _dezenas(11)],   # o 2 tem a dezena 26
+        }).to_csv(csv, index=False)
+
+        historico = HistoricoSQLite(Path(pasta) / "historico.db")
+        with caplog.at_level(logging.WARNING, logger="services.historico_sqlite"):
+            assert historico.importar_csv(csv) == 2
+        assert "['2']" in caplog.text
+        assert historico.carregar_historico()["concurso"].tolist() == ["1", "3"]
+
+
+if __name__ == "__main__":
+    import pytest
+
+    raise SystemExit(pytest.main(["-q", __file__]))
@@ -0,0 +1,69 @@
+# test_indice_combinacoes.py
+# Roda com pytest ou direto: python test_indice_combinacoes.py
+import tempfile
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from services.generator import JogoGenerator
+from services.indice_combinacoes import TOTAL_COMBINACOES, IndiceCombinacoes
+from services.kpi_calculator import KPICalculator
+from services.mascara import MASCARAS_QUADRANTES, Mascara
+
+
+def _jogos_aleatorios(quantidade: int, semente: int = 0) -> list:
+    rng = np.random.default_rng(semente)
+    return [sorted(rng.choice(np.arange(1, 26), 15, replace=False).tolist()) for _ in range(quantidade)]
+
+
+def test_indice_igual_a_calcular():
+    indice = IndiceCombinacoes.obter()
+    assert len(indice) == TOTAL_COMBINACOES
+    for jogo in _jogos_aleatorios(200, semente=4):
+        linha = indice.consultar(jogo)
+        esperado = KPICalculator.calcular(jogo)
+        assert all(linha[nome] == esperado[nome] for nome in ("soma", "pares", "primos", "moldura"))
+        assert [linha[g] for g in ("baixos", "medios", "altos")] == \
+            [len(esperado["grupos"][g]) for g in ("baixos", "medios", "altos")]
+    assert indice.consultar(list(range(1, 15))) is None
+
+
+def test_analise_do_gerador_usa_o_indice():
+    """A distribuição lida do índice bate com o popcount direto."""
+    for jogo in _jogos_aleatorios(50, semente=9):
+        distribuicao = JogoGenerator._analisar_distribuicao_detalhada(jogo)
+        bits = int(Mascara.de_dezenas(jogo))
+        assert list(distribuicao["por_quadrante"].values()) == \
+            [(bits & m).bit_count() for m in MASCARAS_QUADRANTES]
+        assert JogoGenerator._distribuicao(jogo) == KPICalculator.calcular(jogo)["dist"]
+
+
+def test_construcao_concorrente_publica_um_indice_valido():
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = Path(pasta) / "combinacoes"
+        erros = []
+
+        def construir():
+            try:
+                IndiceCombinacoes.construir(caminho)
+                IndiceCombinacoes.carregar(caminho, construir_se_ausente=False)
+            except Exception as e:
+                erros.append(e)
+
+        threads = [threading.Thread(target=construir) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert not erros, erros
+        assert sorted(p.name for p in Path(pasta).iterdir()) == ["combinacoes"]
+        assert len(IndiceCombinacoes.carregar(caminho, construir_se_ausente=False)) == TOTAL_COMBINACOES
+
+
+if __name__ == "__main__":
+    for nome, teste in list(globals().items()):
+        if nome.startswith("test_"):
+            teste()
+            print(f"✅ {nome}")
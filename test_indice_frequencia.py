@@ -0,0 +1,60 @@
+# test_indice_frequencia.py
+# Roda com pytest ou direto: python test_indice_frequencia.py
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from services.indice_frequencia import IndiceFrequencia
+from services.mascara import dezenas_para_mascaras, mascaras_para_matriz
+from services.ranking import RankingCombinatorio
+
+
+def _jogos_aleatorios(quantidade: int, semente: int = 0) -> np.ndarray:
+    """Matriz N x 15 de jogos uniformes (dezenas em ordem crescente)."""
+    rng = np.random.default_rng(semente)
+    return RankingCombinatorio.unrank(RankingCombinatorio.amostrar(quantidade, rng)).astype(np.int64)
+
+
+def test_indice_frequencia_incremental_igual_a_recontagem():
+    jogos = _jogos_aleatorios(300, semente=5)
+    concursos = np.arange(1, len(jogos) + 1)
+    mascaras = dezenas_para_mascaras(jogos.tolist())
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = Path(pasta) / "frequencia.json"
+        incremental = IndiceFrequencia(caminho)
+        incremental.reconstruir(concursos[:100], mascaras[:100])
+        assert all(incremental.registrar(c, j) for c, j in zip(concursos[100:], jogos[100:].tolist()))
+        assert not incremental.registrar(concursos[-1], jogos[-1].tolist())  # fora de ordem
+        assert incremental.verificar(concursos, mascaras)["ok"]
+
+        incremental.salvar()
+        assert IndiceFrequencia(caminho).verificar(concursos, mascaras)["ok"]
+
+    total = mascaras_para_matriz(mascaras).sum(axis=0)
+    assert incremental.total == total.tolist()
+    assert (IndiceFrequencia.contar(jogos.tolist()) == total).all()
+
+
+def test_janelas_e_atrasos_iguais_a_forca_bruta():
+    jogos = _jogos_aleatorios(150, semente=11).tolist()
+    indice = IndiceFrequencia(janelas=(10, 50))
+    for concurso, jogo in enumerate(jogos, start=1):
+        indice.registrar(concurso, jogo)
+
+    for janela in (10, 50):
+        recentes = jogos[-janela:]
+        assert indice.frequencia(janela) == {n: sum(n in j for j in recentes) for n in range(1, 26)}
+    for n in range(1, 26):
+        posicoes = [i for i, j in enumerate(jogos) if n in j]
+        assert indice.atraso(n) == len(jogos) - 1 - posicoes[-1]
+        lacunas = [b - a - 1 for a, b in zip([-1] + posicoes, posicoes + [len(jogos)])]
+        assert indice.maior_atraso(n) == max(lacunas)
+
+
+if __name__ == "__main__":
+    for nome, teste in list(globals().items()):
+        if nome.startswith("test_"):
+            teste()
+            print(f"✅ {nome}")
@@ -0,0 +1,63 @@
+# test_indice_invertido.py
+# Roda com pytest ou direto: python test_indice_invertido.py
+import logging
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from services.indice_invertido import IndiceInvertido
+from services.mascara import dezenas_para_mascaras
+from services.ranking import RankingCombinatorio
+
+
+def _jogos_aleatorios(quantidade: int, semente: int = 0) -> np.ndarray:
+    """Matriz N x 15 de jogos uniformes (dezenas em ordem crescente)."""
+    rng = np.random.default_rng(semente)
+    return RankingCombinatorio.unrank(RankingCombinatorio.amostrar(quantidade, rng)).astype(np.int64)
+
+
+def test_indice_invertido_incremental_igual_a_reconstrucao():
+    jogos = _jogos_aleatorios(101, semente=6)
+    concursos = np.arange(1, len(jogos) + 1)
+    mascaras = dezenas_para_mascaras(jogos.tolist())
+
+    completo = IndiceInvertido()
+    completo.reconstruir(concursos, mascaras)
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = Path(pasta) / "invertido.npz"
+        incremental = IndiceInvertido(caminho)
+        incremental.reconstruir(concursos[:37], mascaras[:37])
+        assert all(incremental.registrar(c, j) for c, j in zip(concursos[37:], jogos[37:].tolist()))
+        incremental.salvar()
+        recarregado = IndiceInvertido(caminho)
+
+    for indice in (incremental, recarregado):
+        assert (indice.concursos == completo.concursos).all()
+        assert (indice.bitmaps == completo.bitmaps).all()
+    esperado = concursos[(mascaras & 1) & (mascaras >> 24) != 0]
+    assert (incremental.concursos_de(incremental.contendo([1, 25])) == esperado).all()
+
+
+def test_datas_da_api_lidas_com_o_dia_primeiro():
+    indice = IndiceInvertido()
+    indice.registrar(1, range(1, 16), "05/01/2024")          # 5 de janeiro
+    indice.registrar(2, range(2, 17), "2024-02-01 00:00:00")
+    indice.registrar(3, range(3, 18), None)
+    assert indice.consultar(inicio="2024-01-05", fim="2024-01-05").tolist() == [1]
+    assert indice.consultar(inicio="01/02/2024").tolist() == [2]
+    assert indice.consultar(fim="31/12/2030").tolist() == [1, 2]    # sem data fica de fora
+
+
+def test_salvar_com_falha_registra_no_log_e_mantem_o_indice(tmp_path, caplog):
+    indice = IndiceInvertido(tmp_path / "sem_pasta" / "invertido.npz")
+    indice.registrar(1, range(1, 16))
+    with caplog.at_level(logging.WARNING, logger="services.indice_invertido"):
+        indice.salvar()
+    assert "Não foi possível gravar o índice invertido" in caplog.text
+    assert len(indice) == 1 and not (tmp_path / "sem_pasta").exists()
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main(["-q", __file__]))
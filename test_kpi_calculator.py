@@ -0,0 +1,48 @@
+# test_kpi_calculator.py
+# Roda com pytest ou direto: python test_kpi_calculator.py
+import numpy as np
+
+from services.kpi_calculator import KPICalculator
+from services.mascara import dezenas_para_mascaras, mascaras_para_matriz
+
+
+def _jogos_aleatorios(quantidade: int, semente: int = 0) -> list:
+    rng = np.random.default_rng(semente)
+    return [sorted(rng.choice(np.arange(1, 26), 15, replace=False).tolist()) for _ in range(quantidade)]
+
+
+def test_calcular_lote_igual_a_calcular():
+    jogos = _jogos_aleatorios(2000, semente=3)
+    anterior = jogos[0]
+    lote = KPICalculator.calcular_lote(dezenas_para_mascaras(jogos), anterior)
+    matriz = KPICalculator.calcular_lote(mascaras_para_matriz(dezenas_para_mascaras(jogos)), anterior)
+
+    for i, jogo in enumerate(jogos):
+        esperado = KPICalculator.calcular(jogo, anterior)
+        for nome in ("soma", "pares", "impares", "primos", "moldura", "repetidas"):
+            assert int(lote[nome][i]) == esperado[nome], (nome, jogo)
+        for nome, grupo in esperado["grupos"].items():
+            assert int(lote[nome][i]) == len(grupo), (nome, jogo)
+        for nome, valor in esperado["flags"].items():
+            assert bool(lote[nome][i]) == valor, (nome, jogo)
+    assert all((lote[nome] == matriz[nome]).all() for nome in lote)
+
+
+def test_calcular_lote_em_blocos_igual_a_inteiro():
+    mascaras = dezenas_para_mascaras(_jogos_aleatorios(1000, semente=8))
+    inteiro = KPICalculator.calcular_lote(mascaras)
+    em_blocos = KPICalculator.calcular_lote(mascaras, tamanho_bloco=37)
+    assert all((inteiro[nome] == em_blocos[nome]).all() for nome in inteiro)
+
+
+def test_calcular_lote_jogo_invalido_sai_zerado():
+    lote = KPICalculator.calcular_lote(dezenas_para_mascaras([list(range(1, 15)), list(range(1, 16))]))
+    assert lote["valido"].tolist() == [False, True]
+    assert lote["soma"][0] == 0 and lote["soma"][1] == sum(range(1, 16))
+
+
+if __name__ == "__main__":
+    for nome, teste in list(globals().items()):
+        if nome.startswith("test_"):
+            teste()
+            print(f"✅ {nome}")
@@ -0,0 +1,143 @@
+# test_loteria_api.py
+# Roda com pytest ou direto: python test_loteria_api.py
+import logging
+import threading
+import time
+
+import pytest
+
+from services import loteria_api
+from services.backfill import BackfillHistorico
+from services.cache_processo import CacheProcesso
+from services.coocorrencia import Coocorrencia
+from services.indice_frequencia import IndiceFrequencia
+from services.historico_binario import HistoricoBinario
+from services.loteria_api import LoteriaAPI
+
+
+class _ApiFalsa(LoteriaAPI):
+    """LoteriaAPI com histórico temporário e respostas da API em memória."""
+
+    def __init__(self, pasta, publicado=None, ausentes=()):
+        super().__init__(armazenamento=HistoricoBinario(pasta / "historico.bin"))
+        self.publicado = publicado
+        self.ausentes = set(ausentes)
+        self.pedidos = []
+
+    def buscar_concurso(self, concurso="latest"):
+        self.pedidos.append(str(concurso))
+        if self.publicado is None:
+            return None
+        numero = self.publicado if concurso == "latest" else int(concurso)
+        if numero in self.ausentes:
+            return None
+        return {"concurso": numero, "data": "01/02/2024", "dezenas": [f"{n:02d}" for n in range(1, 16)]}
+
+
+def test_sincronizar_falha_no_latest_grava_watermark_com_backoff(tmp_path):
+    api = _ApiFalsa(tmp_path)
+    marca = tmp_path / "sync.json"
+
+    assert api.sincronizar(watermark_path=marca, intervalo=60)["falhas"] == ["latest"]
+    assert LoteriaAPI._ler_watermark(marca)["falhas_latest"] == 1
+    # Cargas seguintes dentro do intervalo não voltam à rede
+    assert api.sincronizar(watermark_path=marca, intervalo=60)["pulado"]
+    assert api.pedidos == ["latest"]
+
+    # A espera dobra a cada falha seguida (60 s -> 120 s)
+    api.sincronizar(forcar=True, watermark_path=marca, intervalo=60)
+    dados = LoteriaAPI._ler_watermark(marca)
+    assert dados["falhas_latest"] == 2
+    dados["verificado_em"] = time.time() - 90
+    LoteriaAPI._gravar_watermark(marca, dados)
+    assert api.sincronizar(watermark_path=marca, intervalo=60)["pulado"]
+
+    # Sucesso zera o contador
+    api.publicado = 3
+    relatorio = api.sincronizar(forcar=True, watermark_path=marca, intervalo=60)
+    assert relatorio["adicionados"] == [3]
+    assert "falhas_latest" not in LoteriaAPI._ler_watermark(marca)
+
+
+def test_sincronizar_confirmacao_de_404_tem_prazo_total(tmp_path, monkeypatch):
+    api = _ApiFalsa(tmp_path, publicado=20, ausentes=range(2, 20))
+    api.salvar_historico(list(range(1, 16)), 1)
+
+    def situacao_concurso(self, concurso):
+        if concurso == 2:
+            return "inexistente", None
+        time.sleep(0.2 if concurso == 3 else 5)
+        return "falha", None
+
+    monkeypatch.setattr(BackfillHistorico, "situacao_concurso", situacao_concurso)
+    inicio = time.perf_counter()
+    relatorio = api.sincronizar(forcar=True, watermark_path=tmp_path / "sync.json",
+                                prazo_confirmacao=0.5)
+    segundos = time.perf_counter() - inicio
+
+    # 18 confirmações de até 5 s cada: o prazo total corta bem antes
+    assert segundos < 2
+    assert relatorio["adicionados"] == [20]
+    assert relatorio["falhas"] == list(range(3, 20))
+    marca = LoteriaAPI._ler_watermark(tmp_path / "sync.json")
+    # O 404 confirmado (2) não é falha e, abaixo do último salvo, sai da marca
+    assert marca["falhas"] == list(range(3, 20)) and marca["inexistentes_404"] == []
+
+
+def test_gravacao_csv_concorrente_nao_perde_concursos(tmp_path, monkeypatch):
+    monkeypatch.setattr(loteria_api, "HISTORICO_PATH", tmp_path / "historico.csv")
+    api = LoteriaAPI()
+    api.armazenamento = None    # CSV, qualquer que seja o HISTORICO_BACKEND
+
+    def gravar(inicio: int):
+        for concurso in range(inicio, inicio + 5):
+            assert api.salvar_historico(list(range(1, 16)), concurso, "2024-01-01")
+
+    threads = [threading.Thread(target=gravar, args=(i * 5 + 1,)) for i in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(map(int, api.carregar_historico()["concurso"])) == list(range(1, 31))
+    assert [p.name for p in tmp_path.glob("*.tmp")] == []
+
+
+def test_gravacao_csv_com_falha_registra_no_log(tmp_path, monkeypatch, caplog):
+    monkeypatch.setattr(loteria_api, "HISTORICO_PATH", tmp_path / "sem_pasta" / "historico.csv")
+    api = LoteriaAPI()
+    api.armazenamento = None    # CSV, qualquer que seja o HISTORICO_BACKEND
+    with caplog.at_level(logging.ERROR, logger="services.loteria_api"):
+        assert api.salvar_historico_lote([{"concurso": 1, "dezenas": list(range(1, 16))}]) == 0
+    assert "Falha ao gravar 1 concurso(s)" in caplog.text
+
+
+def test_linha_com_dezena_26_e_pulada_e_registrada(tmp_path, monkeypatch, caplog):
+    jogos = {c: list(range(c, c + 15)) for c in range(1, 6)}
+    linhas = [f'{c},2024-01-0{c} 00:00:00,"{",".join(map(str, j))}"' for c, j in jogos.items()]
+    linhas.insert(2, '99,2024-01-09 00:00:00,"12,13,14,15,16,17,18,19,20,21,22,23,24,25,26"')
+    csv = tmp_path / "historico.csv"
+    csv.write_text("concurso,data,dezenas\n" + "\n".join(linhas) + "\n", encoding="utf-8")
+    monkeypatch.setattr(loteria_api, "HISTORICO_PATH", csv)
+    CacheProcesso.limpar()
+    api = LoteriaAPI()
+    api.armazenamento = None
+
+    with caplog.at_level(logging.WARNING):
+        concursos, mascaras = api.carregar_mascaras()
+        assert concursos.tolist() == [1, 2, 3, 4, 5]
+        assert len(api.carregar_timestamps()) == 5
+        # As análises seguem com as linhas válidas
+        assert api.indice_frequencia().frequencia()[15] == 5
+        assert Coocorrencia.obter(api).par(5, 15) == 5
+        assert IndiceFrequencia.contar(list(jogos.values()) + [[26] + list(range(1, 15))]).sum() == 75
+        assert Coocorrencia.de_dezenas([list(range(11, 26)), [0] + list(range(1, 15))]).sorteios == 1
+    mensagens = [r.getMessage() for r in caplog.records]
+    assert any("1 linha(s) com dezenas inválidas" in m and "99" in m for m in mensagens)
+    assert any(m.startswith("Contagem: 1 jogo(s)") for m in mensagens)
+    assert any(m.startswith("Coocorrência: 1 jogo(s)") for m in mensagens)
+    CacheProcesso.limpar()
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main(["-q", __file__]))
@@ -0,0 +1,91 @@
+# test_loteria_api_async.py
+# Roda com pytest ou direto: python test_loteria_api_async.py
+import threading
+import time
+
+import pandas as pd
+
+from services.loteria_api_async import LoteriaAPIAsync
+
+ULTIMO = 100
+
+
+class _ApiFalsa:
+    """Stand-in da LoteriaAPI: cada busca leva 'atraso' segundos."""
+
+    def __init__(self, atraso: float = 0.05, lentos=(), ausentes=(), quebrados=(), salvo: int = 0):
+        self.atraso = atraso
+        self.lentos, self.ausentes, self.quebrados = set(lentos), set(ausentes), set(quebrados)
+        self.salvo = salvo
+        self.pedidos = []
+        self.simultaneos = self.maximo_simultaneos = 0
+        self._lock = threading.Lock()
+
+    def buscar_concurso(self, concurso: str = "latest"):
+        with self._lock:
+            self.pedidos.append(concurso)
+            self.simultaneos += 1
+            self.maximo_simultaneos = max(self.maximo_simultaneos, self.simultaneos)
+        try:
+            time.sleep(2.0 if concurso in self.lentos else self.atraso)
+            if concurso in self.quebrados:
+                raise RuntimeError("conexão recusada")
+            if concurso in self.ausentes:
+                return None
+            numero = ULTIMO if concurso == "latest" else int(concurso)
+            return {"concurso": numero, "dezenas": [f"{n:02d}" for n in range(1, 16)]}
+        finally:
+            with self._lock:
+                self.simultaneos -= 1
+
+    def processar_dezenas(self, dados):
+        return sorted(map(int, dados.get("dezenas") or []))
+
+    def carregar_historico(self):
+        return pd.DataFrame({"concurso": [str(self.salvo)] if self.salvo else []})
+
+
+def test_buscar_varios_em_paralelo_com_limite():
+    api = _ApiFalsa(atraso=0.1)
+    cliente = LoteriaAPIAsync(api, limite=4)
+    inicio = time.perf_counter()
+    lote = cliente.buscar_varios_sync(range(1, 13))
+    segundos = time.perf_counter() - inicio
+    cliente.fechar()
+
+    assert sorted(map(int, lote["resultados"])) == list(range(1, 13)) and not lote["erros"]
+    assert api.maximo_simultaneos == 4
+    assert segundos < 12 * 0.1 / 2                 # bem abaixo do serial (1,2 s)
+
+
+def test_prazo_devolve_parciais_e_erros_separados():
+    api = _ApiFalsa(lentos={"3"}, ausentes={"4"}, quebrados={"5"})
+    cliente = LoteriaAPIAsync(api, limite=8)
+    inicio = time.perf_counter()
+    lote = cliente.buscar_varios_sync([1, 2, 3, 4, 5, 2], prazo=0.5)
+    cliente.fechar()
+
+    assert time.perf_counter() - inicio < 1.5      # não espera o concurso lento
+    assert sorted(lote["resultados"]) == ["1", "2"]
+    assert lote["erros"]["3"] == "prazo esgotado"
+    assert lote["erros"]["4"] == "sem resposta ou inexistente"
+    assert lote["erros"]["5"].startswith("erro:")
+    assert api.pedidos.count("2") == 1             # repetidos são buscados uma vez
+
+
+def test_buscar_ultimos_antecipa_pelo_historico():
+    api = _ApiFalsa(salvo=ULTIMO - 1)
+    cliente = LoteriaAPIAsync(api)
+    lote = cliente.buscar_ultimos_sync(5)
+    cliente.fechar()
+
+    assert list(lote["resultados"]) == [str(ULTIMO - i) for i in range(1, 6)]
+    assert len(api.pedidos) == 6                   # latest + 5, numa rodada só
+    assert LoteriaAPIAsync.dezenas_por_concurso(lote, api)[ULTIMO - 1] == list(range(1, 16))
+
+
+if __name__ == "__main__":
+    for nome, teste in list(globals().items()):
+        if nome.startswith("test_"):
+            teste()
+            print(f"✅ {nome}")
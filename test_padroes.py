@@ -0,0 +1,63 @@
+# test_padroes.py
+# Roda com pytest ou direto: python test_padroes.py
+import math
+from itertools import combinations
+
+import numpy as np
+
+from services.coocorrencia import probabilidade_conjunto
+from services.mascara import dezenas_para_mascaras
+from services.padroes import MineradorPadroes
+from services.ranking import RankingCombinatorio
+
+
+def _jogos_aleatorios(quantidade: int, semente: int = 0) -> list:
+    rng = np.random.default_rng(semente)
+    return RankingCombinatorio.unrank(RankingCombinatorio.amostrar(quantidade, rng)).tolist()
+
+
+def _frequentes_forca_bruta(jogos: list, concursos: list, tamanhos: range, exigido) -> set:
+    """(dezenas, suporte, último concurso) de todo grupo com suporte >= exigido(tamanho)."""
+    conjuntos = [set(j) for j in jogos]
+    saida = set()
+    for tamanho in tamanhos:
+        for grupo in combinations(range(1, 26), tamanho):
+            presentes = [c for c, s in zip(concursos, conjuntos) if set(grupo) <= s]
+            if len(presentes) >= exigido(tamanho):
+                saida.add((grupo, len(presentes), presentes[-1]))
+    return saida
+
+
+def test_eclat_igual_a_forca_bruta():
+    jogos = _jogos_aleatorios(60, semente=14)
+    concursos = list(range(1001, 1061))
+    minerador = MineradorPadroes(dezenas_para_mascaras(jogos), concursos)
+
+    resultados = minerador.minerar(2, 4, suporte_minimo=8, processos=1)
+    obtidos = {(r["dezenas"], r["suporte"], r["ultimo_concurso"]) for r in resultados}
+    assert obtidos == _frequentes_forca_bruta(jogos, concursos, range(2, 5), lambda k: 8)
+    # Ordem: tamanho, suporte decrescente, dezenas
+    assert resultados == sorted(resultados, key=lambda r: (len(r["dezenas"]), -r["suporte"], r["dezenas"]))
+
+    # Suporte relativo e fator sobre o esperado (limiar por tamanho)
+    relativo = minerador.minerar(3, 3, suporte_minimo=0.2, processos=1)
+    assert {r["dezenas"] for r in relativo} == \
+        {g for g, _, _ in _frequentes_forca_bruta(jogos, concursos, range(3, 4), lambda k: 12)}
+    acima = minerador.minerar(2, 3, acima_do_esperado=1.3, processos=1)
+    esperado = _frequentes_forca_bruta(
+        jogos, concursos, range(2, 4), lambda k: math.ceil(1.3 * 60 * probabilidade_conjunto(k))
+    )
+    assert {(r["dezenas"], r["suporte"], r["ultimo_concurso"]) for r in acima} == esperado
+
+
+def test_eclat_em_processos_igual_a_serial():
+    minerador = MineradorPadroes(dezenas_para_mascaras(_jogos_aleatorios(80, semente=15)))
+    serial = minerador.minerar(2, 5, suporte_minimo=0.1, processos=1)
+    assert serial and minerador.minerar(2, 5, suporte_minimo=0.1, processos=2) == serial
+
+
+if __name__ == "__main__":
+    for nome, teste in list(globals().items()):
+        if nome.startswith("test_"):
+            teste()
+            print(f"✅ {nome}")
@@ -0,0 +1,52 @@
+# test_ranking.py
+# Roda com pytest ou direto: python test_ranking.py
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from services.indice_combinacoes import TOTAL_COMBINACOES, IndiceCombinacoes
+from services.ranking import RankingCombinatorio
+
+
+def test_rank_unrank_ida_e_volta():
+    rng = np.random.default_rng(1)
+    ranks = np.concatenate([[0, 1, TOTAL_COMBINACOES - 1], rng.integers(0, TOTAL_COMBINACOES, 5000)])
+    jogos = RankingCombinatorio.unrank(ranks)
+    assert (np.diff(jogos.astype(np.int64), axis=1) > 0).all()
+    assert jogos.min() >= 1 and jogos.max() <= 25
+    assert (RankingCombinatorio.rank(jogos) == ranks).all()
+    assert (RankingCombinatorio.rank_mascaras(RankingCombinatorio.unrank_mascaras(ranks)) == ranks).all()
+    assert (RankingCombinatorio.unrank(RankingCombinatorio.rank(jogos[7])) == jogos[7]).all()
+    assert RankingCombinatorio.unrank(0).tolist() == list(range(1, 16))
+    assert RankingCombinatorio.unrank(TOTAL_COMBINACOES - 1).tolist() == list(range(11, 26))
+
+
+def test_rank_coincide_com_posicao_no_indice():
+    indice = IndiceCombinacoes.obter()
+    ranks = np.random.default_rng(2).integers(0, TOTAL_COMBINACOES, 2000)
+    assert (indice.posicao(RankingCombinatorio.unrank_mascaras(ranks)) == ranks).all()
+
+
+def test_rank_rejeita_jogos_invalidos():
+    for jogo in (list(range(1, 15)), list(range(2, 16)) + [2], list(range(12, 27))):
+        try:
+            RankingCombinatorio.rank(jogo)
+        except ValueError:
+            continue
+        raise AssertionError(f"rank aceitou {jogo}")
+
+
+def test_salvar_e_carregar_compacto():
+    ranks = RankingCombinatorio.amostrar(1000, np.random.default_rng(3))
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = RankingCombinatorio.salvar(Path(pasta) / "jogos.npy", ranks)
+        assert caminho.stat().st_size < 1000 * 4 + 256
+        assert (RankingCombinatorio.carregar(caminho, mmap=True) == ranks).all()
+
+
+if __name__ == "__main__":
+    for nome, teste in list(globals().items()):
+        if nome.startswith("test_"):
+            teste()
+            print(f"✅ {nome}")